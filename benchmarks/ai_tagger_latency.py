@@ -0,0 +1,76 @@
+"""
+Measures the latency of the AI tagging of a long transcript, using a stub LLM instead of a real provider.
+
+The stub answers after a fixed latency plus a delay per character (like a real LLM, that generates the whole
+tagged text), wrapping some words in tags. The same text is tagged in a single call (one chunk)
+and in the concurrent overlapping chunks used by AiTagger, and both results are compared.
+
+Usage (from the repository root, with pycaps installed): python benchmarks/ai_tagger_latency.py [--words 6000]
+"""
+import argparse
+import re
+import time
+from pycaps.ai import Llm, LlmProvider
+from pycaps.api import ApiKeyService
+from pycaps.common import Tag
+from pycaps.tag.tagger.ai_tagger import AiTagger
+
+SENTENCES = [
+    "The quick brown fox jumps over the lazy dog.",
+    "My dog loves to run in the park every morning.",
+    "Nobody knows where the fox sleeps at night!",
+    "Is the cat afraid of the big dog?",
+]
+ANIMAL_REGEX = re.compile(r"\b(fox|dog|cat)\b")
+
+class StubLlm(Llm):
+    def __init__(self, latency: float, latency_per_char: float):
+        self._latency = latency
+        self._latency_per_char = latency_per_char
+
+    def send_message(self, message: str, model: str = None) -> str:
+        text = message.split("Text to analyze:\n", 1)[1].rsplit("\n\nTagged version:", 1)[0]
+        time.sleep(self._latency + self._latency_per_char * len(text))
+        return ANIMAL_REGEX.sub(r"<animal>\1</animal>", text)
+
+    def is_enabled(self) -> bool:
+        return True
+
+def build_text(words: int) -> str:
+    sentences = []
+    count = 0
+    while count < words:
+        sentence = SENTENCES[len(sentences) % len(SENTENCES)]
+        sentences.append(sentence)
+        count += len(sentence.split())
+    return " ".join(sentences)
+
+def measure(tagger: AiTagger, text: str, rules: dict):
+    start = time.perf_counter()
+    matches = tagger.process(text, rules)
+    return time.perf_counter() - start, matches
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=6000)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fixed latency of each LLM call (seconds).")
+    parser.add_argument("--latency-per-char", type=float, default=0.0002, help="Latency per character of the text (seconds).")
+    args = parser.parse_args()
+    if ApiKeyService.has():
+        raise SystemExit("A Pycaps API key is configured, the AI tagger would use the Pycaps API instead of the stub LLM.")
+
+    LlmProvider._configure(StubLlm(args.latency, args.latency_per_char), use_cache=False)
+    text = build_text(args.words)
+    rules = {Tag("animal"): "animals"}
+    single_time, single_matches = measure(AiTagger(max_chunk_chars=len(text)), text, rules)
+    chunked_tagger = AiTagger()
+    chunks = len(chunked_tagger._split_into_chunks(text))
+    chunked_time, chunked_matches = measure(chunked_tagger, text, rules)
+
+    print(f"{args.words} words ({len(text)} chars)")
+    print(f"single call: {single_time:.2f}s")
+    print(f"{chunks} chunks: {chunked_time:.2f}s")
+    print(f"same tags: {single_matches == chunked_matches}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Measures the memory used by the document model per word (see pycaps.common.models).
+
+Builds a synthetic document (10 words per line and segment) with tracemalloc enabled
+and prints the allocated bytes per word, with and without word clips.
+
+Usage (from the repository root, with pycaps installed): python benchmarks/document_memory.py [--words 20000]
+"""
+import argparse
+import gc
+import tracemalloc
+from pycaps.common import Document, Segment, Line, Word, WordClip, TimeFragment, ElementState
+
+WORDS_PER_SEGMENT = 10
+
+def build_document(words: int, clips_per_word: int) -> Document:
+    document = Document()
+    for segment_index in range(words // WORDS_PER_SEGMENT):
+        start = segment_index * 2.0
+        segment = Segment(time=TimeFragment(start=start, end=start + 2.0))
+        line = Line(time=TimeFragment(start=start, end=start + 2.0))
+        for word_index in range(WORDS_PER_SEGMENT):
+            word_start = start + word_index * 0.2
+            word = Word(text=f"word{word_index}", time=TimeFragment(start=word_start, end=word_start + 0.2))
+            for _ in range(clips_per_word):
+                word.clips.add(WordClip(states=[ElementState.WORD_BEING_NARRATED]))
+            line.words.add(word)
+        segment.lines.add(line)
+        document.segments.add(segment)
+    return document
+
+def measure(words: int, clips_per_word: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        document = build_document(words, clips_per_word)
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del document
+    return allocated / words
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=20000)
+    args = parser.parse_args()
+    for clips_per_word in (0, 5):
+        print(f"{clips_per_word} clips/word: {measure(args.words, clips_per_word):.0f} bytes/word")
+
+if __name__ == "__main__":
+    main()
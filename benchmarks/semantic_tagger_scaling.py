@@ -0,0 +1,47 @@
+"""
+Measures how SemanticTagger.tag() scales with the number of words (it should be linear).
+
+Tags synthetic documents of increasing size with a broad regex rule (it matches a third of the words)
+and a wordlist rule, and prints the time per document and per 1000 words.
+
+Usage (from the repository root, with pycaps installed): python benchmarks/semantic_tagger_scaling.py [--sizes 20000 40000 80000]
+"""
+import argparse
+import time
+from pycaps.common import Document, Segment, Line, Word, Tag, TimeFragment
+from pycaps.tag import SemanticTagger
+
+WORDS_PER_SEGMENT = 10
+VOCABULARY = ["the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "new", "york"]
+
+def build_document(words: int) -> Document:
+    document = Document()
+    for segment_index in range(words // WORDS_PER_SEGMENT):
+        start = segment_index * 2.0
+        segment = Segment(time=TimeFragment(start=start, end=start + 2.0))
+        line = Line(time=TimeFragment(start=start, end=start + 2.0))
+        for word_index in range(WORDS_PER_SEGMENT):
+            word_start = start + word_index * 0.2
+            text = VOCABULARY[(segment_index * 7 + word_index) % len(VOCABULARY)]
+            line.words.add(Word(text=text, time=TimeFragment(start=word_start, end=word_start + 0.2)))
+        segment.lines.add(line)
+        document.segments.add(segment)
+    return document
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20000, 40000, 80000])
+    args = parser.parse_args()
+
+    tagger = SemanticTagger()
+    tagger.add_regex_rule(Tag("broad"), r"\b(?:quick|fox|lazy)\b")
+    tagger.add_wordlist_rule(Tag("city"), ["new york"])
+    for size in args.sizes:
+        document = build_document(size)
+        start = time.perf_counter()
+        tagger.tag(document)
+        elapsed = time.perf_counter() - start
+        print(f"{size} words: {elapsed:.3f}s ({elapsed / size * 1000 * 1000:.2f}ms per 1000 words)")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from .pipeline import CapsPipeline, CapsPipelineBuilder, JsonConfigLoader
 from .renderer import CssSubtitleRenderer
-from .transcriber import WhisperAudioTranscriber, GoogleAudioTranscriber, AudioTranscriber, LimitByWordsSplitter, LimitByCharsSplitter, SplitIntoSentencesSplitter
+from .transcriber import WhisperAudioTranscriber, WhisperScriptAlignmentTranscriber, GoogleAudioTranscriber, TimedTextTranscriber, AudioTranscriber, LimitByWordsSplitter, LimitByCharsSplitter, SplitIntoSentencesSplitter, SplitOnPausesSplitter, VoiceActivityDetector
 from .effect import *
 from .animation import *
 from .selector import WordClipSelector
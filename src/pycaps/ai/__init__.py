@@ -1,5 +1,8 @@
 from .gpt import Gpt
 from .llm import Llm
 from .llm_provider import LlmProvider
+from .llm_response_cache import LlmResponseCache
+from .cached_llm import CachedLlm
+from .llm_dispatcher import LlmDispatcher
 
-__all__ = ["Gpt", "Llm", "LlmProvider"]
+__all__ = ["Gpt", "Llm", "LlmProvider", "LlmResponseCache", "CachedLlm", "LlmDispatcher"]
@@ -0,0 +1,45 @@
+import inspect
+from typing import Optional
+from pycaps.ai.llm import Llm
+from pycaps.ai.llm_response_cache import LlmResponseCache
+
+class CachedLlm(Llm):
+    """
+    Wraps a provider, returning the cached response when the same prompt was already sent to the same provider and model.
+    Use send_message(..., use_cache=False) to skip the cache for a call (the new response is cached anyway).
+    """
+
+    def __init__(self, llm: Llm, cache: LlmResponseCache):
+        self._llm = llm
+        self._cache = cache
+        # the cache key uses the real provider, not the wrappers (e.g. LlmDispatcher)
+        self._provider = llm
+        while hasattr(self._provider, "get_llm"):
+            self._provider = self._provider.get_llm()
+
+    def send_message(self, message: str, model: Optional[str] = None, use_cache: bool = True) -> str:
+        model = model or self._get_default_model()
+        key = LlmResponseCache.get_key(type(self._provider).__name__, model or "", message)
+        if use_cache:
+            response = self._cache.get(key)
+            if response is not None:
+                return response
+
+        response = self._llm.send_message(message, model) if model else self._llm.send_message(message)
+        self._cache.save(key, response)
+        return response
+
+    def is_enabled(self) -> bool:
+        return self._llm.is_enabled()
+
+    def get_llm(self) -> Llm:
+        return self._llm
+
+    def get_cache(self) -> LlmResponseCache:
+        return self._cache
+
+    def _get_default_model(self) -> Optional[str]:
+        parameter = inspect.signature(self._provider.send_message).parameters.get("model")
+        if parameter is None or parameter.default is inspect.Parameter.empty:
+            return None
+        return parameter.default
@@ -8,8 +8,8 @@ class Gpt(Llm):
     def __init__(self):
         self._client = None
 
-    def send_message(self, prompt: str, model: str = "gpt-4.1-mini") -> str:
-        return self._get_client().responses.create(model=model, input=prompt).output_text
+    def send_message(self, message: str, model: str = "gpt-4.1-mini") -> str:
+        return self._get_client().responses.create(model=model, input=message).output_text
     
     def is_enabled(self) -> bool:
         return os.getenv(self.OPENAI_API_KEY_NAME) is not None
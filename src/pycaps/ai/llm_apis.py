@@ -1,5 +1,5 @@
 from pycaps.ai.llm import Llm
-import requests
+from pycaps.common import HttpClient
 
 class TogetherLlm(Llm):
     def __init__(self, api_key: str):
@@ -9,7 +9,7 @@ class TogetherLlm(Llm):
         url = "https://api.together.xyz/v1"
         headers = {"Authorization": f"Bearer {self.api_key}"}
         payload = {"model": model, "prompt": message}
-        response = requests.post(url, json=payload, headers=headers)
+        response = HttpClient.get_default().post(url, json=payload, headers=headers)
         response.raise_for_status()
         return response.json().get("output", "")
 
@@ -34,7 +34,7 @@ class GroqLlm(Llm):
             "stream": False
         }
 
-        response = requests.post(url, json=payload, headers=headers)
+        response = HttpClient.get_default().post(url, json=payload, headers=headers)
         response.raise_for_status()
         data = response.json()
 
@@ -51,7 +51,7 @@ class OpenRouterLlm(Llm):
         url = "https://openrouter.ai/api/v1"
         headers = {"Authorization": f"Bearer {self.api_key}"}
         payload = {"model": model, "prompt": message}
-        response = requests.post(url, json=payload, headers=headers)
+        response = HttpClient.get_default().post(url, json=payload, headers=headers)
         response.raise_for_status()
         return response.json().get("output", "")
 
@@ -0,0 +1,172 @@
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from pycaps.ai.llm import Llm
+
+class _TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+class _Request:
+    __slots__ = ("key", "message", "model", "future", "waiters")
+
+    def __init__(self, key: Tuple[str, Optional[str]], message: str, model: Optional[str], future: asyncio.Future):
+        self.key = key
+        self.message = message
+        self.model = model
+        self.future = future
+        self.waiters = 0
+
+class LlmDispatcher(Llm):
+    """
+    Sends the messages to a provider from an asyncio event loop (running in a background thread),
+    so the requests of all the AI features share the same limits:
+    - max_in_flight: maximum number of requests being sent at the same time.
+    - requests_per_second and burst: token bucket that limits the rate of the requests.
+
+    The queued messages are sent by priority (lower values first, then in submission order).
+    Identical messages (same message and model) submitted while the first one is pending are coalesced into a single
+    request (with the priority of the first one). When all the callers waiting for a request cancel it,
+    it's removed from the queue (a request already being sent can't be stopped, its response is discarded).
+
+    Callers can use submit() from a coroutine, dispatch() to get a concurrent.futures.Future,
+    or send_message(), which blocks until the response is received (so it can be used as any other Llm).
+    """
+
+    def __init__(self, llm: Llm, max_in_flight: int = 4, requests_per_second: Optional[float] = None, burst: int = 1):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if requests_per_second is not None and requests_per_second <= 0:
+            raise ValueError("requests_per_second must be greater than 0")
+        self._llm = llm
+        self._max_in_flight = max_in_flight
+        self._bucket = _TokenBucket(requests_per_second, max(1, burst)) if requests_per_second else None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[Tuple[str, Optional[str]], _Request] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    async def submit(self, message: str, model: Optional[str] = None, priority: int = 0) -> str:
+        """Sends the message and returns the response. It can be awaited from any event loop."""
+        return await asyncio.wrap_future(self.dispatch(message, model, priority))
+
+    def dispatch(self, message: str, model: Optional[str] = None, priority: int = 0) -> Future:
+        """Queues the message and returns a future with the response. Cancel the future to cancel the request."""
+        loop = self._start()
+        return asyncio.run_coroutine_threadsafe(self._wait_response(message, model, priority), loop)
+
+    def send_message(self, message: str, model: Optional[str] = None, priority: int = 0) -> str:
+        return self.dispatch(message, model, priority).result()
+
+    def is_enabled(self) -> bool:
+        return self._llm.is_enabled()
+
+    def get_llm(self) -> Llm:
+        return self._llm
+
+    def close(self) -> None:
+        """
+        Stops the event loop. The pending requests are cancelled: the callers waiting for them
+        receive a concurrent.futures.CancelledError (a request already being sent can't be stopped, its response is discarded).
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        # the tasks are cancelled inside the loop, so the futures of the callers are resolved before stopping it
+        asyncio.run_coroutine_threadsafe(self._cancel_tasks(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _cancel_tasks(self) -> None:
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._executor = ThreadPoolExecutor(max_workers=self._max_in_flight, thread_name_prefix="pycaps-llm")
+                self._pending = {}
+                started = threading.Event()
+
+                def run_loop():
+                    asyncio.set_event_loop(loop)
+                    self._queue = asyncio.PriorityQueue()
+                    for _ in range(self._max_in_flight):
+                        loop.create_task(self._worker())
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+                    loop.close()
+
+                threading.Thread(target=run_loop, name="pycaps-llm-dispatcher", daemon=True).start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    async def _wait_response(self, message: str, model: Optional[str], priority: int) -> str:
+        key = (message, model)
+        request = self._pending.get(key)
+        if request is None:
+            request = _Request(key, message, model, asyncio.get_running_loop().create_future())
+            self._pending[key] = request
+            self._queue.put_nowait((priority, next(self._sequence), request))
+        request.waiters += 1
+        try:
+            # the shield keeps the request alive if only one of the coalesced callers is cancelled
+            return await asyncio.shield(request.future)
+        finally:
+            request.waiters -= 1
+            if request.waiters == 0 and not request.future.done():
+                request.future.cancel()
+                self._forget(request)
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, request = await self._queue.get()
+            if request.future.done():
+                continue
+            if self._bucket is not None:
+                await self._bucket.acquire()
+                if request.future.done():
+                    continue
+            try:
+                response = await loop.run_in_executor(self._executor, self._send, request)
+                if not request.future.done():
+                    request.future.set_result(response)
+            except Exception as e:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            finally:
+                self._forget(request)
+
+    def _send(self, request: _Request) -> str:
+        if request.model is None:
+            return self._llm.send_message(request.message)
+        return self._llm.send_message(request.message, request.model)
+
+    def _forget(self, request: _Request) -> None:
+        if self._pending.get(request.key) is request:
+            del self._pending[request.key]
@@ -2,25 +2,63 @@ from typing import Optional
 from pycaps.ai.gpt import Gpt
 from pycaps.ai.llm_apis import TogetherLlm, GroqLlm, OpenRouterLlm
 from pycaps.ai.llm import Llm
+from pycaps.ai.cached_llm import CachedLlm
+from pycaps.ai.llm_dispatcher import LlmDispatcher
+from pycaps.ai.llm_response_cache import LlmResponseCache
 
 class LlmProvider:
     _llm: Optional[Llm] = None
+    _dispatcher: Optional[LlmDispatcher] = None
+    _cache: Optional[LlmResponseCache] = None
 
     @staticmethod
     def get() -> Llm:
+        """
+        Returns the configured LLM (OpenAI by default, using the PYCAPS_OPENAI_API_KEY environment variable).
+        The responses are cached on disk (see CachedLlm), and the requests are sent through an LlmDispatcher.
+        """
         if LlmProvider._llm is None:
-            raise RuntimeError("No LLM provider has been set.")
+            LlmProvider._configure(Gpt(), use_cache=True)
         return LlmProvider._llm
 
     @staticmethod
-    def set(provider: str, api_key: str):
+    def set(provider: str, api_key: str, use_cache: bool = True, max_in_flight: int = 4, requests_per_second: Optional[float] = None):
+        """
+        Args:
+            provider: One of "openai", "together", "groq" or "openrouter".
+            api_key: The API key of the provider (ignored for "openai", it uses PYCAPS_OPENAI_API_KEY).
+            use_cache: Whether to cache the responses on disk.
+            max_in_flight: Maximum number of requests sent to the provider at the same time.
+            requests_per_second: (Optional) Maximum rate of requests sent to the provider.
+        """
         if provider == "openai":
-            LlmProvider._llm = Gpt()
+            llm = Gpt()
         elif provider == "together":
-            LlmProvider._llm = TogetherLlm(api_key)
+            llm = TogetherLlm(api_key)
         elif provider == "groq":
-            LlmProvider._llm = GroqLlm(api_key)
+            llm = GroqLlm(api_key)
         elif provider == "openrouter":
-            LlmProvider._llm = OpenRouterLlm(api_key)
+            llm = OpenRouterLlm(api_key)
         else:
             raise ValueError(f"Unknown LLM provider: {provider}")
+        LlmProvider._configure(llm, use_cache, max_in_flight, requests_per_second)
+
+    @staticmethod
+    def get_dispatcher() -> LlmDispatcher:
+        """Returns the dispatcher of the configured LLM, to submit messages asynchronously (note: it doesn't use the cache)."""
+        LlmProvider.get()
+        return LlmProvider._dispatcher
+
+    @staticmethod
+    def get_cache() -> LlmResponseCache:
+        """Returns the LLM responses cache (shared by all the providers)."""
+        if LlmProvider._cache is None:
+            LlmProvider._cache = LlmResponseCache()
+        return LlmProvider._cache
+
+    @staticmethod
+    def _configure(llm: Llm, use_cache: bool, max_in_flight: int = 4, requests_per_second: Optional[float] = None) -> None:
+        if LlmProvider._dispatcher is not None:
+            LlmProvider._dispatcher.close()
+        LlmProvider._dispatcher = LlmDispatcher(llm, max_in_flight, requests_per_second)
+        LlmProvider._llm = CachedLlm(LlmProvider._dispatcher, LlmProvider.get_cache()) if use_cache else LlmProvider._dispatcher
@@ -0,0 +1,124 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+from pycaps.logger import logger
+
+class LlmResponseCache:
+    """
+    Disk cache of LLM responses, shared by all the providers (see CachedLlm).
+
+    The responses are stored in a SQLite database, indexed by a hash of (provider, model, prompt).
+    SQLite handles the locking, so the cache can be used by concurrent threads and processes.
+    Expired entries (older than ttl_seconds) are ignored, and when the total size of the responses
+    exceeds max_size_bytes, the least recently used entries are removed.
+    """
+
+    CACHE_DIR = Path.home() / ".pycaps" / "cache" / "llm"
+    DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+    DEFAULT_MAX_SIZE_BYTES = 50 * 1024 * 1024
+
+    def __init__(self, path: Optional[Path] = None, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES):
+        self._path = path or (self.CACHE_DIR / "responses.sqlite")
+        self._ttl_seconds = ttl_seconds
+        self._max_size_bytes = max_size_bytes
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @staticmethod
+    def get_key(provider: str, model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{provider}\0{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with self._connect() as connection:
+                row = connection.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and time.time() - row[1] <= self._ttl_seconds:
+                    connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                    self._count(hit=True)
+                    return row[0]
+        except sqlite3.Error as e:
+            logger().warning(f"Unable to read the LLM cache {self._path}: {e}")
+        self._count(hit=False)
+        return None
+
+    def save(self, key: str, response: str) -> None:
+        now = time.time()
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, response, len(response.encode("utf-8")), now, now),
+                )
+                self._evict(connection, now)
+        except sqlite3.Error as e:
+            logger().warning(f"Unable to write the LLM cache {self._path}: {e}")
+
+    def clear(self) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM responses")
+
+    def get_hits(self) -> int:
+        return self._hits
+
+    def get_misses(self) -> int:
+        return self._misses
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        connection.execute("DELETE FROM responses WHERE created_at < ?", (now - self._ttl_seconds,))
+        total_size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size <= self._max_size_bytes:
+            return
+        # the least recently used entries are removed until the cache fits in its size limit
+        removed_size = 0
+        keys_to_remove = []
+        for key, size in connection.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total_size - removed_size <= self._max_size_bytes:
+                break
+            keys_to_remove.append((key,))
+            removed_size += size
+        connection.executemany("DELETE FROM responses WHERE key = ?", keys_to_remove)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self._initialize()
+        connection = sqlite3.connect(self._path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _initialize(self) -> None:
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self._path, timeout=30)
+            try:
+                # WAL mode allows readers while another process is writing
+                connection.execute("PRAGMA journal_mode=WAL")
+                with connection:
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS responses ("
+                        "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+                        "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                    )
+                    connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            finally:
+                connection.close()
+            self._initialized = True
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
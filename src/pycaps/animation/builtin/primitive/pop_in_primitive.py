@@ -1,3 +1,4 @@
+import numpy as np
 from typing import Tuple, Callable, Optional
 from ...definitions import Transformer, OvershootConfig
 from ...primitive_animation import PrimitiveAnimation
@@ -35,17 +36,17 @@ class PopInPrimitive(PrimitiveAnimation):
             peak_at = self._overshoot.peak_at if self._overshoot is not None else 1.0
             overshoot_scale = 1 + self._overshoot.amount if self._overshoot is not None else 1.0
 
-            if t < self._min_scale_at:
-                progress = t / self._min_scale_at
-                return self._init_scale + (self._min_scale - self._init_scale) * progress
-            elif self._min_scale_at < t < peak_at:
-                progress = (t - self._min_scale_at) / (peak_at - self._min_scale_at)
-                return self._min_scale + (overshoot_scale - self._min_scale) * progress
-            elif peak_at < t < 1.0:
-                progress = (t - peak_at) / (1.0 - peak_at) if peak_at != 1.0 else 1.0
-                return overshoot_scale + (1.0 - overshoot_scale) * progress
-            else:
-                return 1.0
+            # all the phases are computed (t can be an array), and np.select picks the right one for each t
+            with np.errstate(divide='ignore', invalid='ignore'):
+                shrinking = self._init_scale + (self._min_scale - self._init_scale) * (t / self._min_scale_at)
+                growing = self._min_scale + (overshoot_scale - self._min_scale) * ((t - self._min_scale_at) / (peak_at - self._min_scale_at))
+                settling_progress = (t - peak_at) / (1.0 - peak_at) if peak_at != 1.0 else 1.0
+                settling = overshoot_scale + (1.0 - overshoot_scale) * settling_progress
+            return np.select(
+                [t < self._min_scale_at, (self._min_scale_at < t) & (t < peak_at), (peak_at < t) & (t < 1.0)],
+                [shrinking, growing, settling],
+                1.0,
+            )
 
         def get_position(t: float) -> Tuple[float, float]:
             scale = get_size_factor(t)
@@ -2,6 +2,7 @@ from ...primitive_animation import PrimitiveAnimation
 from ...definitions import Direction, OvershootConfig, Transformer
 from pycaps.common import WordClip
 from typing import Tuple, Callable, Optional
+import numpy as np
 
 class SlideInPrimitive(PrimitiveAnimation):
     def __init__(
@@ -26,16 +27,17 @@ class SlideInPrimitive(PrimitiveAnimation):
                 return self._distance * (t-1)
             
             overshoot_distance = self._distance * self._overshoot.amount
-            if t < self._overshoot.peak_at:
+            with np.errstate(divide='ignore', invalid='ignore'):
                 progress = t / self._overshoot.peak_at
                 start_offset = -(self._distance)
                 target_offset = overshoot_distance
-                return start_offset + (target_offset - start_offset) * progress
-            else:
+                approaching = start_offset + (target_offset - start_offset) * progress
+
                 progress = (t - self._overshoot.peak_at) / (1.0 - self._overshoot.peak_at)
                 start_offset = overshoot_distance
                 target_offset = 0
-                return start_offset + (target_offset - start_offset) * progress
+                settling = start_offset + (target_offset - start_offset) * progress
+            return np.where(t < self._overshoot.peak_at, approaching, settling)
                 
         def get_position(t: float) -> Tuple[float, float]:
             current_displacement = get_displacement(t)
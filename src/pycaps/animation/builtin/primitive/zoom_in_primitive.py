@@ -1,6 +1,7 @@
 from pycaps.common import WordClip
 from pycaps.layout import LayoutUtils
 from typing import Tuple, Callable, Optional
+import numpy as np
 from ...definitions import Transformer, OvershootConfig
 from ...primitive_animation import PrimitiveAnimation
 
@@ -35,16 +36,17 @@ class ZoomInPrimitive(PrimitiveAnimation):
             if self._overshoot is None:
                 return self._init_scale + (1.0 - self._init_scale) * t
             
-            if t < self._overshoot.peak_at:
+            with np.errstate(divide='ignore', invalid='ignore'):
                 progress = t / self._overshoot.peak_at
                 start_offset = self._init_scale
                 target_offset = 1 + self._overshoot.amount
-                return start_offset + (target_offset - start_offset) * progress
-            
-            progress = (t - self._overshoot.peak_at) / (1.0 - self._overshoot.peak_at)
-            start_offset = 1 + self._overshoot.amount
-            target_offset = 1
-            return start_offset - (start_offset - target_offset) * progress
+                growing = start_offset + (target_offset - start_offset) * progress
+
+                progress = (t - self._overshoot.peak_at) / (1.0 - self._overshoot.peak_at)
+                start_offset = 1 + self._overshoot.amount
+                target_offset = 1
+                settling = start_offset - (start_offset - target_offset) * progress
+            return np.where(t < self._overshoot.peak_at, growing, settling)
 
         def get_position(t: float) -> Tuple[float, float]:
             progress = get_size_factor(t)
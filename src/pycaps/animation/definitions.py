@@ -15,6 +15,7 @@ class OvershootConfig(BaseModel):
     peak_at: float = 0.7
 
 class Transformer:
+    # easing functions: they receive the progress (0 to 1) as a float or as a numpy array
     LINEAR = lambda t: t
     EASE_IN = lambda t: t**2
     EASE_OUT = lambda t: 1 - (1 - t)**2
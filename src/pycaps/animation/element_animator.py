@@ -1,7 +1,8 @@
-from typing import Optional, List
-from pycaps.common import ElementType, EventType, Document, WordClip
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from pycaps.common import ElementType, EventType, Document, DocumentTimeIndex
 from pycaps.tag import TagCondition
-from pycaps.selector import WordClipSelector
+from pycaps.selector import TimeEventSelector
 from .animation import Animation
 
 class ElementAnimator:
@@ -13,40 +14,71 @@ class ElementAnimator:
         self._tag_condition: Optional[TagCondition] = tag_condition
 
     def run(self, document: Document) -> None:
-        clips = self._filter_clips(document)
-        for clip in clips:
-            offset = self.__get_time_offset(clip)
-            self._animation.run(clip, offset, self._what)
+        clip_indices, offsets = self.select(document)
+        clips = document.get_time_index().get_clips()
+        for clip_index, offset in zip(clip_indices, offsets):
+            self._animation.run(clips[clip_index], float(offset), self._what)
 
-    def _filter_clips(self, document: Document) -> List[WordClip]:
-        selector = WordClipSelector().filter_by_time(self._when, self._what, self._animation._duration, self._animation._delay)
+    @staticmethod
+    def run_all(animators: List['ElementAnimator'], document: Document) -> None:
+        """
+        Runs all the animators in a single pass over the clips.
+        The clips of every animator are selected first, sharing the document indexes (each tag condition is evaluated once),
+        and then each clip receives all its animations, in the same order as the animators list.
+        The result is the same as calling run() for each animator.
+        """
+        if not animators:
+            return
+        tag_matches: Dict[int, np.ndarray] = {}
+        selections = [animator.select(document, tag_matches) for animator in animators]
+        clip_indices = np.concatenate([clip_indices for clip_indices, _ in selections])
+        offsets = np.concatenate([offsets for _, offsets in selections])
+        animator_indices = np.repeat(np.arange(len(animators)), [len(clip_indices) for clip_indices, _ in selections])
+        # the sort is stable, so the animations of each clip keep the order of the animators (the order of the transforms matters)
+        order = np.argsort(clip_indices, kind="stable")
+        clips = document.get_time_index().get_clips()
+        for clip_index, animator_index, offset in zip(clip_indices[order].tolist(), animator_indices[order].tolist(), offsets[order].tolist()):
+            animator = animators[animator_index]
+            animator._animation.run(clips[clip_index], offset, animator._what)
+
+    def select(self, document: Document, tag_matches: Optional[Dict[int, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the positions of the clips to animate (in the document time index) and the time offset of the animation for each one.
+
+        Args:
+            document: The document to animate.
+            tag_matches: (Optional) Cache of TagCondition.evaluate_document() results (by id of the condition),
+                shared by several animators to evaluate each condition once.
+        """
+        index = document.get_time_index()
+        clip_indices = self._filter_clips(document, tag_matches)
+        return clip_indices, self.__get_time_offsets(index, clip_indices)
+
+    def _filter_clips(self, document: Document, tag_matches: Optional[Dict[int, np.ndarray]] = None) -> np.ndarray:
+        index = document.get_time_index()
+        selector = TimeEventSelector(self._when, self._what, self._animation._duration, self._animation._delay)
+        clip_indices = selector.select_indices(index, np.arange(len(index.get_clips())))
         if self._tag_condition:
-            selector = selector.filter_by_tag(self._tag_condition)
-        return selector.select(document)
+            word_matches = self._get_tag_matches(document, tag_matches)
+            clip_words = index.get_clip_parents(ElementType.WORD)[clip_indices]
+            clip_indices = clip_indices[word_matches[clip_words]]
+        return clip_indices
+
+    def _get_tag_matches(self, document: Document, tag_matches: Optional[Dict[int, np.ndarray]]) -> np.ndarray:
+        if tag_matches is None:
+            return self._tag_condition.evaluate_document(document, ElementType.WORD)
+        key = id(self._tag_condition)
+        if key not in tag_matches:
+            tag_matches[key] = self._tag_condition.evaluate_document(document, ElementType.WORD)
+        return tag_matches[key]
 
-    def __get_time_offset(self, clip: WordClip) -> float:
+    def __get_time_offsets(self, index: DocumentTimeIndex, clip_indices: np.ndarray) -> np.ndarray:
+        clip_starts = index.get_clip_times()[0][clip_indices]
+        parents = index.get_clip_parents(self._what)[clip_indices]
         if self._when == EventType.ON_NARRATION_STARTS:
-            return self.__get_on_start_offset(clip)
+            start_times = index.get_starts(self._what)[parents]
+            return clip_starts - start_times - self._animation._delay
         elif self._when == EventType.ON_NARRATION_ENDS:
-            return self.__get_on_end_offset(clip)
-    
-    def __get_on_start_offset(self, clip: WordClip) -> float:
-        start_time = 0
-        if self._what == ElementType.WORD:
-            start_time = clip.get_word().time.start
-        elif self._what == ElementType.LINE:
-            start_time = clip.get_line().time.start
-        elif self._what == ElementType.SEGMENT:
-            start_time = clip.get_segment().time.start
-
-        return clip.media_clip.start - start_time - self._animation._delay
-
-    def __get_on_end_offset(self, clip: WordClip) -> float:
-        end_time = 0
-        if self._what == ElementType.WORD:
-            end_time = clip.get_word().time.end
-        elif self._what == ElementType.LINE:
-            end_time = clip.get_line().time.end
-        elif self._what == ElementType.SEGMENT:
-            end_time = clip.get_segment().time.end
-        return -(end_time - self._animation._duration - self._animation._delay - clip.media_clip.start)
+            end_times = index.get_ends(self._what)[parents]
+            return -(end_times - self._animation._duration - self._animation._delay - clip_starts)
+        raise ValueError(f"Unsupported event type: {self._when}")
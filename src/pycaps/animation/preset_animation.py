@@ -1,16 +1,20 @@
 from pycaps.common import ElementType, WordClip
-from typing import List
+from typing import List, Optional
 from .animation import Animation
 from abc import abstractmethod
 
 class PresetAnimation(Animation):
     def __init__(self, duration: float, delay: float = 0.0) -> None:
         super().__init__(duration, delay)
+        self._animations: Optional[List[Animation]] = None
 
     @abstractmethod
     def _build_animations(self) -> List[Animation]:
         pass
 
     def run(self, clip: WordClip, offset: float, what: ElementType) -> None:
-        for animation in self._build_animations():
+        # the animations only depend on the preset parameters, so they are built once and reused for all the clips
+        if self._animations is None:
+            self._animations = self._build_animations()
+        for animation in self._animations:
             animation.run(clip, offset, what)
@@ -1,3 +1,4 @@
+import numpy as np
 from typing import Tuple, Callable, Optional
 from pycaps.common import WordClip, ElementType
 from .definitions import Transformer
@@ -24,6 +25,10 @@ class PrimitiveAnimation(Animation):
 
     def run(self, clip: WordClip, offset: float, what: ElementType) -> None:
         self._what = what
+        # the same animation runs for many clips, so the transforms of the previous clip are discarded
+        self._position_transform = None
+        self._size_transform = None
+        self._opacity_transform = None
         self._apply_animation(clip, offset)
 
         # apply transforms in order (order is important)
@@ -31,14 +36,22 @@ class PrimitiveAnimation(Animation):
         if self._position_transform: self._position_transform()
         if self._opacity_transform: self._opacity_transform()
 
+    # The transforms receive a time (float) or an array of times (when the media clip is baked, see MediaElement.bake()),
+    # so the get_*_fn functions must support numpy arrays too.
+
     def _apply_position(self, clip: WordClip, offset: float, get_position_fn: Callable[[float], Tuple[float, float]]) -> None:
         old_position_transform = clip.media_clip.position
         def transform() -> None:
             def new_position_transform(t):
-                if t + offset < 0 or t + offset > self._duration:
+                outside = (t + offset < 0) | (t + offset > self._duration)
+                if np.ndim(t) == 0 and outside:
                     return old_position_transform(t)
-                
-                return get_position_fn(self._normalice_time(t + offset))
+
+                x, y = get_position_fn(self._normalice_time(t + offset))
+                if np.ndim(t) == 0 or not np.any(outside):
+                    return x, y
+                old_x, old_y = old_position_transform(t)
+                return np.where(outside, old_x, x), np.where(outside, old_y, y)
 
             clip.media_clip.set_position(new_position_transform)
         
@@ -48,10 +61,12 @@ class PrimitiveAnimation(Animation):
         old_scale_transform = clip.media_clip.scale
         def transform() -> None:
             def new_scale_tranform(t):
-                if t + offset < 0: # or t + offset > self._duration:
+                outside = t + offset < 0 # or t + offset > self._duration
+                if np.ndim(t) == 0 and outside:
                     return old_scale_transform(t)
-                
-                return get_resize_fn(self._normalice_time(t + offset))
+
+                scale = get_resize_fn(self._normalice_time(t + offset))
+                return np.where(outside, old_scale_transform(t), scale) if np.ndim(t) > 0 and np.any(outside) else scale
 
             clip.media_clip.set_scale(new_scale_tranform)
         
@@ -61,10 +76,12 @@ class PrimitiveAnimation(Animation):
         old_opacity_transform = clip.media_clip.opacity
         def transform() -> None:
             def new_opacity_transform(t):
-                if t + offset < 0: #or t + offset > self._duration:
+                outside = t + offset < 0 #or t + offset > self._duration
+                if np.ndim(t) == 0 and outside:
                     return old_opacity_transform(t)
-                
-                return get_opacity_fn(self._normalice_time(t + offset))
+
+                opacity = get_opacity_fn(self._normalice_time(t + offset))
+                return np.where(outside, old_opacity_transform(t), opacity) if np.ndim(t) > 0 and np.any(outside) else opacity
 
             clip.media_clip.set_opacity(new_opacity_transform)
         
@@ -73,14 +90,18 @@ class PrimitiveAnimation(Animation):
     def _normalice_time(self, t: float) -> float:
         '''
         Normalize the time to be between 0 and 1 using the duration of the animation
-        And apply the easing function to the time
+        And apply the easing function to the time (t can be a float or a numpy array)
         '''
         if self._duration == 0:
             raise ValueError("Animation duration can't be 0")
         
-        normalice = lambda n: min(1, max(0, n))
-        progress = normalice(t / self._duration)
-        return normalice(self._apply_transformer(progress))
+        if np.ndim(t) == 0:
+            normalice = lambda n: min(1, max(0, n))
+            progress = normalice(t / self._duration)
+            return normalice(self._apply_transformer(progress))
+
+        progress = np.clip(t / self._duration, 0, 1)
+        return np.clip(self._apply_transformer(progress), 0, 1)
 
     def _apply_transformer(self, t: float) -> float:
         if not isinstance(self._transformer, Callable):    
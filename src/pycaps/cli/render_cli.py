@@ -1,8 +1,9 @@
 import typer
+import os
 from typing import Optional
 from pycaps.logger import set_logging_level
 import logging
-from pycaps.pipeline import JsonConfigLoader
+from pycaps.pipeline import JsonConfigLoader, SubtitleDataFormat
 from pycaps.common import VideoQuality
 from pycaps.layout import VerticalAlignmentType, SubtitleLayoutOptions
 from pycaps.template import TemplateLoader, DEFAULT_TEMPLATE_NAME, TemplateFactory
@@ -31,6 +32,13 @@ def _parse_preview(preview: bool, preview_time: Optional[str]) -> Optional[tuple
         return None
     return final_preview
 
+def _read_script(script_path: str) -> str:
+    if not os.path.exists(script_path):
+        typer.echo(f"Error: Script file not found: {script_path}", err=True)
+        raise typer.Exit(code=1)
+    with open(script_path, "r", encoding="utf-8") as f:
+        return f.read()
+
 def _build_layout_options(builder, align, offset) -> SubtitleLayoutOptions:
     original_layout = builder._caps_pipeline._layout_options # TODO: fix this
     original_vertical_align = original_layout.vertical_align
@@ -55,12 +63,18 @@ def render(
 
     language: Optional[str] = typer.Option(None, "--lang", help="Language of the video, example: --lang=en", rich_help_panel="Whisper", show_default=False),
     whisper_model: Optional[str] = typer.Option(None, "--whisper-model", help="Whisper model to use, example: --whisper-model=base", rich_help_panel="Whisper", show_default=False),
+    script: Optional[str] = typer.Option(None, "--script", help="Text file with the script of the video. If provided, the script is aligned to the audio instead of transcribing it", rich_help_panel="Whisper", show_default=False),
+    skip_silences: bool = typer.Option(False, "--skip-silences", help="Detect the speech regions before transcribing, so silences and music are not sent to Whisper", rich_help_panel="Whisper"),
 
     video_quality: Optional[VideoQuality] = typer.Option(None, "--video-quality", help="Final video quality", rich_help_panel="Video", show_default=False),
+    streaming: Optional[int] = typer.Option(None, "--streaming", help="Encode the video while the subtitles are generated, by windows of the given number of segments, example: --streaming=5. It uses less memory on long videos", rich_help_panel="Video", show_default=False),
 
     preview: bool = typer.Option(False, "--preview", help="Generate a low quality preview of the rendered video", rich_help_panel="Utils"),
     preview_time: Optional[str] = typer.Option(None, "--preview-time", help="Generate a low quality preview of the rendered video at the given time, example: --preview-time=10,15", rich_help_panel="Utils", show_default=False),
+    captions: Optional[str] = typer.Option(None, "--captions", help="Caption file (.srt, .vtt or Whisper .json). If provided, it's used instead of transcribing the audio", rich_help_panel="Utils", show_default=False),
+    no_transcription_cache: bool = typer.Option(False, "--no-transcription-cache", help="Always transcribe the video, ignoring (and not saving) cached transcriptions", rich_help_panel="Utils"),
     subtitle_data: Optional[str] = typer.Option(None, "--subtitle-data", help="Subtitle data file path. If provided, the rendering process will skip the transcription and tagging steps", rich_help_panel="Utils", show_default=False),
+    subtitle_data_format: Optional[SubtitleDataFormat] = typer.Option(None, "--subtitle-data-format", help="Format of the subtitle data file saved next to the output video. The binary format is faster to save and load", rich_help_panel="Utils", show_default=False),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose mode", rich_help_panel="Utils"),
 ):
     set_logging_level(logging.DEBUG if verbose else logging.INFO)
@@ -83,10 +97,16 @@ def render(
     if style: builder.add_css_content(_parse_styles(style))
     # TODO: this has a little issue (if you set lang via js + whisper model by cli, it will change the lang to None)
     if language or whisper_model: builder.with_whisper_config(language=language, model_size=whisper_model if whisper_model else "base")
+    if script: builder.with_script_alignment(_read_script(script), language=language, model_size=whisper_model if whisper_model else "base")
+    if skip_silences: builder.with_voice_activity_detection()
+    if captions: builder.with_timed_text(captions)
     if subtitle_data: builder.with_subtitle_data_path(subtitle_data)
+    if subtitle_data_format: builder.with_subtitle_data_format(subtitle_data_format)
+    if no_transcription_cache: builder.should_use_transcription_cache(False)
     if transcription_preview: builder.should_preview_transcription(True)
     if video_quality: builder.with_video_quality(video_quality)
+    if streaming: builder.with_streaming(window_size=streaming)
     if layout_align or layout_align_offset: builder.with_layout_options(_build_layout_options(builder, layout_align, layout_align_offset))
 
-    pipeline = builder.build(preview_time=_parse_preview(preview, preview_time))
+    pipeline = builder.build(preview_time=_parse_preview(preview, preview_time), transcribe_preview=preview_time is not None)
     pipeline.run()
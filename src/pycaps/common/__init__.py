@@ -19,7 +19,10 @@ from .types import (
     CacheStrategy
 )
 from .element_container import ElementContainer
+from .document_time_index import DocumentTimeIndex
+from .document_tag_index import DocumentTagIndex
 from .config_service import ConfigService
+from .http_client import HttpClient, HttpRequestMetric
 
 __all__ = [
     "Tag",
@@ -36,8 +39,12 @@ __all__ = [
     "EventType",
     "ElementState",
     "ElementContainer",
+    "DocumentTimeIndex",
+    "DocumentTagIndex",
     "VideoQuality",
     "AspectRatio",
     "ConfigService",
+    "HttpClient",
+    "HttpRequestMetric",
     "CacheStrategy"
 ]
\ No newline at end of file
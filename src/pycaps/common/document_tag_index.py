@@ -0,0 +1,89 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, TYPE_CHECKING
+from .types import ElementType
+
+if TYPE_CHECKING:
+    from .models import Document, Tag
+
+class DocumentTagIndex:
+    """
+    Bitmask view of the tags of a document. Each tag name used in the document is interned to a bit position,
+    and each segment, line and word gets the bitmask of its tags, so tag conditions can be evaluated
+    with integer operations (see TagCondition.compile()) instead of comparing tag names.
+
+    The masks are stored as an array of shape (elements, blocks) of uint64, where the bit i of the mask
+    is the bit (i % 64) of the block (i // 64). The "inherited" masks of the words and lines include the tags of their
+    line and segment (same as Word.get_all_tags_in_document()).
+
+    It's built by Document.get_tag_index() and rebuilt when the document structure changes.
+    Tags are plain sets, so after modifying them call Document.invalidate_tag_index() (the taggers do it).
+    """
+
+    _BLOCK_SIZE = 64
+
+    def __init__(self, document: 'Document'):
+        self._bits: Dict[str, int] = {}
+        segments = list(document.segments)
+        lines = document._get_cached_lines()
+        words = document._get_cached_words()
+
+        segment_bits = [self._intern(segment.structure_tags) for segment in segments]
+        line_bits = [self._intern(line.structure_tags) for line in lines]
+        word_bits = [self._intern(word.structure_tags) + self._intern(word.semantic_tags) for word in words]
+
+        self._blocks = max(1, (len(self._bits) + self._BLOCK_SIZE - 1) // self._BLOCK_SIZE)
+        self._masks = {
+            ElementType.SEGMENT: self._to_masks(segment_bits),
+            ElementType.LINE: self._to_masks(line_bits),
+            ElementType.WORD: self._to_masks(word_bits),
+        }
+
+        line_segment = np.repeat(np.arange(len(segments)), [len(s.lines) for s in segments])
+        word_line = np.repeat(np.arange(len(lines)), [len(l.words) for l in lines])
+        inherited_line_masks = self._masks[ElementType.LINE] | self._masks[ElementType.SEGMENT][line_segment]
+        self._inherited_masks = {
+            ElementType.SEGMENT: self._masks[ElementType.SEGMENT],
+            ElementType.LINE: inherited_line_masks,
+            ElementType.WORD: self._masks[ElementType.WORD] | inherited_line_masks[word_line],
+        }
+
+    def get_bit(self, tag: 'Tag') -> Optional[int]:
+        """Returns the bit position of the tag, or None if no element of the document has it."""
+        return self._bits.get(tag.name)
+
+    def get_blocks(self) -> int:
+        """Number of uint64 blocks of each mask."""
+        return self._blocks
+
+    def get_masks(self, element_type: ElementType, include_inherited: bool = True) -> np.ndarray:
+        """
+        Returns the masks of all the elements of the type, in document order.
+        If include_inherited is True, the words and lines masks include the tags of their line and segment.
+        """
+        masks = self._inherited_masks if include_inherited else self._masks
+        if element_type not in masks:
+            raise ValueError(f"Unsupported element type: {element_type}")
+        return masks[element_type]
+
+    def to_blocks(self, mask: int) -> np.ndarray:
+        """Converts a mask (python int, bit i = tag with bit position i) to its uint64 blocks."""
+        block_mask = (1 << self._BLOCK_SIZE) - 1
+        return np.array([(mask >> (self._BLOCK_SIZE * i)) & block_mask for i in range(self._blocks)], dtype=np.uint64)
+
+    def _intern(self, tags: Iterable['Tag']) -> List[int]:
+        bits = []
+        for tag in tags:
+            bit = self._bits.get(tag.name)
+            if bit is None:
+                bit = len(self._bits)
+                self._bits[tag.name] = bit
+            bits.append(bit)
+        return bits
+
+    def _to_masks(self, elements_bits: List[List[int]]) -> np.ndarray:
+        counts = [len(bits) for bits in elements_bits]
+        rows = np.repeat(np.arange(len(elements_bits)), counts)
+        bits = np.fromiter((bit for bits in elements_bits for bit in bits), dtype=np.int64, count=sum(counts))
+        masks = np.zeros((len(elements_bits), self._blocks), dtype=np.uint64)
+        np.bitwise_or.at(masks, (rows, bits // self._BLOCK_SIZE), np.left_shift(np.uint64(1), (bits % self._BLOCK_SIZE).astype(np.uint64)))
+        return masks
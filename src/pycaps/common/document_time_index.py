@@ -0,0 +1,109 @@
+import numpy as np
+from typing import Dict, List, Optional, Union, TYPE_CHECKING
+from .types import ElementType
+
+if TYPE_CHECKING:
+    from .models import Document, Segment, Line, Word, WordClip
+
+class DocumentTimeIndex:
+    """
+    Columnar view of the times of a document: one NumPy array of starts/ends per element type,
+    plus the index of the parent of each element, so range queries don't need to walk the object graph.
+
+    It's built by Document.get_time_index() and rebuilt automatically when the document structure changes.
+    The word/line/segment times are read when the index is built, while the clip times are read on each call
+    to get_clip_times(), since the media clips are replaced by effects and animations.
+    """
+
+    def __init__(self, document: 'Document'):
+        self._segments: List['Segment'] = list(document.segments)
+        self._lines: List['Line'] = document._get_cached_lines()
+        self._words: List['Word'] = document._get_cached_words()
+        self._clips: List['WordClip'] = document._get_cached_word_clips()
+
+        self._line_segment = np.repeat(np.arange(len(self._segments)), [len(s.lines) for s in self._segments])
+        self._word_line = np.repeat(np.arange(len(self._lines)), [len(l.words) for l in self._lines])
+        self._clip_word = np.repeat(np.arange(len(self._words)), [len(w.clips) for w in self._words])
+        self._clip_positions: Optional[Dict[int, int]] = None
+
+        self._starts = {
+            ElementType.SEGMENT: self._to_array(s.time.start for s in self._segments),
+            ElementType.LINE: self._to_array(l.time.start for l in self._lines),
+            ElementType.WORD: self._to_array(w.time.start for w in self._words),
+        }
+        self._ends = {
+            ElementType.SEGMENT: self._to_array(s.time.end for s in self._segments),
+            ElementType.LINE: self._to_array(l.time.end for l in self._lines),
+            ElementType.WORD: self._to_array(w.time.end for w in self._words),
+        }
+
+    def get_elements(self, element_type: ElementType) -> List[Union['Segment', 'Line', 'Word']]:
+        match element_type:
+            case ElementType.SEGMENT:
+                return self._segments
+            case ElementType.LINE:
+                return self._lines
+            case ElementType.WORD:
+                return self._words
+            case _:
+                raise ValueError(f"Unsupported element type: {element_type}")
+
+    def get_clips(self) -> List['WordClip']:
+        return self._clips
+
+    def get_starts(self, element_type: ElementType) -> np.ndarray:
+        return self._starts[element_type]
+
+    def get_ends(self, element_type: ElementType) -> np.ndarray:
+        return self._ends[element_type]
+
+    def get_line_segments(self) -> np.ndarray:
+        """Index of the segment of each line."""
+        return self._line_segment
+
+    def get_word_lines(self) -> np.ndarray:
+        """Index of the line of each word."""
+        return self._word_line
+
+    def get_clip_parents(self, element_type: ElementType) -> np.ndarray:
+        """Index of the word, line or segment of each clip."""
+        match element_type:
+            case ElementType.WORD:
+                return self._clip_word
+            case ElementType.LINE:
+                return self._word_line[self._clip_word]
+            case ElementType.SEGMENT:
+                return self._line_segment[self._word_line[self._clip_word]]
+            case _:
+                raise ValueError(f"Unsupported element type: {element_type}")
+
+    def get_clip_indices(self, clips: List['WordClip']) -> np.ndarray:
+        """Returns the position of each received clip in get_clips()."""
+        if self._clip_positions is None:
+            self._clip_positions = {id(clip): i for i, clip in enumerate(self._clips)}
+        return np.fromiter((self._clip_positions[id(clip)] for clip in clips), dtype=np.int64, count=len(clips))
+
+    def get_clip_times(self) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the (starts, ends) of the media clips. Clips without media clip get NaN."""
+        starts = np.full(len(self._clips), np.nan)
+        ends = np.full(len(self._clips), np.nan)
+        for i, clip in enumerate(self._clips):
+            if clip.media_clip is not None:
+                starts[i] = clip.media_clip.start
+                ends[i] = clip.media_clip.end
+        return starts, ends
+
+    def get_intersecting(self, element_type: ElementType, start: float, end: float) -> np.ndarray:
+        """Returns a boolean mask of the elements that intersect the [start, end] interval."""
+        return (self._starts[element_type] <= end) & (self._ends[element_type] >= start)
+
+    def get_intersecting_indices(self, element_type: ElementType, start: float, end: float) -> np.ndarray:
+        return np.flatnonzero(self.get_intersecting(element_type, start, end))
+
+    @staticmethod
+    def intervals_intersect(starts1: np.ndarray, ends1: np.ndarray, starts2: np.ndarray, ends2: np.ndarray) -> np.ndarray:
+        """Vectorized version of time_utils.times_intersect()."""
+        return np.maximum(starts1, starts2) <= np.minimum(ends1, ends2)
+
+    def _to_array(self, values) -> np.ndarray:
+        return np.fromiter(values, dtype=np.float64)
@@ -4,45 +4,86 @@ from .models import WordClip, Word, Line, Segment, Document
 E = TypeVar('E', bound=Union[WordClip, Word, Line, Segment])
 
 class ElementContainer(Generic[E]):
-    def __init__(self, parent: Union[WordClip, Word, Line, Segment, Document]):
-        self._elements: List[E] = []
+    __slots__ = ("_elements", "_parent", "_source")
+
+    def __init__(self, parent: Union[WordClip, Word, Line, Segment, Document], source: Optional['ElementContainer[E]'] = None):
+        """
+        Args:
+            parent: The element that owns the container.
+            source: (Optional) If received, the container is a pending clone of source:
+                its elements are cloned from the source elements on the first access.
+        """
+        if source is not None and source._source is not None:
+            # the source is a pending clone too, so we clone directly from its own source
+            source = source._source
+        self._elements: Optional[List[E]] = None if source is not None else []
         self._parent = parent
+        self._source: Optional['ElementContainer[E]'] = source
 
     def set_all(self, elements: List[E]):
         self._elements = elements
+        self._source = None
         for element in self._elements:
-            element._parent = self._parent
+            self._adopt(element)
+        self._invalidate_parent_cache()
 
     def extend(self, elements: List[E]):
-        self._elements.extend(elements)
+        self._get_elements().extend(elements)
         for element in elements:
-            element._parent = self._parent
+            self._adopt(element)
+        self._invalidate_parent_cache()
 
     def add(self, element: E, index: Optional[int] = None):
+        elements = self._get_elements()
         if index is None:
-            index = len(self._elements)
-        self._elements.insert(index, element)
-        element._parent = self._parent
+            index = len(elements)
+        elements.insert(index, element)
+        self._adopt(element)
+        self._invalidate_parent_cache()
 
     def get_all(self) -> Tuple[E, ...]:
-        return tuple(self._elements)
+        return tuple(self._get_elements())
     
     def remove(self, element: E):
-        self._elements.remove(element)
+        self._get_elements().remove(element)
+        self._invalidate_parent_cache()
 
     @overload
     def __getitem__(self, index: int) -> E: ...
     @overload
     def __getitem__(self, index: slice) -> List[E]: ...
     def __getitem__(self, index: Union[int, slice]) -> Union[E, List[E]]:
-        return self._elements[index]
+        return self._get_elements()[index]
 
     def __setitem__(self, index: int, value: E):
-        self._elements[index] = value
-        value.parent = self._parent
+        self._get_elements()[index] = value
+        self._adopt(value)
+        self._invalidate_parent_cache()
 
     def __iter__(self) -> Iterator[E]:
-        return iter(self._elements)
+        return iter(self._get_elements())
     
     def __len__(self) -> int:
+        if self._elements is None:
+            return len(self._source)
         return len(self._elements)
+
+    def _get_elements(self) -> List[E]:
+        if self._elements is None:
+            # the content doesn't change (the clones are equal to the source elements), so the caches are still valid
+            elements = [element._clone() for element in self._source._get_elements()]
+            for element in elements:
+                element._parent = self._parent
+            self._elements = elements
+            self._source = None
+        return self._elements
+
+    def _adopt(self, element: E) -> None:
+        previous_parent = element._parent
+        element._parent = self._parent
+        # if the element is moved from another container, the caches of its previous parent are outdated too
+        if previous_parent is not None and previous_parent is not self._parent:
+            previous_parent._invalidate_cache()
+
+    def _invalidate_parent_cache(self) -> None:
+        self._parent._invalidate_cache()
@@ -0,0 +1,213 @@
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from pycaps.logger import logger
+
+@dataclass(frozen=True)
+class HttpRequestMetric:
+    method: str
+    host: str
+    status_code: Optional[int]  # None if the request failed without a response
+    attempts: int
+    latency: float  # seconds, including the retries and their waits
+
+class HttpClient:
+    """
+    HTTP client shared by the API calls (Pycaps API, LLM providers, downloads).
+
+    All the threads share the same requests.Session, which keeps a (thread-safe) pool of open connections per host,
+    so the consecutive requests to the same host reuse the TCP/TLS connection.
+    Failed requests (connection errors, timeouts, 429 and 5xx responses) are retried with exponential backoff
+    and full jitter, limited by a retry budget shared by all the requests of the client: every request adds
+    retry_budget_ratio tokens (up to retry_budget_max) and every retry takes one, so a failing host
+    doesn't multiply the load with retries.
+    The requests with non-idempotent methods (e.g. POST) are only retried when the server didn't process them:
+    after connection errors (the request was not sent) and 429/503 responses (rejected before processing).
+    After a read timeout or another 5xx response the server could have processed the request
+    (e.g. a paid LLM generation), so it's not sent again unless the caller marks it as idempotent.
+    """
+
+    RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+    # the responses that mean the request was not processed, so even the non-idempotent requests can be retried
+    UNPROCESSED_STATUS_CODES = frozenset({429, 503})
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE"})
+    _MAX_METRICS = 1000
+    _default: Optional['HttpClient'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 120.0,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        retry_budget_ratio: float = 0.2,
+        retry_budget_max: float = 10.0,
+        pool_size: int = 10,
+    ):
+        """
+        Args:
+            connect_timeout: Seconds to wait for the connection to the host.
+            read_timeout: Seconds to wait for each read of the response.
+            max_attempts: Maximum number of attempts of each request (including the first one).
+            backoff_base: Maximum wait (seconds) before the first retry. It's doubled on each retry.
+            backoff_max: Maximum wait (seconds) before any retry.
+            retry_budget_ratio: Retry tokens added by each request.
+            retry_budget_max: Maximum retry tokens (also the initial tokens).
+            pool_size: Maximum open connections kept per host.
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self._timeout = (connect_timeout, read_timeout)
+        self._max_attempts = max_attempts
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._retry_budget_ratio = retry_budget_ratio
+        self._retry_budget_max = retry_budget_max
+        self._retry_tokens = retry_budget_max
+        self._pool_size = pool_size
+        self._session: Optional[requests.Session] = None
+        self._metrics: deque = deque(maxlen=self._MAX_METRICS)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_default() -> 'HttpClient':
+        """Returns the client shared by all pycaps modules."""
+        if HttpClient._default is None:
+            with HttpClient._default_lock:
+                if HttpClient._default is None:
+                    HttpClient._default = HttpClient()
+        return HttpClient._default
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs) -> requests.Response:
+        """
+        Sends the request, retrying it if it fails, and returns the last response (the status is not checked).
+        The kwargs are the ones of requests.Session.request(). If no timeout is received, the client timeouts are used.
+        Raises the last requests exception if no attempt received a response.
+
+        Args:
+            idempotent: Whether the request can be sent again when the server could have processed it
+                (e.g. after a read timeout or a 500 response). By default, it's True only for the idempotent methods
+                (GET, PUT, DELETE, etc.).
+        """
+        kwargs.setdefault("timeout", self._timeout)
+        if idempotent is None:
+            idempotent = method.upper() in self.IDEMPOTENT_METHODS
+        session = self._get_session()
+        self._deposit_retry_tokens()
+        start = time.perf_counter()
+        attempt = 0
+        response: Optional[requests.Response] = None
+        while True:
+            attempt += 1
+            error: Optional[Exception] = None
+            try:
+                response = session.request(method, url, **kwargs)
+            except (ConnectionError, Timeout) as e:
+                error = e
+                response = None
+
+            if error is None and response.status_code not in self.RETRY_STATUS_CODES:
+                break
+            if not idempotent and not self._is_unprocessed(error, response):
+                if error is not None:
+                    self._record(method, url, None, attempt, start)
+                    raise error
+                break
+            if attempt >= self._max_attempts or not self._withdraw_retry_token():
+                if error is not None:
+                    self._record(method, url, None, attempt, start)
+                    raise error
+                break
+
+            wait = self._get_backoff(attempt, response)
+            reason = error if error is not None else f"status {response.status_code}"
+            logger().debug(f"HTTP {method} {url} failed ({reason}), retrying in {wait:.2f}s (attempt {attempt + 1}/{self._max_attempts})")
+            if response is not None:
+                response.close()
+            time.sleep(wait)
+
+        self._record(method, url, response.status_code, attempt, start)
+        return response
+
+    def get_metrics(self) -> List[HttpRequestMetric]:
+        """Returns the metrics of the last requests (oldest first)."""
+        with self._lock:
+            return list(self._metrics)
+
+    def clear_metrics(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    def close(self) -> None:
+        """Closes the open connections. The next request opens new ones."""
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    def _get_session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self._pool_size, pool_maxsize=self._pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def _is_unprocessed(self, error: Optional[Exception], response: Optional[requests.Response]) -> bool:
+        """Returns True if the failed request was not processed by the server, so it can be sent again."""
+        if error is not None:
+            return self._is_connect_error(error)
+        return response.status_code in self.UNPROCESSED_STATUS_CODES
+
+    @staticmethod
+    def _is_connect_error(error: Exception) -> bool:
+        """Returns True if the error happened while connecting, so the request was not sent."""
+        if isinstance(error, ConnectTimeout):
+            return True
+        reason = error.args[0] if error.args else None
+        return isinstance(reason, MaxRetryError) and isinstance(reason.reason, NewConnectionError)
+
+    def _get_backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after is not None:
+            try:
+                return min(max(float(retry_after), 0.0), self._backoff_max)
+            except ValueError:
+                pass  # HTTP dates are not supported, the usual backoff is used
+        # "full jitter": a random wait between 0 and the exponential backoff
+        return random.uniform(0, min(self._backoff_max, self._backoff_base * (2 ** (attempt - 1))))
+
+    def _deposit_retry_tokens(self) -> None:
+        with self._lock:
+            self._retry_tokens = min(self._retry_budget_max, self._retry_tokens + self._retry_budget_ratio)
+
+    def _withdraw_retry_token(self) -> bool:
+        with self._lock:
+            if self._retry_tokens < 1:
+                logger().debug("HTTP retry budget exhausted, the request is not retried")
+                return False
+            self._retry_tokens -= 1
+            return True
+
+    def _record(self, method: str, url: str, status_code: Optional[int], attempts: int, start: float) -> None:
+        metric = HttpRequestMetric(method, urlsplit(url).netloc, status_code, attempts, time.perf_counter() - start)
+        with self._lock:
+            self._metrics.append(metric)
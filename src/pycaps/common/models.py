@@ -5,7 +5,7 @@ from .types import ElementState
 if TYPE_CHECKING:
     from pycaps.video.render import MediaElement, AudioElement
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Tag:
     name: str
 
@@ -16,7 +16,7 @@ class Tag:
     def from_dict(data: dict) -> 'Tag':
         return Tag(name=data["name"])
 
-@dataclass
+@dataclass(slots=True)
 class TimeFragment:
     start: float = 0
     end: float = 0
@@ -28,7 +28,10 @@ class TimeFragment:
     def from_dict(data: dict) -> 'TimeFragment':
         return TimeFragment(start=data["start"], end=data["end"])
 
-@dataclass
+    def copy(self) -> 'TimeFragment':
+        return TimeFragment(start=self.start, end=self.end)
+
+@dataclass(slots=True)
 class Size:
     width: int = 0
     height: int = 0
@@ -40,7 +43,7 @@ class Size:
     def from_dict(data: dict) -> 'Size':
         return Size(width=data["width"], height=data["height"])
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     x: int = 0
     y: int = 0
@@ -52,7 +55,7 @@ class Position:
     def from_dict(data: dict) -> 'Position':
         return Position(x=data["x"], y=data["y"])
 
-@dataclass
+@dataclass(slots=True)
 class ElementLayout:
     position: Position = field(default_factory=Position)
     size: Size = field(default_factory=Size)
@@ -64,14 +67,25 @@ class ElementLayout:
     def from_dict(data: dict) -> 'ElementLayout':
         return ElementLayout(position=Position.from_dict(data["position"]), size=Size.from_dict(data["size"]))
 
+    def copy(self) -> 'ElementLayout':
+        return ElementLayout(
+            position=Position(x=self.position.x, y=self.position.y),
+            size=Size(width=self.size.width, height=self.size.height)
+        )
+
     def get_center(self) -> Position:
         return Position(x=self.position.x + self.size.width / 2, y=self.position.y + self.size.height / 2)
 
 
-# TODO: I should handle caching for methods like get_words.
-#  It should be refreshed automatically when a child is added or removed.
+# Methods like get_words() are cached. The caches are cleared (and the _version counter is increased) by the
+# ElementContainer every time a child is added or removed, for the element that owns the container and all its ancestors.
+# The public getters return a copy of the cached list, so the callers can modify it. The indexes of this package
+# use the _get_cached_*() methods, which return the shared lists (they must not be modified).
+#
+# The _clone() methods copy the element fields, but not its children: the children container of the clone
+# is created pending, and it clones the source children on its first access (see Document.clone()).
 
-@dataclass
+@dataclass(slots=True)
 class WordClip:
     _parent: Optional['Word'] = None
     states: List[ElementState] = field(default_factory=list)
@@ -91,6 +105,10 @@ class WordClip:
     def get_word(self) -> 'Word':
         return self._parent
 
+    def _clone(self) -> 'WordClip':
+        # the media clip is shared: effects and animations replace it instead of modifying it
+        return WordClip(states=list(self.states), media_clip=self.media_clip, layout=self.layout.copy())
+
     def get_line(self) -> 'Line':
         return self._parent.get_line()
     
@@ -100,10 +118,12 @@ class WordClip:
     def get_document(self) -> 'Document':
         return self._parent.get_document()
 
-@dataclass
+@dataclass(slots=True)
 class Word:
     _parent: Optional['Line'] = None
-    _clips: 'ElementContainer[WordClip]' = field(init=False)
+    # created on first access: most words don't have clips until the render step
+    _clips: Optional['ElementContainer[WordClip]'] = field(default=None, init=False, repr=False)
+    _version: int = field(default=0, init=False, repr=False, compare=False)
     text: str = ""
     semantic_tags: Set[Tag] = field(default_factory=set)
     structure_tags: Set[Tag] = field(default_factory=set)
@@ -112,9 +132,6 @@ class Word:
     max_layout: ElementLayout = field(default_factory=ElementLayout)
     time: TimeFragment = field(default_factory=TimeFragment)
 
-    def __post_init__(self):
-        self._clips = ElementContainer(self)
-
     def to_dict(self) -> dict:
         return {
             "clips": [clip.to_dict() for clip in self.clips],
@@ -133,18 +150,23 @@ class Word:
             max_layout=ElementLayout.from_dict(data["max_layout"]),
             time=TimeFragment.from_dict(data["time"])
         )
-        word._clips.set_all([WordClip.from_dict(clip) for clip in data["clips"]])
+        if data["clips"]:
+            word.clips.set_all([WordClip.from_dict(clip) for clip in data["clips"]])
         return word
 
     @property
     def clips(self) -> 'ElementContainer[WordClip]':
+        if self._clips is None:
+            self._clips = ElementContainer(self)
         return self._clips
     
     def get_tags(self) -> Set[Tag]:
         return self.structure_tags | self.semantic_tags
 
     def get_media_clips(self) -> List['MediaElement']:
-        return [clip.media_clip for clip in self.clips]
+        if self._clips is None:
+            return []
+        return [clip.media_clip for clip in self._clips]
 
     def get_line(self) -> 'Line':
         return self._parent
@@ -158,13 +180,32 @@ class Word:
     def get_all_tags_in_document(self) -> Set[Tag]:
         return self.structure_tags | self.semantic_tags | self.get_line().structure_tags | self.get_segment().structure_tags
 
-@dataclass
+    def _clone(self) -> 'Word':
+        word = Word(
+            text=self.text,
+            semantic_tags=set(self.semantic_tags),
+            structure_tags=set(self.structure_tags),
+            max_layout=self.max_layout.copy(),
+            time=self.time.copy()
+        )
+        if self._clips is not None:
+            word._clips = ElementContainer(word, source=self._clips)
+        return word
+
+    def _invalidate_cache(self) -> None:
+        self._version += 1
+        if self._parent is not None:
+            self._parent._invalidate_cache()
+
+@dataclass(slots=True)
 class Line:
     _parent: Optional['Segment'] = None
     _words: 'ElementContainer[Word]' = field(init=False)
     structure_tags: Set[Tag] = field(default_factory=set)
     max_layout: ElementLayout = field(default_factory=ElementLayout)
     time: TimeFragment = field(default_factory=TimeFragment) # TODO: We could calculate it using the words (same for segment)
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    _word_clips_cache: Optional[List[WordClip]] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         self._words = ElementContainer(self)
@@ -200,7 +241,13 @@ class Line:
         return [clip for word in self.words for clip in word.get_media_clips()]
     
     def get_word_clips(self) -> List[WordClip]:
-        return [clip for word in self.words for clip in word.clips]
+        """Returns a new list (the traversal is cached, so the callers can modify the list without affecting it)."""
+        return list(self._get_cached_word_clips())
+
+    def _get_cached_word_clips(self) -> List[WordClip]:
+        if self._word_clips_cache is None:
+            self._word_clips_cache = [clip for word in self.words for clip in word.clips]
+        return self._word_clips_cache
     
     def get_segment(self) -> 'Segment':
         return self._parent
@@ -208,13 +255,27 @@ class Line:
     def get_document(self) -> 'Document':
         return self._parent.get_document()
 
-@dataclass
+    def _clone(self) -> 'Line':
+        line = Line(structure_tags=set(self.structure_tags), max_layout=self.max_layout.copy(), time=self.time.copy())
+        line._words = ElementContainer(line, source=self._words)
+        return line
+
+    def _invalidate_cache(self) -> None:
+        self._version += 1
+        self._word_clips_cache = None
+        if self._parent is not None:
+            self._parent._invalidate_cache()
+
+@dataclass(slots=True)
 class Segment:
     _parent: Optional['Document'] = None
     _lines: 'ElementContainer[Line]' = field(init=False)
     structure_tags: Set[Tag] = field(default_factory=set)
     max_layout: ElementLayout = field(default_factory=ElementLayout)
     time: TimeFragment = field(default_factory=TimeFragment)
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    _words_cache: Optional[List[Word]] = field(default=None, init=False, repr=False, compare=False)
+    _word_clips_cache: Optional[List[WordClip]] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         self._lines = ElementContainer(self)
@@ -251,18 +312,48 @@ class Segment:
         return [clip for line in self.lines for clip in line.get_media_clips()]
     
     def get_word_clips(self) -> List[WordClip]:
-        return [clip for line in self.lines for clip in line.get_word_clips()]
-    
+        """Returns a new list (the traversal is cached, so the callers can modify the list without affecting it)."""
+        return list(self._get_cached_word_clips())
+
     def get_words(self) -> List[Word]:
-        return [word for line in self.lines for word in line.words]
+        """Returns a new list (the traversal is cached, so the callers can modify the list without affecting it)."""
+        return list(self._get_cached_words())
+
+    def _get_cached_word_clips(self) -> List[WordClip]:
+        if self._word_clips_cache is None:
+            self._word_clips_cache = [clip for line in self.lines for clip in line._get_cached_word_clips()]
+        return self._word_clips_cache
+
+    def _get_cached_words(self) -> List[Word]:
+        if self._words_cache is None:
+            self._words_cache = [word for line in self.lines for word in line.words]
+        return self._words_cache
     
     def get_document(self) -> 'Document':
         return self._parent
 
-@dataclass
+    def _clone(self) -> 'Segment':
+        segment = Segment(structure_tags=set(self.structure_tags), max_layout=self.max_layout.copy(), time=self.time.copy())
+        segment._lines = ElementContainer(segment, source=self._lines)
+        return segment
+
+    def _invalidate_cache(self) -> None:
+        self._version += 1
+        self._words_cache = None
+        self._word_clips_cache = None
+        if self._parent is not None:
+            self._parent._invalidate_cache()
+
+@dataclass(slots=True)
 class Document:
     _segments: 'ElementContainer[Segment]' = field(init=False)
     sfxs: List['AudioElement'] = field(default_factory=list)
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    _words_cache: Optional[List[Word]] = field(default=None, init=False, repr=False, compare=False)
+    _lines_cache: Optional[List[Line]] = field(default=None, init=False, repr=False, compare=False)
+    _word_clips_cache: Optional[List[WordClip]] = field(default=None, init=False, repr=False, compare=False)
+    _time_index: Optional['DocumentTimeIndex'] = field(default=None, init=False, repr=False, compare=False)
+    _tag_index: Optional['DocumentTagIndex'] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         self._segments = ElementContainer(self)
@@ -284,15 +375,79 @@ class Document:
         return [clip for segment in self.segments for clip in segment.get_media_clips()]
 
     def get_word_clips(self) -> List[WordClip]:
-        return [clip for segment in self.segments for clip in segment.get_word_clips()]
-    
+        """Returns a new list (the traversal is cached, so the callers can modify the list without affecting it)."""
+        return list(self._get_cached_word_clips())
+
     def get_words(self) -> List[Word]:
-        return [word for segment in self.segments for word in segment.get_words()]
-    
+        """Returns a new list (the traversal is cached, so the callers can modify the list without affecting it)."""
+        return list(self._get_cached_words())
+
     def get_lines(self) -> List[Line]:
-        return [line for segment in self.segments for line in segment.lines]
+        """Returns a new list (the traversal is cached, so the callers can modify the list without affecting it)."""
+        return list(self._get_cached_lines())
+
+    def _get_cached_word_clips(self) -> List[WordClip]:
+        if self._word_clips_cache is None:
+            self._word_clips_cache = [clip for segment in self.segments for clip in segment._get_cached_word_clips()]
+        return self._word_clips_cache
+
+    def _get_cached_words(self) -> List[Word]:
+        if self._words_cache is None:
+            self._words_cache = [word for segment in self.segments for word in segment._get_cached_words()]
+        return self._words_cache
+
+    def _get_cached_lines(self) -> List[Line]:
+        if self._lines_cache is None:
+            self._lines_cache = [line for segment in self.segments for line in segment.lines]
+        return self._lines_cache
     
     def get_text(self) -> str:
         return ' '.join([segment.get_text() for segment in self.segments])
 
-from .element_container import ElementContainer
\ No newline at end of file
+    def clone(self) -> 'Document':
+        """
+        Returns an independent copy of the document, so a stage can modify it without changing this one.
+        The copy is lazy: segments, lines, words and clips are copied level by level when they are first accessed
+        in the clone, so cloning is O(1) and the cost is proportional to the part of the clone that is used.
+        IMPORTANT: while the clone has parts not accessed yet, they are read from this document, so this document
+        must not be modified after cloning it (clone it again for each independent use instead).
+        """
+        document = Document(sfxs=list(self.sfxs))
+        document._segments = ElementContainer(document, source=self._segments)
+        return document
+
+    def get_time_index(self) -> 'DocumentTimeIndex':
+        """
+        Returns the columnar time index of the document (built on first use, and rebuilt after structural changes).
+        If the times of existing words/lines/segments are modified, call invalidate_time_index().
+        """
+        if self._time_index is None:
+            self._time_index = DocumentTimeIndex(self)
+        return self._time_index
+
+    def invalidate_time_index(self) -> None:
+        self._time_index = None
+
+    def get_tag_index(self) -> 'DocumentTagIndex':
+        """
+        Returns the tag bitmasks of the document (built on first use, and rebuilt after structural changes).
+        If the tags of existing words/lines/segments are modified, call invalidate_tag_index().
+        """
+        if self._tag_index is None:
+            self._tag_index = DocumentTagIndex(self)
+        return self._tag_index
+
+    def invalidate_tag_index(self) -> None:
+        self._tag_index = None
+
+    def _invalidate_cache(self) -> None:
+        self._version += 1
+        self._words_cache = None
+        self._lines_cache = None
+        self._word_clips_cache = None
+        self._time_index = None
+        self._tag_index = None
+
+from .element_container import ElementContainer
+from .document_time_index import DocumentTimeIndex
+from .document_tag_index import DocumentTagIndex
\ No newline at end of file
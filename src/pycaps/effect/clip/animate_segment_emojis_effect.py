@@ -1,9 +1,8 @@
 from .clip_effect import ClipEffect
-from pycaps.common import Document, WordClip
+from pycaps.common import Document, WordClip, HttpClient
 from pycaps.tag import TagConditionFactory, BuiltinTag
 from pycaps.logger import logger
 import os
-import requests
 import zipfile
 import io
 from pathlib import Path
@@ -24,7 +23,7 @@ class AnimateSegmentEmojisEffect(ClipEffect):
 
         tag_condition = TagConditionFactory.HAS(BuiltinTag.EMOJI_FOR_SEGMENT)
         for word in document.get_words():
-            if not tag_condition.evaluate(list(word.semantic_tags)):
+            if not tag_condition.evaluate(word.semantic_tags):
                 continue
             for clip in word.clips:
                 self.__animate_emoji_if_possible(clip)
@@ -45,7 +44,7 @@ class AnimateSegmentEmojisEffect(ClipEffect):
         self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
         try:
-            response = requests.get(self.ASSETS_ZIP_URL, stream=True)
+            response = HttpClient.get_default().get(self.ASSETS_ZIP_URL, stream=True)
             response.raise_for_status()
 
             total_size_in_bytes = int(response.headers.get('content-length', 0))
@@ -95,7 +94,8 @@ class AnimateSegmentEmojisEffect(ClipEffect):
         if not os.path.isdir(animated_emoji_folder_path):
             return
     
-        clip.media_clip = PngSequenceElement(str(animated_emoji_folder_path), clip.media_clip.start, clip.media_clip.duration)
+        # the frames are decoded and resized once for each emoji (see PngSequenceFrameStore)
+        clip.media_clip = PngSequenceElement(str(animated_emoji_folder_path), clip.media_clip.start, clip.media_clip.duration, height=clip.layout.size.height)
         clip.media_clip.set_position((clip.layout.position.x, clip.layout.position.y))
         clip.media_clip.set_size(height=clip.layout.size.height)
 
@@ -7,27 +7,63 @@ from pycaps.logger import logger
 class TypewritingEffect(ClipEffect):
     """
     Affect that applies a typewriting effect to the words that match the tag condition.
-    This effect creates a new image clip for each letter of the word, so it's slow.
+    The whole word is rendered once, with and without its text, and the letters are revealed one by one
+    over the word box (see RevealImageElement).
+    If the renderer can't measure the letters or render the word box, a new image clip is rendered for each letter of the word (slower).
     """
     def __init__(self, tag_condition: Optional[TagCondition] = None):
         self.tag_condition: Optional[TagCondition] = tag_condition
 
     def run(self, document: Document) -> None:
+        matches = self.tag_condition.evaluate_document(document) if self.tag_condition else None
+        first_word_index = 0
         for line in document.get_lines():
             self._renderer.open_line(line, ElementState.WORD_BEING_NARRATED)
             for i, word in enumerate(line.words):
-                if self.tag_condition and not self.tag_condition.evaluate(list(word.get_all_tags_in_document())):
+                if matches is not None and not matches[first_word_index + i]:
                     continue
                 for clip in word.clips:
                     self._apply_typewriting(i, clip)
             self._renderer.close_line()
+            first_word_index += len(line.words)
 
     def _apply_typewriting(self, word_index: int, clip: WordClip) -> None:
-        from pycaps.video.render import CompositeElement, ImageElement
+        from pycaps.video.render import RevealImageElement
         import numpy as np
 
         if not clip.has_state(ElementState.WORD_BEING_NARRATED):
             return
+        word = clip.get_word()
+        if not word.text:
+            return
+
+        boundaries = self._renderer.get_letter_boundaries(word_index, word, ElementState.WORD_BEING_NARRATED)
+        if not boundaries:
+            self._apply_typewriting_by_letter(word_index, clip)
+            return
+        # the whole word is rendered once, so the line background already has its final width
+        image = self._renderer.render_word(word_index, word, ElementState.WORD_BEING_NARRATED)
+        if not image:
+            return
+        # only the text is revealed: the word box (background, paddings, borders) is shown from the first letter
+        background = self._renderer.render_word_background(word_index, word, ElementState.WORD_BEING_NARRATED)
+        if background is None or background.size != image.size:
+            self._apply_typewriting_by_letter(word_index, clip)
+            return
+        background = np.array(background)
+        if background.shape[2] == 4 and not background[..., 3].any():
+            # nothing behind the text, so the image is just cropped
+            background = None
+
+        word_duration = word.time.end - word.time.start
+        y_position = self._get_fragment_y_position(clip, image.height)
+        clip.media_clip = RevealImageElement(np.array(image), word.time.start, word_duration, boundaries, background)
+        clip.media_clip.set_position((clip.layout.position.x, clip.layout.position.y + y_position))
+
+    def _apply_typewriting_by_letter(self, word_index: int, clip: WordClip) -> None:
+        from pycaps.video.render import CompositeElement, ImageElement
+        import numpy as np
+
         word = clip.get_word()
         number_of_letters = len(word.text)
         word_duration = word.time.end - word.time.start
@@ -37,14 +73,7 @@ class TypewritingEffect(ClipEffect):
             image = self._renderer.render_word(word_index, word, ElementState.WORD_BEING_NARRATED, i+1)
             if not image:
                 continue
-            y_position = 0
-            if clip.layout.size.height != image.height:
-                logger().warning("The fragment height is not equal to the whole word height. This could cause the text to be misaligned.")
-                logger().warning(f"Word height: {clip.layout.size.height} | Fragment height: {image.height}")
-                logger().warning("If this is unexpected, report this issue")
-                logger().warning("As quick fix, try to use another font family or force a line-height/height for each word.")
-                y_position = (clip.layout.size.height - image.height) / 2
-            
+            y_position = self._get_fragment_y_position(clip, image.height)
             image_element = ImageElement(np.array(image), i * letter_duration, letter_duration)
             image_element.set_position((0, y_position))
             new_clips.append(image_element)
@@ -52,3 +81,12 @@ class TypewritingEffect(ClipEffect):
         if len(new_clips) > 0:
             clip.media_clip = CompositeElement(new_clips, word.time.start, word_duration, size=(clip.layout.size.width, clip.layout.size.height))
             clip.media_clip.set_position((clip.layout.position.x, clip.layout.position.y))
+
+    def _get_fragment_y_position(self, clip: WordClip, image_height: int) -> float:
+        if clip.layout.size.height == image_height:
+            return 0
+        logger().warning("The fragment height is not equal to the whole word height. This could cause the text to be misaligned.")
+        logger().warning(f"Word height: {clip.layout.size.height} | Fragment height: {image_height}")
+        logger().warning("If this is unexpected, report this issue")
+        logger().warning("As quick fix, try to use another font family or force a line-height/height for each word.")
+        return (clip.layout.size.height - image_height) / 2
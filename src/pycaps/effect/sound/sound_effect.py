@@ -2,8 +2,8 @@ from ..effect import Effect
 from pycaps.tag import TagCondition
 from typing import Optional
 from .sound import Sound
-from pycaps.common import Document, ElementType, EventType, TimeFragment, Word, Line, Segment
-from typing import List, Union
+from pycaps.common import Document, ElementType, EventType
+import numpy as np
 
 class SoundEffect(Effect):
     def __init__(
@@ -27,48 +27,31 @@ class SoundEffect(Effect):
     def run(self, document: Document) -> None:
         from pycaps.video.render import AudioElement
 
-        times = self._get_elements_times(document)
-        for time in times:
-            path = self._sound.get_file_path()
-            time = time.start + self._offset if self._when == EventType.ON_NARRATION_STARTS else time.end + self._offset
-            audio = AudioElement(path, time, self._volume)
+        path = self._sound.get_file_path()
+        for time in self._get_events_times(document):
+            audio = AudioElement(path, float(time), self._volume)
             document.sfxs.append(audio)
 
-    def _get_elements_times(self, document: Document) -> List[TimeFragment]:
-        elements = self._get_elements(document)
-        elements = self._filter_elements_by_tag(elements)
-        return [element.time for element in elements]
+    def _get_events_times(self, document: Document) -> np.ndarray:
+        index = document.get_time_index()
+        element_indices = self._filter_elements_by_tag(document, len(index.get_elements(self._what)))
+        if self._when == EventType.ON_NARRATION_STARTS:
+            times = index.get_starts(self._what)
+        else:
+            times = index.get_ends(self._what)
+        return times[element_indices] + self._offset
 
-    def _get_elements(self, document: Document) -> List[Union[Word, Line, Segment]]:
-        match self._what:
-            case ElementType.WORD:
-                return document.get_words()
-            case ElementType.LINE:
-                return document.get_lines()
-            case ElementType.SEGMENT:
-                return document.segments
-            case _:
-                raise ValueError(f"Unsupported element type: {self._what}")
-            
-    def _filter_elements_by_tag(self, elements: List[Union[Word, Line, Segment]]) -> List[Union[Word, Line, Segment]]:
+    def _filter_elements_by_tag(self, document: Document, elements_count: int) -> np.ndarray:
+        """Returns the indices of the elements that match the tag condition."""
         if self._tag_condition is None:
-            return elements
+            return np.arange(elements_count)
+        # same as evaluating element.get_tags(): the tags of the parents are not included
+        matches = self._tag_condition.evaluate_document(document, self._what, include_inherited=False)
         if self._what != ElementType.WORD or not self._interpret_consecutive_words_as_one:
-            return [element for element in elements if self._tag_condition.evaluate(element.get_tags())]
-        
-        filtered_words = []
-        consecutive_matched_words = []
-        for word in elements:
-            if self._tag_condition.evaluate(word.get_tags()):
-                consecutive_matched_words.append(word)
-            else:
-                self._append_proper_word_from_consecutive_words(filtered_words, consecutive_matched_words)
-                consecutive_matched_words = []
+            return np.flatnonzero(matches)
 
-        self._append_proper_word_from_consecutive_words(filtered_words, consecutive_matched_words)
-        return filtered_words
-    
-    def _append_proper_word_from_consecutive_words(self, words_accumulator: List[Word], consecutive_words: List[Word]) -> None:
-        if len(consecutive_words) > 0:
-            words_accumulator.append(consecutive_words[0] if self._when == EventType.ON_NARRATION_STARTS else consecutive_words[-1])
-        return words_accumulator
+        # each run of consecutive matched words is considered as one: we keep its first (or last) word
+        padded = np.concatenate(([False], matches, [False]))
+        changes = np.flatnonzero(padded[1:] != padded[:-1])
+        run_starts, run_ends = changes[0::2], changes[1::2] - 1
+        return run_starts if self._when == EventType.ON_NARRATION_STARTS else run_ends
@@ -1,38 +1,132 @@
-from typing import Optional
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from pycaps.common import Document, Segment
 from pycaps.ai import LlmProvider
 from pycaps.utils import ScriptUtils
+from pycaps.logger import logger
 
 class EmojiInSegmentLlmGetter:
-    
-    def __init__(self) -> None:
+    """
+    Gets the emojis of all the segments when start() is called, sending the segments to the LLM in batches
+    (batch_size segments per prompt, max_workers batches at the same time).
+    If the response of a batch can't be parsed, its segments are sent one by one.
+    The results are cached in memory by segment text and script summary (the failed requests are not cached,
+    so they're sent again next time).
+    """
+
+    _CODE_BLOCK_REGEX = re.compile(r"^```(?:json)?\s*|\s*```$")
+    _cache: Dict[Tuple[str, str], Optional[str]] = {}
+    _cache_lock = threading.Lock()
+    _FAILED = object()  # returned instead of the emoji when the LLM request fails
+
+    def __init__(self, batch_size: int = 20, max_workers: int = 4) -> None:
         self._llm = None
         self._summary = ""
+        self._batch_size = batch_size
+        self._max_workers = max_workers
+        self._emojis: Optional[Dict[str, Optional[str]]] = None
 
     def start(self, document: Document) -> None:
         self._llm = LlmProvider.get()
         self._summary = ScriptUtils.get_basic_summary(document.get_text())
-    
+
+        texts = list(dict.fromkeys(segment.get_text() for segment in document.segments))
+        with EmojiInSegmentLlmGetter._cache_lock:
+            self._emojis = {text: self._cache[(self._summary, text)] for text in texts if (self._summary, text) in self._cache}
+        pending_texts = [text for text in texts if text not in self._emojis]
+        batches = [pending_texts[i:i + self._batch_size] for i in range(0, len(pending_texts), self._batch_size)]
+        if not batches:
+            return
+
+        logger().debug(f"Getting emojis for {len(pending_texts)} segments in {len(batches)} LLM requests...")
+        new_emojis: Dict[str, object] = {}
+        with ThreadPoolExecutor(max_workers=min(self._max_workers, len(batches))) as executor:
+            for batch_emojis in executor.map(self._get_batch_emojis, batches):
+                new_emojis.update(batch_emojis)
+        with EmojiInSegmentLlmGetter._cache_lock:
+            for text, emoji in new_emojis.items():
+                if emoji is self._FAILED:
+                    self._emojis[text] = None
+                else:
+                    self._emojis[text] = emoji
+                    self._cache[(self._summary, text)] = emoji
+
     def get_emoji(self, segment: Segment) -> Optional[str]:
-        text = segment.get_text()
-        text_response = self._llm.send_message(
-            prompt=f"""
-            Given the following subtitle text, decide whether it meaningfully conveys an emotion, action, or idea that can be represented with an emoji.
-            If it does you will need to respond with a single, appropriate emoji only.
-
-            Take into account that the subtitle is part of a video script. This is a video script summary:
-            {self._summary}
-
-            Basic guidelines:
-            1. The emoji should be related to subtitle text received.
-            2. Use the video script summary to get better context about the meaning of the words in the subtitle.
-            3. Respond only with the emoji, no other text.
-            4. If the text received doesn't contain any relevant information (e.g. it's too vague, neutral, or generic), respond with "None".
-
-            Subtitle to analyze: "{text}"
-            """
-        )
+        if self._emojis is None:
+            raise RuntimeError("Call start() first.")
+        return self._emojis.get(segment.get_text())
+
+    def _get_batch_emojis(self, texts: List[str]) -> Dict[str, object]:
+        subtitles = "\n".join(f"{index}: {json.dumps(text, ensure_ascii=False)}" for index, text in enumerate(texts))
+        try:
+            text_response = self._llm.send_message(
+                f"""
+                Given the following subtitles, decide for each one whether it meaningfully conveys an emotion, action, or idea that can be represented with an emoji.
+                If it does, choose a single, appropriate emoji for it.
+
+                Take into account that the subtitles are part of a video script. This is a video script summary:
+                {self._summary}
+
+                Basic guidelines:
+                1. Each emoji should be related to its subtitle text.
+                2. Use the video script summary to get better context about the meaning of the words in the subtitles.
+                3. If a subtitle doesn't contain any relevant information (e.g. it's too vague, neutral, or generic), use null instead of an emoji.
+                4. Respond only with a JSON object, no other text. The keys are the subtitle numbers and the values are the emojis (or null).
+                   Example: {{"0": "🚀", "1": null}}
+
+                Subtitles to analyze (number: text):
+                {subtitles}
+                """
+            )
+            emojis = self._parse_batch_response(text_response, len(texts))
+        except Exception as e:
+            logger().warning(f"Unable to get the emojis of {len(texts)} segments in a single LLM request, requesting them one by one. Error: {e}")
+            emojis = {}
+
+        return {text: emojis[index] if index in emojis else self._get_emoji(text) for index, text in enumerate(texts)}
+
+    def _parse_batch_response(self, text_response: str, size: int) -> Dict[int, Optional[str]]:
+        """Returns the emoji of each valid subtitle index of the response. The invalid entries are ignored."""
+        data = json.loads(self._CODE_BLOCK_REGEX.sub("", text_response.strip()))
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected a JSON object, received: {text_response}")
+        emojis = {}
+        for key, emoji in data.items():
+            if not str(key).isdigit() or int(key) >= size:
+                continue
+            if emoji is None or emoji == "None":
+                emojis[int(key)] = None
+            elif isinstance(emoji, str) and emoji.strip():
+                emojis[int(key)] = emoji.strip()
+        return emojis
+
+    def _get_emoji(self, text: str) -> object:
+        """Returns the emoji of the text, None if it has no emoji, or _FAILED if the LLM request fails."""
+        try:
+            text_response = self._llm.send_message(
+                f"""
+                Given the following subtitle text, decide whether it meaningfully conveys an emotion, action, or idea that can be represented with an emoji.
+                If it does you will need to respond with a single, appropriate emoji only.
+
+                Take into account that the subtitle is part of a video script. This is a video script summary:
+                {self._summary}
+
+                Basic guidelines:
+                1. The emoji should be related to subtitle text received.
+                2. Use the video script summary to get better context about the meaning of the words in the subtitle.
+                3. Respond only with the emoji, no other text.
+                4. If the text received doesn't contain any relevant information (e.g. it's too vague, neutral, or generic), respond with "None".
+
+                Subtitle to analyze: "{text}"
+                """
+            )
+        except Exception as e:
+            logger().warning(f"Unable to get the emoji of a segment, ignoring it. Error: {e}")
+            return self._FAILED
         if text_response == "None":
             return None
-        
-        return text_response
\ No newline at end of file
+
+        return text_response
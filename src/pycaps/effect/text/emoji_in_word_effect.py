@@ -20,8 +20,9 @@ class EmojiInWordEffect(TextEffect):
     def run(self, document: Document) -> None:
         last_matching_word: Optional[Word] = None
         last_used_emoji: Optional[str] = None
-        for word in document.get_words():
-            if self._tag_condition.evaluate(list(word.get_all_tags_in_document())):
+        matches = self._tag_condition.evaluate_document(document)
+        for word, matches_condition in zip(document.get_words(), matches):
+            if matches_condition:
                 last_matching_word = word
 
             elif last_matching_word:
@@ -21,6 +21,10 @@ class ModifyWordsEffect(TextEffect):
         self.tag_condition = tag_condition
 
     def run(self, document: Document) -> None:
-        for word in document.get_words():
-            if self.tag_condition and self.tag_condition.evaluate(list(word.get_all_tags_in_document())):
+        if not self.tag_condition:
+            return
+        # the words are copied to a new list, since the modifier could change the document
+        words = list(document.get_words())
+        for word, matches_condition in zip(words, self.tag_condition.evaluate_document(document)):
+            if matches_condition:
                 self.modifier(word)
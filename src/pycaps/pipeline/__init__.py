@@ -1,9 +1,12 @@
 from .caps_pipeline import CapsPipeline
 from .caps_pipeline_builder import CapsPipelineBuilder
 from .json_config_loader import JsonConfigLoader
+from .subtitle_data_service import SubtitleDataService, SubtitleDataFormat
 
 __all__ = [
     "CapsPipeline",
     "CapsPipelineBuilder",
     "JsonConfigLoader",
+    "SubtitleDataService",
+    "SubtitleDataFormat",
 ]
@@ -1,5 +1,10 @@
+import copy
 import time
 import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
 from pycaps.transcriber import AudioTranscriber, WhisperAudioTranscriber, BaseSegmentSplitter
 from pycaps.renderer import SubtitleRenderer, CssSubtitleRenderer
 from pycaps.video import SubtitleClipsGenerator, VideoGenerator
@@ -8,13 +13,12 @@ from pycaps.tag import SemanticTagger, StructureTagger
 from pycaps.animation import ElementAnimator
 from pycaps.layout import SubtitleLayoutOptions
 from pycaps.effect import TextEffect, ClipEffect, SoundEffect
-from pycaps.common import Document, CacheStrategy
-from typing import Optional, List, Tuple
+from pycaps.common import Document, CacheStrategy, TimeFragment, ElementType
+from typing import Dict, Iterator, Optional, List, Tuple
 from pathlib import Path
-from .subtitle_data_service import SubtitleDataService
-from pycaps.transcriber import TranscriptionEditor
+from .subtitle_data_service import SubtitleDataService, SubtitleDataFormat
+from pycaps.transcriber import TranscriptionEditor, TranscriptionCache, CachedTranscription, SpeechMap
 from pycaps.logger import logger, ProcessLogger
-from pycaps.utils import time_utils
 from pycaps.bootstrap import check_dependencies
 import pycaps.api.api_sender as ApiSender
 
@@ -31,14 +35,20 @@ class CapsPipeline:
         self._clip_effects: List[ClipEffect] = []
         self._sound_effects: List[SoundEffect] = []
         self._should_save_subtitle_data: bool = True
+        self._subtitle_data_format: SubtitleDataFormat = SubtitleDataFormat.JSON
         self._subtitle_data_path_for_loading: Optional[str] = None
         self._should_preview_transcription: bool = False
+        self._should_use_transcription_cache: bool = True
         self._layout_options = SubtitleLayoutOptions()
         self._preview_time: Optional[Tuple[float, float]] = None
+        # speech map used by the segment splitters, on the timeline of the whole video (see transcribe())
+        self._speech_map: Optional[SpeechMap] = None
         self._input_video_path: Optional[str] = None
         self._output_video_path: Optional[str] = None
         self._resources_dir: Optional[str] = None
         self._cache_strategy: CacheStrategy = CacheStrategy.CSS_CLASSES_AWARE
+        self._streaming_window_size: Optional[int] = None
+        self._streaming_max_pending_windows: int = 2
 
         # Internal state attributes
         self._video_generator: VideoGenerator = VideoGenerator()
@@ -50,9 +60,24 @@ class CapsPipeline:
         self._video_width: Optional[int] = None
         self._video_height: Optional[int] = None
         self._is_prepared: bool = False
+        self._stage_timings: Dict[str, float] = {}
 
         check_dependencies()
 
+    def get_stage_timings(self) -> Dict[str, float]:
+        """Returns the seconds spent in each stage of the pipeline (accumulated if the stage runs several times)."""
+        return dict(self._stage_timings)
+
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stage_timings[name] = self._stage_timings.get(name, 0.0) + elapsed
+            logger().debug(f"Stage '{name}' finished in {elapsed:.3f}s")
+
     def prepare(self) -> None:
         """
         Initializes the pipeline environment. This method must be called first.
@@ -96,19 +121,136 @@ class CapsPipeline:
         audio transcriber and returns the initial Document object containing
         word-level timestamps.
 
+        Transcriptions are cached per video and transcriber configuration. If the
+        video was already transcribed, the cached document is used (sliced to the
+        preview time, if any). When a preview is generated without a cached
+        transcription, only the preview fragment is transcribed, and the full
+        video is transcribed in background for the next previews.
+
+        If voice activity detection is enabled, the speech map of the video is
+        cached with the transcription, so the segment splitters always receive
+        the same pauses, even when the audio is not extracted.
+
         Returns:
             Document: The transcribed document object.
         """
         if not self._is_prepared:
             raise RuntimeError("Pipeline not prepared. Call prepare() before transcribe().")
 
-        logger().info("Transcribing audio...")
-        document = self._transcriber.transcribe(self._video_generator.get_audio_path())
+        cache = self._get_transcription_cache()
+        cached_transcription = cache.load() if cache else None
+        detector = self._video_generator.get_voice_activity_detector()
+        detector_key = detector.get_cache_key() if detector else None
+        speech_map: Optional[SpeechMap] = None
+        if cached_transcription:
+            logger().info("Using cached transcription...")
+            start, end = self._preview_time if self._preview_time else (0, float("inf"))
+            document = cached_transcription.slice(start, end)
+            if detector:
+                speech_map = cached_transcription.get_speech_map(detector_key)
+                if speech_map is None:
+                    # cached without voice activity detection (or with another configuration), it's added to the cache
+                    _, speech_map = self._video_generator.extract_full_audio()
+                    cache.save(cached_transcription.get_document(), speech_map, detector_key)
+        else:
+            logger().info("Transcribing audio...")
+            if self._preview_time and not self._transcriber.supports_partial_audio():
+                # the whole video is transcribed, and the preview fragment is sliced from it
+                with self._stage("transcription"):
+                    full_document, speech_map = self._transcribe_full_audio()
+                if cache and full_document.segments:
+                    cache.save(full_document, speech_map, detector_key)
+                document = CachedTranscription(full_document).slice(*self._preview_time)
+            else:
+                with self._stage("transcription"):
+                    document = self._transcribe_audio()
+                speech_map = self._video_generator.get_speech_map()
+                if speech_map is not None and self._preview_time:
+                    # the map of the preview fragment is relative to its start, the words were already moved to the video timeline
+                    speech_map = speech_map.shift(self._preview_time[0])
+                elif detector and speech_map is None:
+                    # the transcriber didn't need the audio, but the splitters need the pauses
+                    _, speech_map = self._video_generator.extract_full_audio()
+                if cache and self._preview_time:
+                    self._start_full_transcription_in_background(cache, detector_key)
+                elif cache and document.segments:
+                    cache.save(document, speech_map, detector_key)
+        self._speech_map = speech_map
+
         if not document.segments:
             raise RuntimeError("Transcription returned no segments.")
         
         return document
 
+    def _transcribe_audio(self) -> Document:
+        if self._transcriber.needs_audio():
+            audio = self._video_generator.get_audio()
+        else:
+            audio = np.zeros(0, dtype=np.float32)
+        self._transcriber.set_speech_map(self._video_generator.get_speech_map())
+        document = self._transcriber.transcribe(audio)
+        if self._preview_time and self._transcriber.has_audio_relative_times():
+            # only the preview fragment was transcribed, so the times are relative to its start
+            self._shift_document_times(document, self._preview_time[0])
+        return document
+
+    def _transcribe_full_audio(self) -> Tuple[Document, Optional[SpeechMap]]:
+        """Transcribes the whole video. Returns the document and the speech map of the video (None if VAD is disabled)."""
+        audio, speech_map = np.zeros(0, dtype=np.float32), None
+        if self._transcriber.needs_audio() or self._video_generator.get_voice_activity_detector():
+            full_audio, speech_map = self._video_generator.extract_full_audio()
+            if self._transcriber.needs_audio():
+                audio = full_audio
+        self._transcriber.set_speech_map(speech_map)
+        return self._transcriber.transcribe(audio), speech_map
+
+    def _get_transcription_cache(self) -> Optional[TranscriptionCache]:
+        if not self._should_use_transcription_cache:
+            return None
+        transcriber_key = self._transcriber.get_cache_key()
+        if transcriber_key is None:
+            return None
+        detector = self._video_generator.get_voice_activity_detector()
+        if detector is not None and self._transcriber.needs_audio():
+            # only the detected speech regions are transcribed, so the result depends on the detector configuration
+            transcriber_key = f"{transcriber_key}:{detector.get_cache_key()}"
+        return TranscriptionCache(self._input_video_path, transcriber_key)
+
+    def _start_full_transcription_in_background(self, cache: TranscriptionCache, detector_key: Optional[str]) -> None:
+        """
+        Transcribes the whole video in a background thread and saves it in the cache,
+        so the next previews of this video don't need to call the transcriber.
+        The thread is a daemon: the process doesn't wait for it before exiting (a preview must stay fast),
+        so the transcription is only saved if it finishes while the process is running (e.g. while the preview is rendered).
+        The cache file is written atomically, so an interrupted transcription never leaves a partial file.
+        """
+        # the thread uses its own transcriber (it sets its own speech map), sharing the loaded model
+        transcriber = copy.copy(self._transcriber)
+        video_generator = self._video_generator
+
+        def transcribe_full_video():
+            try:
+                audio, speech_map = video_generator.extract_full_audio()
+                transcriber.set_speech_map(speech_map)
+                cache.save(transcriber.transcribe(audio), speech_map, detector_key)
+                logger().info("Full video transcription finished. Next previews of this video will use it.")
+            except Exception as e:
+                logger().warning(f"Unable to transcribe the full video in background: {e}")
+
+        logger().info("Transcribing the full video in background, so next previews are faster...")
+        threading.Thread(target=transcribe_full_video, name="pycaps-full-transcription", daemon=True).start()
+
+    def _shift_document_times(self, document: Document, offset: float) -> None:
+        if offset == 0:
+            return
+        for segment in document.segments:
+            segment.time = TimeFragment(segment.time.start + offset, segment.time.end + offset)
+            for line in segment.lines:
+                line.time = TimeFragment(line.time.start + offset, line.time.end + offset)
+                for word in line.words:
+                    word.time = TimeFragment(word.time.start + offset, word.time.end + offset)
+        document.invalidate_time_index()
+
     def process_document(self, document: Document) -> Document:
         """
         Applies all processing steps to a transcribed document.
@@ -118,7 +260,7 @@ class CapsPipeline:
         structure and content are finalized before rendering.
 
         Args:
-            document (Document): The document object to process, typically from `transcribe()`.
+            document (Document): The document object to process, typically from `transcribe()`. It's not modified.
 
         Returns:
             Document: The fully processed document, ready for rendering.
@@ -128,26 +270,35 @@ class CapsPipeline:
 
         logger().info("Processing document...")
 
-        # TODO: we should create a document copy to avoid modify received document
+        # the clone is lazy, so only the parts of the document used by the stages are copied
+        document = document.clone()
         self._cut_document_for_preview_time(document)
         
         logger().debug("Running segment splitters...")
-        for splitter in self._segment_splitters:
-            splitter.split(document)
+        with self._stage("segment splitters"):
+            for splitter in self._segment_splitters:
+                splitter.set_speech_map(self._speech_map)
+                splitter.split(document)
 
         logger().debug("Calculating initial word widths for layout...")
-        self._word_size_calculator.calculate(document)
+        with self._stage("word sizes"):
+            self._word_size_calculator.calculate(document)
 
         logger().debug("Splitting segments into lines...")
-        self._line_splitter.split_into_lines(document, self._video_width)
+        with self._stage("line splitting"):
+            self._line_splitter.split_into_lines(document, self._video_width)
 
         logger().debug("Applying structure and semantic tags...")
-        self._structure_tagger.tag(document)
-        self._semantic_tagger.tag(document)
+        with self._stage("tagging"):
+            self._structure_tagger.tag(document)
+            self._semantic_tagger.tag(document)
 
         logger().debug("Applying text effects...")
-        for effect in self._text_effects:
-            effect.run(document)
+        with self._stage("text effects"):
+            for effect in self._text_effects:
+                effect.run(document)
+            # text effects can modify the tags of the words
+            document.invalidate_tag_index()
 
         if self._should_preview_transcription:
             logger().info("Launching transcription editor...")
@@ -157,9 +308,10 @@ class CapsPipeline:
             self._structure_tagger.tag(document)
 
         if self._should_save_subtitle_data:
-            subtitle_data_path = self._output_video_path.replace(".mp4", ".json")
+            extension = SubtitleDataService.BINARY_EXTENSION if self._subtitle_data_format == SubtitleDataFormat.BINARY else ".json"
+            subtitle_data_path = self._output_video_path.replace(".mp4", extension)
             logger().debug(f"Saving subtitle data to {subtitle_data_path}")
-            SubtitleDataService(subtitle_data_path).save(document)
+            SubtitleDataService(subtitle_data_path, self._subtitle_data_format).save(document)
 
         return document
 
@@ -171,7 +323,8 @@ class CapsPipeline:
         and effects, and composites everything into the final video file.
 
         Args:
-            document (Document): The processed document from `process_document()`.
+            document (Document): The processed document from `process_document()`. It's not modified,
+                so the same document can be rendered several times.
         """
         if not self._is_prepared:
             raise RuntimeError("Pipeline not prepared. Call prepare() before render().")
@@ -179,30 +332,19 @@ class CapsPipeline:
         logger().info("Starting final video render...")
         
         try:
-            # TODO: we should create a document copy to avoid modify received document
+            document = document.clone()
             self._cut_document_for_preview_time(document)
 
-            logger().info("Generating subtitle clips...")
-            self._clips_generator.generate(document)
-
-            logger().debug("Updating layout sizes and positions...")
-            self._layout_updater.update_max_sizes(document)
-            self._positions_calculator.calculate(document, self._video_width, self._video_height)
-            self._layout_updater.update_max_positions(document)
-
-            logger().info("Applying clip and sound effects...")
-            for effect in self._clip_effects:
-                effect.set_renderer(self._renderer)
-                effect.run(document)
-            for effect in self._sound_effects:
-                effect.run(document)
-
-            logger().info("Applying animations...")
-            for animator in self._animators:
-                animator.run(document)
+            if self._streaming_window_size:
+                self._render_streaming(document)
+            else:
+                logger().info("Generating subtitle clips, effects and animations...")
+                self._apply_sound_effects(document)
+                self._generate_media_elements(document)
 
-            logger().info("Generating final video file...")
-            self._video_generator.generate(document)
+                logger().info("Generating final video file...")
+                with self._stage("video generation"):
+                    self._video_generator.generate(document)
 
             logger().info(f"Video rendered successfully to {self._output_video_path}!")
 
@@ -213,6 +355,67 @@ class CapsPipeline:
             self.close()
             logger().debug(f"Render and cleanup finished.")
 
+    def _render_streaming(self, document: Document) -> None:
+        """
+        Renders the video by windows of consecutive segments: while the video compositor encodes the frames of a window
+        (in a background thread), the clips of the next windows are generated. Only the windows ahead of the encoder
+        are kept in memory. The document-global steps (tags, text effects, summaries) were already done by process_document().
+        The sound effects are also applied to the whole document (before splitting it): they only need the times and tags,
+        and their events can span several segments (e.g. a run of consecutive tagged words).
+        The clip effects and animations only use the clips of each line or segment, so they run on each window.
+        """
+        window_size = self._streaming_window_size
+        self._apply_sound_effects(document)
+        # the segments are moved to the window documents, so they are released after their window is encoded
+        pending_segments = deque(document.segments)
+        document.segments.set_all([])
+        total_windows = (len(pending_segments) + window_size - 1) // window_size
+
+        logger().info(f"Generating subtitle clips and video in {total_windows} windows of {window_size} segments...")
+        self._video_generator.start_streaming(self._streaming_max_pending_windows)
+        try:
+            is_first_window = True
+            while pending_segments:
+                window = Document(sfxs=list(document.sfxs) if is_first_window else [])
+                window.segments.set_all([pending_segments.popleft() for _ in range(min(window_size, len(pending_segments)))])
+                self._generate_media_elements(window, show_progress=False)
+                with self._stage("video generation"):
+                    self._video_generator.add_window(window)
+                is_first_window = False
+
+            with self._stage("video generation"):
+                self._video_generator.finish_streaming()
+        except BaseException:
+            self._video_generator.cancel_streaming()
+            raise
+
+    def _apply_sound_effects(self, document: Document) -> None:
+        logger().debug("Applying sound effects...")
+        with self._stage("clip and sound effects"):
+            for effect in self._sound_effects:
+                effect.run(document)
+
+    def _generate_media_elements(self, document: Document, show_progress: bool = True) -> None:
+        logger().debug("Generating subtitle clips...")
+        with self._stage("clips generation"):
+            self._clips_generator.generate(document, show_progress)
+
+        logger().debug("Updating layout sizes and positions...")
+        with self._stage("layout"):
+            self._layout_updater.update_max_sizes(document)
+            self._positions_calculator.calculate(document, self._video_width, self._video_height)
+            self._layout_updater.update_max_positions(document)
+
+        logger().debug("Applying clip effects...")
+        with self._stage("clip and sound effects"):
+            for effect in self._clip_effects:
+                effect.set_renderer(self._renderer)
+                effect.run(document)
+
+        logger().debug("Applying animations...")
+        with self._stage("animations"):
+            ElementAnimator.run_all(self._animators, document)
+
     def close(self) -> None:
         """
         Cleans up all resources used by the pipeline, such as temporary files
@@ -238,7 +441,7 @@ class CapsPipeline:
             # If a subtitle data file is provided, load it and skip transcription/processing.
             if self._subtitle_data_path_for_loading:
                 logger().info(f"Loading subtitle data from: {self._subtitle_data_path_for_loading}")
-                document = SubtitleDataService(self._subtitle_data_path_for_loading).load()
+                document = SubtitleDataService(self._subtitle_data_path_for_loading).load(self._preview_time)
                 self._cut_document_for_preview_time(document)
             else:
                 initial_document = self.transcribe()
@@ -247,23 +450,35 @@ class CapsPipeline:
             self.render(document)
         
         finally:
+            if self._stage_timings:
+                logger().debug("Stage timings: " + ", ".join(f"{stage} {elapsed:.2f}s" for stage, elapsed in self._stage_timings.items()))
             logger().info(f"Total pipeline execution time: {time.time() - start_time:.2f} seconds")
 
     def _cut_document_for_preview_time(self, document: Document):
         if not self._preview_time:
             return
-        is_in_preview_time = lambda e: time_utils.times_intersect(self._preview_time[0], self._preview_time[1], e.time.start, e.time.end)
-        for segment in document.segments[:]:
-            if not is_in_preview_time(segment):
-                document.segments.remove(segment)
-                continue
-            for line in segment.lines[:]:
-                if not is_in_preview_time(line):
-                    segment.lines.remove(line)
-                    continue
-                for word in line.words[:]:
-                    if not is_in_preview_time(word):
-                        line.words.remove(word)
+        start, end = self._preview_time
+        # segments are filtered first, so the lines and words of the discarded segments are not accessed (or cloned)
+        document.segments.set_all([s for s in document.segments if s.time.start <= end and s.time.end >= start])
+        index = document.get_time_index()
+        keep_segments = index.get_intersecting(ElementType.SEGMENT, start, end)
+        keep_lines = index.get_intersecting(ElementType.LINE, start, end) & keep_segments[index.get_line_segments()]
+        keep_words = index.get_intersecting(ElementType.WORD, start, end) & keep_lines[index.get_word_lines()]
+
+        kept_words_by_line = {}
+        for word_index in np.flatnonzero(keep_words):
+            kept_words_by_line.setdefault(index.get_word_lines()[word_index], []).append(index.get_elements(ElementType.WORD)[word_index])
+        kept_lines_by_segment = {}
+        for line_index in np.flatnonzero(keep_lines):
+            line = index.get_elements(ElementType.LINE)[line_index]
+            line.words.set_all(kept_words_by_line.get(line_index, []))
+            kept_lines_by_segment.setdefault(index.get_line_segments()[line_index], []).append(line)
+        kept_segments = []
+        for segment_index in np.flatnonzero(keep_segments):
+            segment = index.get_elements(ElementType.SEGMENT)[segment_index]
+            segment.lines.set_all(kept_lines_by_segment.get(segment_index, []))
+            kept_segments.append(segment)
+        document.segments.set_all(kept_segments)
 
     def _ensure_mp4_output_path(self, output_path: Optional[str]) -> str:
         if output_path is None:
@@ -1,7 +1,8 @@
 import os
 from .caps_pipeline import CapsPipeline
+from .subtitle_data_service import SubtitleDataFormat
 from pycaps.layout import SubtitleLayoutOptions, LineSplitter, LayoutUpdater, PositionsCalculator
-from pycaps.transcriber import AudioTranscriber, BaseSegmentSplitter, WhisperAudioTranscriber, PreviewTranscriber
+from pycaps.transcriber import AudioTranscriber, BaseSegmentSplitter, WhisperAudioTranscriber, WhisperScriptAlignmentTranscriber, PreviewTranscriber, VoiceActivityDetector, TimedTextTranscriber, TimedTextFormat
 from typing import Optional
 from pycaps.animation import Animation, ElementAnimator
 from pycaps.common import ElementType, EventType, VideoQuality, CacheStrategy
@@ -62,10 +63,48 @@ class CapsPipelineBuilder:
         self._caps_pipeline._transcriber = WhisperAudioTranscriber(model_size=model_size, language=language)
         return self
     
+    def with_script_alignment(self, script: str, language: Optional[str] = None, model_size: str = "base") -> "CapsPipelineBuilder":
+        """
+        Uses a known script instead of transcribing the audio: the script words are aligned to the audio with Whisper.
+        It's much faster than a transcription, and the subtitles will contain exactly the script words.
+        """
+        self._caps_pipeline._transcriber = WhisperScriptAlignmentTranscriber(script, model_size=model_size, language=language)
+        return self
+
+    def with_timed_text(self, path: str, format: Optional[TimedTextFormat] = None) -> "CapsPipelineBuilder":
+        """
+        Uses an existing caption file (SRT, WebVTT or Whisper JSON) instead of transcribing the audio.
+        """
+        self._caps_pipeline._transcriber = TimedTextTranscriber(path, format)
+        return self
+
     def with_custom_audio_transcriber(self, audio_transcriber: AudioTranscriber) -> "CapsPipelineBuilder":
         self._caps_pipeline._transcriber = audio_transcriber
         return self
     
+    def with_voice_activity_detection(self, detector: Optional[VoiceActivityDetector] = None) -> "CapsPipelineBuilder":
+        """
+        Detects the speech regions of the audio before transcribing it.
+        Silences and music are not sent to the transcriber, and the segment splitters can use the detected pauses.
+        """
+        self._caps_pipeline._video_generator.set_voice_activity_detector(detector or VoiceActivityDetector())
+        return self
+
+    def with_streaming(self, window_size: int = 5, max_pending_windows: int = 2) -> "CapsPipelineBuilder":
+        """
+        Renders the video by windows of window_size segments: the frames are encoded while the subtitle clips
+        of the next windows are generated, instead of after generating all of them.
+        The first frames are encoded sooner and only the sprites of the windows ahead of the encoder are kept in memory
+        (at most max_pending_windows windows wait for the encoder).
+        """
+        if window_size < 1:
+            raise ValueError("Streaming window size must be at least 1")
+        if max_pending_windows < 1:
+            raise ValueError("Streaming max pending windows must be at least 1")
+        self._caps_pipeline._streaming_window_size = window_size
+        self._caps_pipeline._streaming_max_pending_windows = max_pending_windows
+        return self
+
     def with_cache_strategy(self, cache_strategy: CacheStrategy) -> "CapsPipelineBuilder":
         self._caps_pipeline._cache_strategy = cache_strategy
         return self
@@ -80,10 +119,18 @@ class CapsPipelineBuilder:
         self._caps_pipeline._should_save_subtitle_data = should_save
         return self
     
+    def with_subtitle_data_format(self, format: SubtitleDataFormat) -> "CapsPipelineBuilder":
+        self._caps_pipeline._subtitle_data_format = format
+        return self
+
     def should_preview_transcription(self, should_preview: bool) -> "CapsPipelineBuilder":
         self._caps_pipeline._should_preview_transcription = should_preview
         return self
     
+    def should_use_transcription_cache(self, should_use: bool) -> "CapsPipelineBuilder":
+        self._caps_pipeline._should_use_transcription_cache = should_use
+        return self
+
     def add_segment_splitter(self, segment_splitter: BaseSegmentSplitter) -> "CapsPipelineBuilder":
         self._caps_pipeline._segment_splitters.append(segment_splitter)
         return self
@@ -109,14 +156,25 @@ class CapsPipelineBuilder:
             self._caps_pipeline._sound_effects.append(effect)
         return self
 
-    def build(self, preview_time: Optional[tuple[float, float]] = None) -> CapsPipeline:
+    def build(self, preview_time: Optional[tuple[float, float]] = None, transcribe_preview: bool = False) -> CapsPipeline:
+        """
+        Builds the pipeline.
+
+        Args:
+            preview_time: If provided, only this (start, end) fragment of the video is rendered, with low quality.
+            transcribe_preview: If True, the preview uses the real transcription (served from the transcription cache
+                when possible) instead of dummy text.
+        """
         if not self._caps_pipeline._input_video_path:
             raise ValueError("Input video path is required")
         if preview_time:
-            logger().warning("Generating preview: using dummy text and reducing quality to save time.")
             self.with_video_quality(VideoQuality.LOW)
             self.should_save_subtitle_data(False)
-            self.with_custom_audio_transcriber(PreviewTranscriber())
+            if transcribe_preview:
+                logger().warning("Generating preview: reducing quality to save time.")
+            else:
+                logger().warning("Generating preview: using dummy text and reducing quality to save time.")
+                self.with_custom_audio_transcriber(PreviewTranscriber())
             self._caps_pipeline._preview_time = preview_time
         
         pipeline = self._caps_pipeline
@@ -1,7 +1,7 @@
 import json
 from .caps_pipeline_builder import CapsPipelineBuilder
 from .caps_pipeline import CapsPipeline
-from pycaps.transcriber import LimitByWordsSplitter, LimitByCharsSplitter, SplitIntoSentencesSplitter
+from pycaps.transcriber import LimitByWordsSplitter, LimitByCharsSplitter, SplitIntoSentencesSplitter, SplitOnPausesSplitter, VoiceActivityDetector
 from pycaps.tag import TagConditionFactory, TagCondition
 from pycaps.effect import *
 from pycaps.animation import *
@@ -42,6 +42,9 @@ class JsonConfigLoader:
 
             self._load_video_config()
             self._load_whisper_config()
+            self._load_script_config()
+            self._load_captions_config()
+            self._load_voice_activity_detection_config()
             self._load_layout_options()
             self._load_segment_splitters()
             self._load_effects()
@@ -61,6 +64,8 @@ class JsonConfigLoader:
         video_data = self._config.video
         if video_data.quality is not None:
             self._builder.with_video_quality(video_data.quality)
+        if video_data.streaming_window_size is not None:
+            self._builder.with_streaming(window_size=video_data.streaming_window_size)
 
     def _load_whisper_config(self) -> None:
         if self._config.whisper is None:
@@ -71,6 +76,41 @@ class JsonConfigLoader:
             model_size=whisper_data.model
         )
 
+    def _load_script_config(self) -> None:
+        if self._config.script is None:
+            return
+        script_data = self._config.script
+        if script_data.path is not None:
+            with open(os.path.join(self._base_path, script_data.path), "r", encoding="utf-8") as f:
+                script = f.read()
+        else:
+            script = script_data.text
+        whisper_data = self._config.whisper
+        self._builder.with_script_alignment(
+            script,
+            language=whisper_data.language if whisper_data else None,
+            model_size=whisper_data.model if whisper_data else "base"
+        )
+
+    def _load_captions_config(self) -> None:
+        if self._config.captions is None:
+            return
+        captions_data = self._config.captions
+        self._builder.with_timed_text(os.path.join(self._base_path, captions_data.path), captions_data.format)
+
+    def _load_voice_activity_detection_config(self) -> None:
+        if self._config.voice_activity_detection is None:
+            return
+        vad_data = self._config.voice_activity_detection
+        self._builder.with_voice_activity_detection(
+            VoiceActivityDetector(
+                threshold_margin_db=vad_data.threshold_margin_db,
+                min_speech_duration=vad_data.min_speech_duration,
+                min_silence_duration=vad_data.min_silence_duration,
+                padding=vad_data.padding,
+            )
+        )
+
     def _load_layout_options(self) -> None:
         if self._config.layout is None:
             return
@@ -85,6 +125,8 @@ class JsonConfigLoader:
                     self._builder.add_segment_splitter(LimitByCharsSplitter(splitter.max_chars, splitter.min_chars, splitter.avoid_finishing_segment_with_word_shorter_than))
                 case "split_into_sentences":
                     self._builder.add_segment_splitter(SplitIntoSentencesSplitter(splitter.sentences_separators))
+                case "split_on_pauses":
+                    self._builder.add_segment_splitter(SplitOnPausesSplitter(splitter.min_pause))
                 case _:
                     raise ValueError(f"Invalid segment splitter type: {splitter.type}")
 
@@ -224,8 +266,7 @@ class JsonConfigLoader:
             elif rule.type == "regex":
                 tagger.add_regex_rule(Tag(rule.tag), rule.regex)
             elif rule.type == "wordlist":
-                wordlist = open(os.path.join(self._base_path, rule.filename), "r", encoding="utf-8").read().split()
-                tagger.add_wordlist_rule(Tag(rule.tag), wordlist)
+                tagger.add_wordlist_file_rule(Tag(rule.tag), os.path.join(self._base_path, rule.filename), phrases=rule.phrases)
 
         self._builder.with_semantic_tagger(tagger)
 
@@ -1,9 +1,10 @@
 from pycaps.layout import SubtitleLayoutOptions
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 from pycaps.common import EventType, ElementType, VideoQuality, CacheStrategy
 from pycaps.effect import EmojiAlign
 from typing import Literal, Annotated, Optional
 from pycaps.animation import Direction, OvershootConfig
+from pycaps.transcriber import TimedTextFormat
 
 # TODO: we are copying the default values that receive the classes, we should avoid that
 class BaseConfigModel(BaseModel):
@@ -11,11 +12,32 @@ class BaseConfigModel(BaseModel):
 
 class VideoConfig(BaseConfigModel):
     quality: Optional[VideoQuality] = None
+    streaming_window_size: Optional[int] = None
 
 class WhisperConfig(BaseConfigModel):
     language: Optional[str] = None
     model: Literal["tiny", "tiny.en", "base", "base.en", "small", "small.en", "medium", "medium.en", "large", "turbo"] = "base"
 
+class ScriptConfig(BaseConfigModel):
+    path: Optional[str] = None
+    text: Optional[str] = None
+
+    @model_validator(mode="after")
+    def validate_source(self) -> "ScriptConfig":
+        if (self.path is None) == (self.text is None):
+            raise ValueError("script must have exactly one of: path, text")
+        return self
+
+class CaptionsConfig(BaseConfigModel):
+    path: str
+    format: Optional[TimedTextFormat] = None
+
+class VoiceActivityDetectionConfig(BaseConfigModel):
+    threshold_margin_db: float = 12.0
+    min_speech_duration: float = 0.25
+    min_silence_duration: float = 0.6
+    padding: float = 0.2
+
 class LimitByWordsSplitterConfig(BaseConfigModel):
     type: Literal["limit_by_words"]
     limit: int
@@ -45,7 +67,11 @@ class SplitIntoSentencesSplitterConfig(BaseConfigModel):
     type: Literal["split_into_sentences"]
     sentences_separators: list[str] = ['.', '?', '!', '...']
 
-SplitterConfig = Annotated[LimitByCharsSplitterConfig | LimitByWordsSplitterConfig | SplitIntoSentencesSplitterConfig, Field(discriminator="type")]
+class SplitOnPausesSplitterConfig(BaseConfigModel):
+    type: Literal["split_on_pauses"]
+    min_pause: float = 0.5
+
+SplitterConfig = Annotated[LimitByCharsSplitterConfig | LimitByWordsSplitterConfig | SplitIntoSentencesSplitterConfig | SplitOnPausesSplitterConfig, Field(discriminator="type")]
 
 class EmojiInSegmentEffectConfig(BaseConfigModel):
     type: Literal["emoji_in_segment"]
@@ -162,6 +188,7 @@ class WordlistTaggerRuleConfig(BaseConfigModel):
     type: Literal["wordlist"]
     tag: str
     filename: str
+    phrases: bool = False
 
 TaggerRule = Annotated[AiTaggerRuleConfig | RegexTaggerRuleConfig | WordlistTaggerRuleConfig, Field(discriminator="type")]
 
@@ -172,6 +199,9 @@ class JsonSchema(BaseConfigModel):
     css: Optional[str] = None
     video: Optional[VideoConfig] = None
     whisper: Optional[WhisperConfig] = None
+    script: Optional[ScriptConfig] = None
+    captions: Optional[CaptionsConfig] = None
+    voice_activity_detection: Optional[VoiceActivityDetectionConfig] = None
     layout: Optional[SubtitleLayoutOptions] = None
     splitters: list[SplitterConfig] = []
     effects: list[EffectConfig] = []
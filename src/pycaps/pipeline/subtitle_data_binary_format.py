@@ -0,0 +1,238 @@
+import json
+import mmap
+import struct
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from pycaps.common import Document, Segment, Line, Word, WordClip, Tag, TimeFragment, ElementLayout, Position, Size, ElementState
+
+class SubtitleDataBinaryFormat:
+    """
+    Compact binary format for the subtitle data.
+
+    File layout: MAGIC | version (uint32) | header length (uint64) | JSON header | arrays.
+    The header contains the interned strings (word texts and tag names) and the dtype/shape/offset of each array.
+    Every element type is stored as columns (times, layouts, children counts), and the tags/states of each element
+    are stored as CSR arrays (offsets + ids), so nothing is serialized per element.
+
+    The file is memory mapped when reading, and only the segments inside the requested time window are materialized.
+    """
+
+    MAGIC = b"PYCAPSSD"
+    VERSION = 1
+    _PREFIX = struct.Struct("<8sIQ")
+    _ALIGNMENT = 8
+
+    @staticmethod
+    def is_binary_file(path: str) -> bool:
+        with open(path, "rb") as f:
+            return f.read(len(SubtitleDataBinaryFormat.MAGIC)) == SubtitleDataBinaryFormat.MAGIC
+
+    def save(self, document: Document, path: str) -> None:
+        strings = _StringTable()
+        states = [state.value for state in ElementState]
+        state_ids = {state: i for i, state in enumerate(ElementState)}
+        segments = list(document.segments)
+        lines = document.get_lines()
+        words = document.get_words()
+        clips = document.get_word_clips()
+
+        arrays: Dict[str, np.ndarray] = {
+            "segment_time": self._times(segments),
+            "segment_layout": self._layouts(s.max_layout for s in segments),
+            "segment_line_counts": np.fromiter((len(s.lines) for s in segments), dtype="<u4", count=len(segments)),
+            "line_time": self._times(lines),
+            "line_layout": self._layouts(l.max_layout for l in lines),
+            "line_word_counts": np.fromiter((len(l.words) for l in lines), dtype="<u4", count=len(lines)),
+            "word_time": self._times(words),
+            "word_layout": self._layouts(w.max_layout for w in words),
+            "word_text": np.fromiter((strings.get_id(w.text) for w in words), dtype="<u4", count=len(words)),
+            "word_clip_counts": np.fromiter((len(w.clips) for w in words), dtype="<u4", count=len(words)),
+            "clip_layout": self._layouts(c.layout for c in clips),
+        }
+        self._add_csr(arrays, "segment_tags", [[strings.get_id(t.name) for t in s.structure_tags] for s in segments], "<u4")
+        self._add_csr(arrays, "line_tags", [[strings.get_id(t.name) for t in l.structure_tags] for l in lines], "<u4")
+        self._add_csr(arrays, "word_structure_tags", [[strings.get_id(t.name) for t in w.structure_tags] for w in words], "<u4")
+        self._add_csr(arrays, "word_semantic_tags", [[strings.get_id(t.name) for t in w.semantic_tags] for w in words], "<u4")
+        self._add_csr(arrays, "clip_states", [[state_ids[state] for state in c.states] for c in clips], "u1")
+
+        header_arrays = {}
+        offset = 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            arrays[name] = array
+            header_arrays[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset += self._aligned(array.nbytes)
+
+        header = json.dumps({"strings": strings.values, "states": states, "arrays": header_arrays}).encode("utf-8")
+        header += b" " * (self._aligned(self._PREFIX.size + len(header)) - self._PREFIX.size - len(header))
+        with open(path, "wb") as f:
+            f.write(self._PREFIX.pack(self.MAGIC, self.VERSION, len(header)))
+            f.write(header)
+            for array in arrays.values():
+                f.write(array.tobytes())
+                f.write(b"\0" * (self._aligned(array.nbytes) - array.nbytes))
+
+    def load(self, path: str, time_window: Optional[Tuple[float, float]] = None) -> Document:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        reader = _BinaryReader(buffer, self._PREFIX)
+        return reader.read_document(time_window)
+
+    def _times(self, elements) -> np.ndarray:
+        return np.array([(e.time.start, e.time.end) for e in elements], dtype="<f8").reshape(-1, 2)
+
+    def _layouts(self, layouts) -> np.ndarray:
+        values = [(l.position.x, l.position.y, l.size.width, l.size.height) for l in layouts]
+        array = np.array(values, dtype="<f8").reshape(-1, 4)
+        # the layouts are integer pixels: they are stored as int32 (so they're loaded as int, like in the JSON format)
+        # unless some value is fractional
+        int32 = np.iinfo(np.int32)
+        if np.all(np.isfinite(array)) and np.all(array == np.round(array)) and np.all((array >= int32.min) & (array <= int32.max)):
+            return array.astype("<i4")
+        return array
+
+    def _add_csr(self, arrays: Dict[str, np.ndarray], name: str, rows: List[List[int]], dtype: str) -> None:
+        offsets = np.zeros(len(rows) + 1, dtype="<u4")
+        np.cumsum([len(row) for row in rows], out=offsets[1:])
+        arrays[f"{name}_offsets"] = offsets
+        arrays[f"{name}_ids"] = np.fromiter((value for row in rows for value in row), dtype=dtype, count=int(offsets[-1]))
+
+    def _aligned(self, size: int) -> int:
+        return (size + self._ALIGNMENT - 1) // self._ALIGNMENT * self._ALIGNMENT
+
+class _StringTable:
+    def __init__(self):
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def get_id(self, value: str) -> int:
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = len(self.values)
+            self._ids[value] = string_id
+            self.values.append(value)
+        return string_id
+
+class _BinaryReader:
+    def __init__(self, buffer: mmap.mmap, prefix: struct.Struct):
+        magic, version, header_length = prefix.unpack_from(buffer, 0)
+        if magic != SubtitleDataBinaryFormat.MAGIC:
+            raise ValueError("Invalid subtitle data file: unknown format.")
+        if version != SubtitleDataBinaryFormat.VERSION:
+            raise ValueError(f"Unsupported subtitle data version: {version} (supported: {SubtitleDataBinaryFormat.VERSION}).")
+
+        header = json.loads(bytes(buffer[prefix.size:prefix.size + header_length]).decode("utf-8"))
+        self._buffer = buffer
+        self._data_offset = prefix.size + header_length
+        self._arrays_info: Dict[str, dict] = header["arrays"]
+        self._strings: List[str] = header["strings"]
+        self._tags: List[Tag] = [Tag(name) for name in self._strings]
+        self._states: List[ElementState] = [ElementState(state) for state in header["states"]]
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def read_document(self, time_window: Optional[Tuple[float, float]]) -> Document:
+        segment_time = self.get_array("segment_time")
+        if time_window is None:
+            selected_segments = list(range(len(segment_time)))
+        else:
+            start, end = time_window
+            selected_segments = np.flatnonzero((segment_time[:, 0] <= end) & (segment_time[:, 1] >= start)).tolist()
+
+        document = Document()
+        if not selected_segments:
+            return document
+
+        # Only the rows between the first and the last selected segment are converted to Python objects
+        line_offsets = self._children_offsets("segment_line_counts")
+        word_offsets = self._children_offsets("line_word_counts")
+        clip_offsets = self._children_offsets("word_clip_counts")
+        segments = _Rows(self, "segment", selected_segments[0], selected_segments[-1] + 1)
+        lines = _Rows(self, "line", line_offsets[selected_segments[0]], line_offsets[selected_segments[-1] + 1])
+        words = _Rows(self, "word", word_offsets[lines.first], word_offsets[lines.last], ("word_structure_tags", "word_semantic_tags"))
+        clips = _Rows(self, "clip", clip_offsets[words.first], clip_offsets[words.last], tags=("clip_states",))
+        word_texts = self.get_array("word_text")[words.first:words.last].tolist()
+
+        document_segments = []
+        for segment_index in selected_segments:
+            segment = Segment(
+                structure_tags=self._to_tags(segments.get_tags("segment_tags", segment_index)),
+                max_layout=segments.get_layout(segment_index),
+                time=segments.get_time(segment_index),
+            )
+            segment_lines = []
+            for line_index in range(line_offsets[segment_index], line_offsets[segment_index + 1]):
+                line = Line(
+                    structure_tags=self._to_tags(lines.get_tags("line_tags", line_index)),
+                    max_layout=lines.get_layout(line_index),
+                    time=lines.get_time(line_index),
+                )
+                line_words = []
+                for word_index in range(word_offsets[line_index], word_offsets[line_index + 1]):
+                    word = Word(
+                        text=self._strings[word_texts[word_index - words.first]],
+                        semantic_tags=self._to_tags(words.get_tags("word_semantic_tags", word_index)),
+                        structure_tags=self._to_tags(words.get_tags("word_structure_tags", word_index)),
+                        max_layout=words.get_layout(word_index),
+                        time=words.get_time(word_index),
+                    )
+                    if clip_offsets[word_index + 1] > clip_offsets[word_index]:
+                        word.clips.set_all([
+                            WordClip(
+                                states=[self._states[state_id] for state_id in clips.get_tags("clip_states", clip_index)],
+                                layout=clips.get_layout(clip_index),
+                            )
+                            for clip_index in range(clip_offsets[word_index], clip_offsets[word_index + 1])
+                        ])
+                    line_words.append(word)
+                line.words.set_all(line_words)
+                segment_lines.append(line)
+            segment.lines.set_all(segment_lines)
+            document_segments.append(segment)
+        document.segments.set_all(document_segments)
+        return document
+
+    def _to_tags(self, tag_ids: List[int]) -> set:
+        return {self._tags[tag_id] for tag_id in tag_ids}
+
+    def _children_offsets(self, counts_name: str) -> List[int]:
+        counts = self.get_array(counts_name)
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return offsets.tolist()
+
+    def get_array(self, name: str) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None:
+            info = self._arrays_info[name]
+            count = int(np.prod(info["shape"]))
+            array = np.frombuffer(self._buffer, dtype=np.dtype(info["dtype"]), count=count, offset=self._data_offset + info["offset"])
+            array = array.reshape(info["shape"])
+            self._arrays[name] = array
+        return array
+
+class _Rows:
+    """Python lists with the columns of the rows [first, last) of an element type."""
+
+    def __init__(self, reader: _BinaryReader, prefix: str, first: int, last: int, tags: Optional[Tuple[str, ...]] = None):
+        self.first = first
+        self.last = last
+        self._times = reader.get_array(f"{prefix}_time")[first:last].tolist() if prefix != "clip" else None
+        self._layouts = reader.get_array(f"{prefix}_layout")[first:last].tolist()
+        self._tags: Dict[str, Tuple[List[int], List[int]]] = {}
+        for name in tags or (f"{prefix}_tags",):
+            offsets = reader.get_array(f"{name}_offsets")[first:last + 1].astype(np.int64)
+            ids = reader.get_array(f"{name}_ids")[offsets[0]:offsets[-1]].tolist()
+            self._tags[name] = ((offsets - offsets[0]).tolist(), ids)
+
+    def get_time(self, index: int) -> TimeFragment:
+        start, end = self._times[index - self.first]
+        return TimeFragment(start=start, end=end)
+
+    def get_layout(self, index: int) -> ElementLayout:
+        x, y, width, height = self._layouts[index - self.first]
+        return ElementLayout(position=Position(x=x, y=y), size=Size(width=width, height=height))
+
+    def get_tags(self, name: str, index: int) -> List[int]:
+        offsets, ids = self._tags[name]
+        row = index - self.first
+        return ids[offsets[row]:offsets[row + 1]]
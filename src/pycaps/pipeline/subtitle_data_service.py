@@ -1,14 +1,55 @@
 from pycaps.common import Document
+from .subtitle_data_binary_format import SubtitleDataBinaryFormat
+from enum import Enum
+from typing import Optional, Tuple
 import json
+import os
+
+class SubtitleDataFormat(str, Enum):
+    JSON = "json"
+    BINARY = "binary"
+
+    @staticmethod
+    def from_path(path: str) -> 'SubtitleDataFormat':
+        extension = os.path.splitext(path)[1].lower()
+        return SubtitleDataFormat.BINARY if extension == SubtitleDataService.BINARY_EXTENSION else SubtitleDataFormat.JSON
 
 class SubtitleDataService:
-    def __init__(self, path: str):
+    BINARY_EXTENSION = ".pcsd"
+
+    def __init__(self, path: str, format: Optional[SubtitleDataFormat] = None):
+        """
+        Saves and loads the processed document.
+
+        Args:
+            path: Path to the subtitle data file.
+            format: (Optional) Format used to save the file. If None, it's detected from the extension
+                (".pcsd" for binary, JSON otherwise). When loading, the format is always detected from the file content.
+        """
         self._path = path
+        self._format = format
 
     def save(self, document: Document) -> None:
+        format = self._format or SubtitleDataFormat.from_path(self._path)
+        if format == SubtitleDataFormat.BINARY:
+            SubtitleDataBinaryFormat().save(document, self._path)
+            return
+
         with open(self._path, "w") as f:
             json.dump(document.to_dict(), f)
 
-    def load(self) -> Document:
+    def load(self, time_window: Optional[Tuple[float, float]] = None) -> Document:
+        """
+        Loads the document. If time_window (start, end) is received, only the segments that intersect it are loaded.
+        """
+        if SubtitleDataBinaryFormat.is_binary_file(self._path):
+            return SubtitleDataBinaryFormat().load(self._path, time_window)
+
         with open(self._path, "r") as f:
-            return Document.from_dict(json.load(f))
+            data = json.load(f)
+        if time_window is not None:
+            start, end = time_window
+            data["segments"] = [
+                s for s in data.get("segments", []) if s["time"]["start"] <= end and s["time"]["end"] >= start
+            ]
+        return Document.from_dict(data)
@@ -1,6 +1,7 @@
 from pathlib import Path
+import math
 import tempfile
-from typing import Optional, TYPE_CHECKING, Tuple, Dict
+from typing import Optional, TYPE_CHECKING, Tuple, Dict, List
 from pycaps.common import Word, ElementState, Line, Size, CacheStrategy
 import shutil
 from .rendered_image_cache import RenderedImageCache
@@ -34,6 +35,7 @@ class CssSubtitleRenderer:
         self._custom_css: str = ""
         self._cache_strategy = CacheStrategy.CSS_CLASSES_AWARE
         self._image_cache: RenderedImageCache = None
+        self._background_image_cache: RenderedImageCache = None
         self._letter_size_cache: LetterSizeCache = None
         self._current_line: Optional[Line] = None
         self._current_line_state: Optional[ElementState] = None
@@ -53,6 +55,7 @@ class CssSubtitleRenderer:
 
         self._cache_strategy = cache_strategy
         self._image_cache = RenderedImageCache(self._custom_css, self._cache_strategy)
+        self._background_image_cache = RenderedImageCache(self._custom_css, self._cache_strategy)
         self._letter_size_cache = LetterSizeCache(self._custom_css)
         self._tempdir = tempfile.TemporaryDirectory()
         if not self._browser:
@@ -190,6 +193,105 @@ class CssSubtitleRenderer:
             }}
             """, [index, state.value])
     
+    def render_word_background(self, index: int, word: Word, state: ElementState) -> Optional['Image']:
+        '''
+        Renders the word without its text: the text is kept in an invisible child span,
+        so the word box (and the line) has the same size as in render_word().
+        '''
+        if not self._page:
+            raise RuntimeError("Renderer is not open. Call open() first.")
+        if not self._current_line:
+            raise RuntimeError("No line is open. Call open_line() first.")
+
+        line_css_classes = self._renderer_page.get_line_css_classes(self._current_line.get_segment().get_tags(), self._current_line.get_tags(), self._current_line_state)
+        word_css_classes = self._renderer_page.get_word_css_classes(word.get_tags(), index, state)
+        all_css_classes = line_css_classes + " " + word_css_classes
+        if self._background_image_cache.has(index, word.text, all_css_classes, None):
+            return self._background_image_cache.get(index, word.text, all_css_classes, None)
+
+        script = """
+        ([index, state, wordText]) => {
+            const word = document.querySelector(`.word-${index}-in-line`);
+            if (word.dataset.isNextNodeRemaining) {
+                word.parentNode.removeChild(word.nextSibling);
+                delete word.dataset.isNextNodeRemaining;
+            }
+            const hiddenText = document.createElement('span');
+            hiddenText.textContent = wordText;
+            hiddenText.style.visibility = 'hidden';
+            word.replaceChildren(hiddenText);
+            word.classList.add(state);
+            return word.getBoundingClientRect();
+        }
+        """
+        word_bounding_box = self._page.evaluate(script, [index, state.value, word.text])
+        try:
+            if word_bounding_box["width"] <= 0 or word_bounding_box["height"] <= 0:
+                self._background_image_cache.set(index, word.text, all_css_classes, None, None)
+                return None
+
+            image = PlaywrightScreenshotCapturer.capture(self._page, word_bounding_box)
+            self._background_image_cache.set(index, word.text, all_css_classes, None, image)
+            return image
+        except Exception as e:
+            raise RuntimeError(f"Error rendering the background of word '{word.text}': {e}")
+        finally:
+            self._page.evaluate("""
+            ([index, state, wordText]) => {
+                const word = document.querySelector(`.word-${index}-in-line`);
+                word.textContent = wordText;
+                word.classList.remove(state);
+            }
+            """, [index, state.value, word.text])
+
+    def get_letter_boundaries(self, index: int, word: Word, state: ElementState) -> Optional[List[int]]:
+        '''
+        Returns the x position (in pixels of the image returned by render_word() for the whole word) where each letter ends.
+        All the letters are measured with a single evaluate call.
+        '''
+        if not self._page:
+            raise RuntimeError("Renderer is not open. Call open() first.")
+        if not self._current_line:
+            raise RuntimeError("No line is open. Call open_line() first.")
+
+        script = """
+        ([index, state, wordText]) => {
+            const word = document.querySelector(`.word-${index}-in-line`);
+            word.textContent = wordText;
+            if (word.dataset.isNextNodeRemaining) {
+                word.parentNode.removeChild(word.nextSibling);
+                delete word.dataset.isNextNodeRemaining;
+            }
+            word.classList.add(state);
+            const box = word.getBoundingClientRect();
+            const rights = [];
+            const textNode = word.firstChild;
+            if (textNode) {
+                const range = document.createRange();
+                let offset = 0;
+                for (const codePoint of Array.from(wordText)) { // to avoid issues with multibyte characters
+                    offset += codePoint.length;
+                    range.setStart(textNode, 0);
+                    range.setEnd(textNode, offset);
+                    rights.push(range.getBoundingClientRect().right);
+                }
+            }
+            word.classList.remove(state);
+            return {x: box.x, width: box.width, rights: rights};
+        }
+        """
+        measures = self._page.evaluate(script, [index, state.value, word.text])
+        if measures["width"] <= 0 or len(measures["rights"]) != len(word.text):
+            return None
+
+        # same rounding used by PlaywrightScreenshotCapturer to crop the word image
+        left = math.floor(measures["x"] + 0.5)
+        image_width = (math.floor(measures["x"] + measures["width"] + 0.5) - left) * self.DEFAULT_DEVICE_SCALE_FACTOR
+        boundaries = [min(max(round((right - left) * self.DEFAULT_DEVICE_SCALE_FACTOR), 0), image_width) for right in measures["rights"]]
+        # the last letter reveals the whole word (including its paddings and borders)
+        boundaries[-1] = image_width
+        return boundaries
+
     def close_line(self):
         if not self._page:
             raise RuntimeError("Renderer is not open. Call open() first.")
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional, Tuple, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 from pycaps.common import Word, ElementState, Line, CacheStrategy
 
 if TYPE_CHECKING:
@@ -23,6 +23,20 @@ class SubtitleRenderer(ABC):
     def render_word(self, index: int, word: Word, state: ElementState, first_n_letters: Optional[int] = None) -> Optional['Image']:
         pass
     
+    def get_letter_boundaries(self, index: int, word: Word, state: ElementState) -> Optional[List[int]]:
+        '''
+        Returns the x position (in pixels of the image returned by render_word()) where each letter of the word ends,
+        or None if the renderer can't measure them.
+        '''
+        return None
+
+    def render_word_background(self, index: int, word: Word, state: ElementState) -> Optional['Image']:
+        '''
+        Renders the word like render_word() but without its text (only its background, paddings, borders, etc.),
+        or returns None if the renderer can't do it.
+        '''
+        return None
+
     @abstractmethod
     def close_line(self):
         pass
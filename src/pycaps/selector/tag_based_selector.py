@@ -1,5 +1,6 @@
+import numpy as np
 from typing import List
-from pycaps.common import WordClip
+from pycaps.common import WordClip, ElementType, Document
 from pycaps.tag import TagCondition
 
 class TagBasedSelector:
@@ -11,7 +12,17 @@ class TagBasedSelector:
         self._tag_condition = tag_condition
 
     def select(self, clips: List[WordClip]) -> List[WordClip]:
-        return [
-            clip for clip in clips
-            if self._tag_condition.evaluate(list(clip.get_word().get_all_tags_in_document()))
-        ]
+        if not clips:
+            return []
+        document = clips[0].get_document()
+        index = document.get_time_index()
+        selected = self.select_indices(document, index.get_clip_indices(clips))
+        all_clips = index.get_clips()
+        return [all_clips[i] for i in selected]
+
+    def select_indices(self, document: Document, clip_indices: np.ndarray) -> np.ndarray:
+        """Same as select(), but working with positions of the clips in the document time index."""
+        # the words are evaluated at once using the tag bitmasks of the document
+        word_matches = self._tag_condition.evaluate_document(document, ElementType.WORD)
+        clip_words = document.get_time_index().get_clip_parents(ElementType.WORD)[clip_indices]
+        return clip_indices[word_matches[clip_words]]
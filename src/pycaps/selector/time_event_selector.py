@@ -1,6 +1,6 @@
-from typing import List, Union
-from pycaps.common import ElementType, EventType, Word, Line, Segment, WordClip
-from pycaps.utils import times_intersect
+import numpy as np
+from typing import List
+from pycaps.common import ElementType, EventType, WordClip, DocumentTimeIndex
 
 class TimeEventSelector:
     """
@@ -25,48 +25,30 @@ class TimeEventSelector:
         self._delay = delay
 
     def select(self, clips: List[WordClip]) -> List[WordClip]:
-        match self._element_type:
-            case ElementType.WORD:
-                return self.__filter_by_words(clips)
-            case ElementType.LINE:
-                return self.__filter_by_lines(clips)
-            case ElementType.SEGMENT:
-                return self.__filter_by_segments(clips)
-
-    def __get_event_time_range(self, element: Union[Word, Line, Segment]) -> tuple[float, float]:
+        if not clips:
+            return []
+        index = clips[0].get_document().get_time_index()
+        selected = self.select_indices(index, index.get_clip_indices(clips))
+        all_clips = index.get_clips()
+        return [all_clips[i] for i in selected]
+
+    def select_indices(self, index: DocumentTimeIndex, clip_indices: np.ndarray) -> np.ndarray:
+        """Same as select(), but working with positions of the clips in the document time index."""
+        window_starts, window_ends = self.get_event_time_ranges(index)
+        parents = index.get_clip_parents(self._element_type)[clip_indices]
+        clip_starts, clip_ends = index.get_clip_times()
+        mask = DocumentTimeIndex.intervals_intersect(
+            window_starts[parents],
+            window_ends[parents],
+            clip_starts[clip_indices],
+            clip_ends[clip_indices],
+        )
+        return clip_indices[mask]
+
+    def get_event_time_ranges(self, index: DocumentTimeIndex) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the (starts, ends) of the event window of every element of the selector element type."""
         if self._event_type == EventType.ON_NARRATION_STARTS:
-            start = element.time.start + self._delay
+            starts = index.get_starts(self._element_type) + self._delay
         else:  # ENDS_NARRATION
-            start = element.time.end - self._delay - self._duration
-        end = start + self._duration
-        return start, end
-
-    def __filter_by_words(self, clips: List[WordClip]) -> List[WordClip]:
-        return [
-            clip for clip in clips
-            if times_intersect(
-                *self.__get_event_time_range(clip.get_word()),
-                clip.media_clip.start,
-                clip.media_clip.end
-            )
-        ]
-
-    def __filter_by_lines(self, clips: List[WordClip]) -> List[WordClip]:
-        return [
-            clip for clip in clips
-            if times_intersect(
-                *self.__get_event_time_range(clip.get_line()),
-                clip.media_clip.start,
-                clip.media_clip.end
-            )
-        ]
-
-    def __filter_by_segments(self, clips: List[WordClip]) -> List[WordClip]:
-        return [
-            clip for clip in clips
-            if times_intersect(
-                *self.__get_event_time_range(clip.get_segment()),
-                clip.media_clip.start,
-                clip.media_clip.end
-            )
-        ]
+            starts = index.get_ends(self._element_type) - self._delay - self._duration
+        return starts, starts + self._duration
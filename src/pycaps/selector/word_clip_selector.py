@@ -1,3 +1,4 @@
+import numpy as np
 from typing import List, Callable
 from pycaps.tag import TagCondition
 from pycaps.common import ElementType, EventType, Document, WordClip
@@ -8,24 +9,26 @@ class WordClipSelector:
     """
     A flexible and composable selector for WordClips, allowing filters
     by tag, time, or any other property.
+    The filters work with the positions of the clips in the document time index (see Document.get_time_index()).
     """
     def __init__(self):
-        self._filters: List[Callable[[List[WordClip]], List[WordClip]]] = []
+        self._filters: List[Callable[[Document, np.ndarray], np.ndarray]] = []
 
     def filter_by_tag(self, tag_condition: TagCondition) -> 'WordClipSelector':
-        def filter_fn(clips: List[WordClip]) -> List[WordClip]:
-            return TagBasedSelector(tag_condition).select(clips)
-        self._filters.append(filter_fn)
+        self._filters.append(TagBasedSelector(tag_condition).select_indices)
         return self
 
     def filter_by_time(self, when: EventType, what: ElementType, duration: float, delay: float) -> 'WordClipSelector':
-        def filter_fn(clips: List[WordClip]) -> List[WordClip]:
-            return TimeEventSelector(when, what, duration, delay).select(clips)
-        self._filters.append(filter_fn)
+        selector = TimeEventSelector(when, what, duration, delay)
+        self._filters.append(lambda document, clip_indices: selector.select_indices(document.get_time_index(), clip_indices))
         return self
 
     def select(self, document: Document) -> List[WordClip]:
-        result = document.get_word_clips()
+        clips = document.get_time_index().get_clips()
+        return [clips[i] for i in self.select_indices(document)]
+
+    def select_indices(self, document: Document) -> np.ndarray:
+        result = np.arange(len(document.get_time_index().get_clips()))
         for f in self._filters:
-            result = f(result)
+            result = f(document, result)
         return result
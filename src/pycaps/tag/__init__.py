@@ -1,10 +1,11 @@
-from .tag_condition import TagCondition, TagConditionFactory
+from .tag_condition import TagCondition, TagConditionFactory, CompiledTagCondition
 from .definitions import BuiltinTag
 from .tagger import SemanticTagger, StructureTagger
 
 __all__ = [
     "TagCondition",
     "TagConditionFactory",
+    "CompiledTagCondition",
     "BuiltinTag",
     "SemanticTagger",
     "StructureTagger"
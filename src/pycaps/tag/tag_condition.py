@@ -1,41 +1,134 @@
 from abc import ABC, abstractmethod
 import ast
-from typing import List
-from pycaps.common import Tag
+import numpy as np
+from typing import Iterable, List, Tuple
+from pycaps.common import Tag, Document, DocumentTagIndex, ElementType
 import re
 
+# A condition compiled to disjunctive normal form: it matches a mask if any (required, forbidden) clause
+# matches it, and a clause matches if the mask has all the required bits and none of the forbidden bits.
+_Clause = Tuple[int, int]
+
 class TagCondition(ABC):
+    def evaluate(self, tags: Iterable[Tag]) -> bool:
+        return self._evaluate_set(tags if isinstance(tags, (set, frozenset)) else set(tags))
+
+    def compile(self, index: DocumentTagIndex) -> 'CompiledTagCondition':
+        """Compiles the condition to a bitmask predicate over the tag masks of the index (cached per index)."""
+        compiled = getattr(self, "_compiled", None)
+        if compiled is None or compiled.index is not index:
+            compiled = CompiledTagCondition(index, self._to_clauses(index))
+            self._compiled = compiled
+        return compiled
+
+    def evaluate_document(self, document: Document, element_type: ElementType = ElementType.WORD, include_inherited: bool = True) -> np.ndarray:
+        """
+        Evaluates the condition for all the elements of the type in the document at once (in document order).
+        If include_inherited is True, the tags of the line and segment of each element are included,
+        same as evaluating Word.get_all_tags_in_document().
+        """
+        index = document.get_tag_index()
+        return self.compile(index).evaluate_masks(index.get_masks(element_type, include_inherited))
+
     @abstractmethod
-    def evaluate(self, tags: List[Tag]) -> bool:
+    def _evaluate_set(self, tags: set) -> bool:
+        pass
+
+    @abstractmethod
+    def _to_clauses(self, index: DocumentTagIndex) -> List[_Clause]:
         pass
 
 class TagHasCondition(TagCondition):
     def __init__(self, tag: Tag):
         self.tag = tag
 
-    def evaluate(self, tags: List[Tag]) -> bool:
-        return any(self.tag.name == t.name for t in tags)
+    def _evaluate_set(self, tags: set) -> bool:
+        return self.tag in tags
+
+    def _to_clauses(self, index: DocumentTagIndex) -> List[_Clause]:
+        bit = index.get_bit(self.tag)
+        # a tag that isn't in the document never matches
+        return [] if bit is None else [(1 << bit, 0)]
 
 class TagNotCondition(TagCondition):
     def __init__(self, condition: TagCondition):
         self.condition = condition
     
-    def evaluate(self, tags: List[Tag]) -> bool:
-        return not self.condition.evaluate(tags)
+    def _evaluate_set(self, tags: set) -> bool:
+        return not self.condition._evaluate_set(tags)
+
+    def _to_clauses(self, index: DocumentTagIndex) -> List[_Clause]:
+        # not (c1 or c2 ...) = (not c1) and (not c2) ..., and each negated clause is an OR of single-bit clauses
+        negated_clauses = []
+        for required, forbidden in self.condition._to_clauses(index):
+            negated_clauses.append(
+                [(0, bit) for bit in _split_bits(required)] + [(bit, 0) for bit in _split_bits(forbidden)]
+            )
+        return _and_clauses(negated_clauses)
 
 class TagAndCondition(TagCondition):
     def __init__(self, *conditions: TagCondition):
         self.conditions = list(conditions)
     
-    def evaluate(self, tags: List[Tag]) -> bool:
-        return all(condition.evaluate(tags) for condition in self.conditions)
+    def _evaluate_set(self, tags: set) -> bool:
+        return all(condition._evaluate_set(tags) for condition in self.conditions)
+
+    def _to_clauses(self, index: DocumentTagIndex) -> List[_Clause]:
+        return _and_clauses([condition._to_clauses(index) for condition in self.conditions])
 
 class TagOrCondition(TagCondition):
     def __init__(self, *conditions: TagCondition):
         self.conditions = list(conditions)
     
-    def evaluate(self, tags: List[Tag]) -> bool:
-        return any(condition.evaluate(tags) for condition in self.conditions)
+    def _evaluate_set(self, tags: set) -> bool:
+        return any(condition._evaluate_set(tags) for condition in self.conditions)
+
+    def _to_clauses(self, index: DocumentTagIndex) -> List[_Clause]:
+        return _simplify_clauses([clause for condition in self.conditions for clause in condition._to_clauses(index)])
+
+class CompiledTagCondition:
+    """A TagCondition compiled for the bit positions of a DocumentTagIndex."""
+
+    def __init__(self, index: DocumentTagIndex, clauses: List[_Clause]):
+        self.index = index
+        self._clauses = clauses
+        self._block_clauses = [(index.to_blocks(required), index.to_blocks(forbidden)) for required, forbidden in clauses]
+
+    def evaluate_mask(self, mask: int) -> bool:
+        """Evaluates the condition for a single mask (python int)."""
+        return any(mask & required == required and not mask & forbidden for required, forbidden in self._clauses)
+
+    def evaluate_masks(self, masks: np.ndarray) -> np.ndarray:
+        """Evaluates the condition for an array of masks of shape (elements, blocks), returning a boolean array."""
+        result = np.zeros(len(masks), dtype=bool)
+        for required, forbidden in self._block_clauses:
+            matches = np.all(masks & required == required, axis=1)
+            if forbidden.any():
+                matches &= np.all(masks & forbidden == 0, axis=1)
+            result |= matches
+        return result
+
+def _split_bits(mask: int) -> List[int]:
+    bits = []
+    while mask:
+        lowest = mask & -mask
+        bits.append(lowest)
+        mask ^= lowest
+    return bits
+
+def _and_clauses(conditions_clauses: List[List[_Clause]]) -> List[_Clause]:
+    result: List[_Clause] = [(0, 0)]
+    for clauses in conditions_clauses:
+        result = _simplify_clauses([
+            (required1 | required2, forbidden1 | forbidden2)
+            for required1, forbidden1 in result
+            for required2, forbidden2 in clauses
+        ])
+    return result
+
+def _simplify_clauses(clauses: List[_Clause]) -> List[_Clause]:
+    """Removes the contradictory clauses (a bit required and forbidden) and the duplicated ones."""
+    return list(dict.fromkeys(clause for clause in clauses if not clause[0] & clause[1]))
     
 class TagConditionFactory:
     @staticmethod
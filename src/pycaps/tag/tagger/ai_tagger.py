@@ -1,4 +1,7 @@
-from typing import Dict
+import re
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 from pycaps.common import Tag
 from pycaps.api import ApiKeyService, PycapsTaggerApi
 from .external_llm_tagger import ExternalLlmTagger
@@ -6,10 +9,133 @@ from pycaps.ai import LlmProvider
 from pycaps.logger import logger
 
 class AiTagger:
-    def process(self, text: str, rules: Dict[Tag, str]) -> str:
-        llm = LlmProvider.get()
-        if not llm.is_enabled():
-            logger().warning("LLM is not enabled. Ignoring AI tagging rules.")
-            return text
+    """
+    Tags a text with the AI rules, using the Pycaps API (if the API key is set) or the configured LLM.
 
-        return llm.send_message(self._build_prompt(text, rules))
+    Long texts are split into sentence-aligned chunks, and each chunk also contains the last sentences of
+    the previous one, so the terms at the chunk boundaries have context. The chunks are tagged concurrently,
+    and each response is validated on its own: if the LLM changes the text of a chunk, only that chunk is ignored.
+    The tags found in the overlapping sentences of two chunks are merged.
+    """
+
+    _SENTENCE_END_REGEX = re.compile(r"[.!?…]+[\"')\]]*\s+")
+
+    def __init__(self, max_chunk_chars: int = 2000, overlap_sentences: int = 1, max_workers: int = 4):
+        """
+        Args:
+            max_chunk_chars: Maximum number of characters of each chunk (without the overlapped sentences).
+            overlap_sentences: Number of sentences of the previous chunk included at the start of each chunk.
+            max_workers: Maximum number of chunks tagged at the same time.
+        """
+        self._max_chunk_chars = max_chunk_chars
+        self._overlap_sentences = overlap_sentences
+        self._max_workers = max_workers
+
+    def process(self, text: str, rules: Dict[Tag, str]) -> Dict[Tag, List[Tuple[int, int]]]:
+        """
+        Returns the (start, end) positions in the text (end excluded) of the fragments tagged with each tag.
+        """
+        tagger = self._get_tagger()
+        if tagger is None or not text.strip():
+            return {}
+
+        chunks = self._split_into_chunks(text)
+        if len(chunks) == 1:
+            results = [self._tag_chunk(tagger, text, 0, len(text), rules)]
+        else:
+            logger().debug(f"Tagging the text with AI in {len(chunks)} chunks...")
+            with ThreadPoolExecutor(max_workers=min(self._max_workers, len(chunks))) as executor:
+                results = list(executor.map(lambda chunk: self._tag_chunk(tagger, text, chunk[0], chunk[1], rules), chunks))
+
+        matches: Dict[Tag, List[Tuple[int, int]]] = {tag: [] for tag in rules.keys()}
+        for chunk_matches in results:
+            for tag, positions in chunk_matches.items():
+                matches[tag].extend(positions)
+        # the same fragment can be tagged by two chunks (overlapped sentences)
+        return {tag: sorted(set(positions)) for tag, positions in matches.items()}
+
+    def _get_tagger(self) -> Optional[Union[PycapsTaggerApi, ExternalLlmTagger]]:
+        if ApiKeyService.has():
+            return PycapsTaggerApi()
+        try:
+            if LlmProvider.get().is_enabled():
+                return ExternalLlmTagger()
+        except RuntimeError:
+            pass
+        logger().warning("LLM is not enabled. Ignoring AI tagging rules.")
+        return None
+
+    def _split_into_chunks(self, text: str) -> List[Tuple[int, int]]:
+        """Returns the (start, end) positions of the chunks. Every chunk starts and ends at a sentence boundary (or a space)."""
+        sentences = self._split_into_sentences(text)
+        chunks: List[Tuple[int, int]] = []
+        first = 0
+        while first < len(sentences):
+            last = first
+            while last + 1 < len(sentences) and sentences[last + 1][1] - sentences[first][0] <= self._max_chunk_chars:
+                last += 1
+            overlap_start = sentences[max(first - self._overlap_sentences, 0)][0]
+            chunks.append((overlap_start, sentences[last][1]))
+            first = last + 1
+        return chunks
+
+    def _split_into_sentences(self, text: str) -> List[Tuple[int, int]]:
+        boundaries = [0] + [match.end() for match in self._SENTENCE_END_REGEX.finditer(text)] + [len(text)]
+        sentences = []
+        for start, end in zip(boundaries, boundaries[1:]):
+            # sentences longer than a chunk are split between words
+            while end - start > self._max_chunk_chars:
+                split = text.rfind(" ", start, start + self._max_chunk_chars)
+                split = split + 1 if split > start else start + self._max_chunk_chars
+                sentences.append((start, split))
+                start = split
+            if end > start:
+                sentences.append((start, end))
+        return sentences
+
+    def _tag_chunk(self, tagger: Union[PycapsTaggerApi, ExternalLlmTagger], text: str, start: int, end: int, rules: Dict[Tag, str]) -> Dict[Tag, List[Tuple[int, int]]]:
+        chunk = text[start:end]
+        # the LLM usually drops the trailing spaces, so they are not sent
+        stripped_chunk = chunk.rstrip()
+        try:
+            tagged_chunk = tagger.process(stripped_chunk, rules)
+        except Exception as e:
+            logger().warning(f"AI tagging failed for a text fragment, ignoring its tags. Error: {e}")
+            return {}
+
+        if self._remove_tags(tagged_chunk.strip(), rules) != stripped_chunk:
+            logger().warning(f"The tagged text is not equal to the original text, ignoring its tags:\nOriginal text: \"{stripped_chunk}\"")
+            return {}
+
+        tagged_chunk = tagged_chunk.strip()
+        positions_mapping = self._build_text_positions_mapping(tagged_chunk)
+        matches = {}
+        for tag in rules.keys():
+            pattern = f'<{tag.name}>(.*?)</{tag.name}>'
+            matches[tag] = [
+                (start + int(positions_mapping[m.start(1)]), start + int(positions_mapping[m.end(1) - 1]) + 1)
+                for m in re.finditer(pattern, tagged_chunk)
+                if m.end(1) > m.start(1)
+            ]
+        return matches
+
+    def _remove_tags(self, tagged_text: str, rules: Dict[Tag, str]) -> str:
+        for tag in rules.keys():
+            tagged_text = re.sub(f'<{tag.name}>(.*?)</{tag.name}>', r'\1', tagged_text)
+        return tagged_text
+
+    def _build_text_positions_mapping(self, tagged_text: str) -> np.ndarray:
+        """
+        Build a mapping of positions in the tagged text to the original text.
+        The positions inside a tag ("<...>") are mapped to 0.
+        """
+        if not tagged_text:
+            return np.zeros(1, dtype=np.int64)
+        chars = np.frombuffer(tagged_text.encode("utf-32-le"), dtype=np.uint32)
+        positions = np.arange(len(chars))
+        last_open = np.maximum.accumulate(np.where(chars == ord("<"), positions, -1))
+        last_close = np.maximum.accumulate(np.where(chars == ord(">"), positions, -1))
+        last_close_before = np.concatenate(([-1], last_close[:-1]))
+        in_tag = (last_open >= 0) & (last_open > last_close_before)
+        original_positions = np.cumsum(~in_tag) - 1
+        return np.where(in_tag, 0, original_positions)
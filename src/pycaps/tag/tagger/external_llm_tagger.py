@@ -1,8 +1,6 @@
 from typing import Dict
 from pycaps.common import Tag
 from pycaps.ai import LlmProvider
-from pycaps.logger import logger
-import re
 
 class ExternalLlmTagger:
     """
@@ -27,8 +25,8 @@ class ExternalLlmTagger:
             Example: "I feel <emotion>happy</emotion> about my <finance>investment</finance>"
         """
         prompt = self._build_prompt(text, rules)
-        response = self._llm.send_message(prompt)
-        return self._process_response(text, response, rules)
+        # the response is validated by AiTagger (the same way for the Pycaps API responses)
+        return self._llm.send_message(prompt).strip()
 
     def _build_prompt(self, text: str, rules: Dict[Tag, str]) -> str:
         """
@@ -56,21 +54,3 @@ Text to analyze:
 {text}
 
 Tagged version:"""
-
-    def _process_response(self, original_text: str, tagged_text: str, rules: Dict[Tag, str]) -> str:
-        """
-        Validates the LLM response.
-        Ensures the response follows the expected format and contains valid tags.
-        Returns the original text if the tagged text is not valid, otherwise returns the tagged text received.
-        """
-        tagged_text_without_tags = tagged_text.strip()
-        for tag in rules.keys():
-            pattern = f'<{tag.name}>(.*?)</{tag.name}>'
-            tagged_text_without_tags = re.sub(pattern, r'\1', tagged_text_without_tags)
-        
-        if original_text != tagged_text_without_tags:
-            logger().warning(f"The tagged text is not equal to the original text:\nOriginal text: \"{original_text}\"\nTagged text (without tags): \"{tagged_text_without_tags}\"")
-            logger().warning("Using the original text instead.")
-            return original_text
-        
-        return tagged_text.strip()
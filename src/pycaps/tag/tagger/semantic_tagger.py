@@ -1,7 +1,9 @@
 import re
+import numpy as np
 from pycaps.common import Word, Document, Tag
 from .ai_tagger import AiTagger
-from typing import Dict
+from .wordlist_matcher import WordlistMatcher, WordlistMatcherCache
+from typing import Dict, List, Tuple, Optional
 
 class SemanticTagger:
     '''
@@ -9,6 +11,7 @@ class SemanticTagger:
     The matching words are tagged with the tag name of the rule that matched.
 
     This class implements three types of rules:
+     - Wordlist rules: Tag the words (or phrases) that appear in a list
      - Regex rules: Use regular expressions to find and tag matching words
      - AI rules: Use a language model to identify and tag relevant words/phrases related to a received topic
     '''
@@ -17,6 +20,9 @@ class SemanticTagger:
         self._regex_rules: Dict[Tag, str] = {}
         self._ai_rules: Dict[Tag, str] = {}
         self._wordlist_rules: Dict[Tag, list[str]] = {}
+        self._wordlist_files: Dict[Tag, Tuple[str, bool]] = {}
+        self._wordlist_matcher: Optional[WordlistMatcher] = None
+        self._wordlist_matcher_key: Optional[str] = None
         self._ai_tagger = AiTagger()
 
     def add_regex_rule(self, tag: Tag, pattern: str) -> None:
@@ -28,87 +34,117 @@ class SemanticTagger:
         self._ai_rules[tag] = instructions
 
     def add_wordlist_rule(self, tag: Tag, wordlist: list[str]) -> None:
-        self._wordlist_rules[tag] = list(map(lambda w: self._sanitize_word_text(w), wordlist))
+        """Register a new wordlist rule. Each entry can be a word or a phrase (e.g. "new york")."""
+        self._wordlist_rules[tag] = list(wordlist)
+
+    def add_wordlist_file_rule(self, tag: Tag, path: str, phrases: bool = False) -> None:
+        """
+        Register a new wordlist rule from a text file.
+        By default, the file contains words separated by spaces or new lines (each word is an entry).
+        If phrases is True, each line is an entry, so it can be a phrase (e.g. "new york").
+        The compiled rules are cached on disk, so big wordlists are processed only once.
+        """
+        self._wordlist_files[tag] = (path, phrases)
 
     def tag(self, document: Document) -> None:
         """Apply all registered rules to the document."""
-        self._apply_wordlist_rules(document)
-        self._apply_regex_rules(document)
-        self._apply_ai_rules(document)
-
-    def _apply_wordlist_rules(self, document: Document) -> None:
-        for tag, wordlist in self._wordlist_rules.items():
-            for word in document.get_words():
-                if self._sanitize_word_text(word.text) in wordlist:
-                    word.semantic_tags.add(tag)
-
-    def _apply_regex_rules(self, document: Document) -> None:
-        """Apply regex rules to the document."""
         words = document.get_words()
-        text = document.get_text().strip()
+        self._apply_wordlist_rules(words)
+
+        # the text is the words joined by a space, so the words offsets are calculated only once for all the rules
+        text = " ".join(word.text for word in words)
+        word_starts = self._build_word_starts(words)
+        matches = self._find_regex_matches(text)
+        for tag, positions in self._find_ai_matches(text).items():
+            matches.setdefault(tag, []).extend(positions)
+        self._tag_matching_words(words, word_starts, matches)
+        document.invalidate_tag_index()
+
+    def _apply_wordlist_rules(self, words: List[Word]) -> None:
+        matcher = self._get_wordlist_matcher()
+        if matcher is None:
+            return
+        tags = matcher.get_tags()
+        tokens = [WordlistMatcher.sanitize(word.text) for word in words]
+        for tag_index, first_word, last_word in matcher.find_matches(tokens):
+            for word in words[first_word:last_word + 1]:
+                word.semantic_tags.add(tags[tag_index])
+
+    def _get_wordlist_matcher(self) -> Optional[WordlistMatcher]:
+        """Returns the matcher compiled with all the wordlist rules (reused from the cache when the rules didn't change)."""
+        rules_keys = [(tag, WordlistMatcherCache.get_entries_key(wordlist)) for tag, wordlist in self._wordlist_rules.items()]
+        rules_keys += [
+            (tag, WordlistMatcherCache.get_file_key(path) + ("|phrases" if phrases else ""))
+            for tag, (path, phrases) in self._wordlist_files.items()
+        ]
+        if not rules_keys:
+            return None
+        key = WordlistMatcherCache.get_key(rules_keys)
+        if key == self._wordlist_matcher_key:
+            return self._wordlist_matcher
+
+        cache = WordlistMatcherCache()
+        matcher = cache.get(key)
+        if matcher is None:
+            rules = [(tag, [WordlistMatcher.split_entry(entry) for entry in wordlist]) for tag, wordlist in self._wordlist_rules.items()]
+            rules += [(tag, self._read_wordlist_file(path, phrases)) for tag, (path, phrases) in self._wordlist_files.items()]
+            matcher = WordlistMatcher.build(rules)
+            # the in-memory wordlists are usually small, so only the rules with files are saved on disk
+            cache.save(key, matcher, persist=bool(self._wordlist_files))
 
-        for tag, pattern in self._regex_rules.items():
-            matches = re.finditer(pattern, text)
-            matches_positions = [(match.start(), match.end()) for match in matches]
-            self._tag_matching_words(words, matches_positions, tag)
+        self._wordlist_matcher = matcher
+        self._wordlist_matcher_key = key
+        return matcher
 
-    def _apply_ai_rules(self, document: Document) -> None:
+    def _read_wordlist_file(self, path: str, phrases: bool) -> List[Tuple[str, ...]]:
+        with open(path, "r", encoding="utf-8") as f:
+            if not phrases:
+                return [WordlistMatcher.split_entry(word) for word in f.read().split()]
+            return [WordlistMatcher.split_entry(line) for line in f if line.strip()]
+
+    def _find_regex_matches(self, text: str) -> Dict[Tag, List[Tuple[int, int]]]:
+        """Returns the (start, end) positions in the text of the matches of each regex rule."""
+        return {
+            tag: [(match.start(), match.end()) for match in re.finditer(pattern, text)]
+            for tag, pattern in self._regex_rules.items()
+        }
+
+    def _find_ai_matches(self, text: str) -> Dict[Tag, List[Tuple[int, int]]]:
         """
-        Apply AI rules to the document. Internally it uses a LLM with all the rules.
+        Apply AI rules to the text. Internally it uses a LLM with all the rules,
+        and returns the (start, end) positions in the text of the fragments tagged by the LLM.
         """
         if not self._ai_rules:
+            return {}
+        return self._ai_tagger.process(text, self._ai_rules)
+
+    def _build_word_starts(self, words: List[Word]) -> np.ndarray:
+        """Position of each word in the text (words joined by a space)."""
+        starts = np.zeros(len(words), dtype=np.int64)
+        if len(words) > 1:
+            np.cumsum(np.fromiter((len(word.text) + 1 for word in words[:-1]), dtype=np.int64, count=len(words) - 1), out=starts[1:])
+        return starts
+
+    def _tag_matching_words(self, words: List[Word], word_starts: np.ndarray, matches: Dict[Tag, List[Tuple[int, int]]]) -> None:
+        """
+        Tag words that overlap with the found matches. A word covers its text and the following space.
+        Each match is mapped to its first and last word with a binary search over the words starts,
+        and the covered words are marked using a difference array, so it's linear in the number of words and matches.
+        """
+        if not words:
             return
+        for tag, positions in matches.items():
+            if not positions:
+                continue
+            match_starts, match_ends = np.array(positions, dtype=np.int64).reshape(-1, 2).T
+            first_words = np.searchsorted(word_starts, match_starts, side="right") - 1
+            last_words = np.searchsorted(word_starts, match_ends, side="left") - 1
+            first_words, last_words = np.minimum(first_words, last_words), np.maximum(first_words, last_words)
+            first_words = np.clip(first_words, 0, len(words) - 1)
+            last_words = np.clip(last_words, 0, len(words) - 1)
 
-        words = document.get_words()
-        text = document.get_text().strip()
-        
-        tagged_text = self._ai_tagger.process(text, self._ai_rules)
-        text_positions_mapping = self._build_text_positions_mapping(tagged_text)
-        for tag in self._ai_rules.keys():
-            pattern = f'<{tag.name}>(.*?)</{tag.name}>'
-            matches = re.finditer(pattern, tagged_text)
-            matches_positions = [(m.start(1), m.end(1)-1) for m in matches]
-            mapped_matches_positions = [(text_positions_mapping.get(start, 0), text_positions_mapping.get(end, 0)) for start, end in matches_positions]
-            self._tag_matching_words(words, mapped_matches_positions, tag)
-    
-    def _build_text_positions_mapping(self, tagged_text: str) -> dict[int, int]:
-        """Build a mapping of positions in the tagged text to the original text."""
-        mapping = {}
-        tagged_pos = 0
-        original_pos = 0
-        in_tag = False
-        while tagged_pos < len(tagged_text):
-            char = tagged_text[tagged_pos]
-            if char == '<':
-                in_tag = True
-            if not in_tag:
-                mapping[tagged_pos] = original_pos
-                original_pos += 1
-            if char == '>':
-                in_tag = False
-            tagged_pos += 1
-
-        return mapping
-
-    def _tag_matching_words(self, words: list[Word], matches_positions: list[tuple[int, int]], tag: Tag) -> None:
-        """Tag words that match the found patterns."""
-        for match_start, match_end in matches_positions:
-            current_pos = 0
-            for word in words:
-                word_start = current_pos
-                word_end = current_pos + len(word.text) + 1 # for space char
-                
-                if self._word_overlaps_with_match(word_start, word_end, match_start, match_end):
-                    word.semantic_tags.add(tag)
-                
-                current_pos = word_end
-
-    def _word_overlaps_with_match(self, word_start: int, word_end: int, 
-                                 match_start: int, match_end: int) -> bool:
-        """Determine if a word overlaps with a found match."""
-        return (word_start <= match_start < word_end) or \
-               (word_start < match_end <= word_end) or \
-               (match_start <= word_start and match_end >= word_end)
-    
-    def _sanitize_word_text(self, text):
-        return re.sub(r'[^\w]+', '', text).lower()
+            coverage = np.zeros(len(words) + 1, dtype=np.int64)
+            np.add.at(coverage, first_words, 1)
+            np.add.at(coverage, last_words + 1, -1)
+            for word_index in np.flatnonzero(np.cumsum(coverage[:-1]) > 0):
+                words[word_index].semantic_tags.add(tag)
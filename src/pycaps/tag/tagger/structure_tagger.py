@@ -24,6 +24,7 @@ class StructureTagger:
         for tag, get_elements_to_tag in self._rules.items():
             for element in get_elements_to_tag(document):
                 element.structure_tags.add(tag)
+        document.invalidate_tag_index()
 
     def clear(self, document: Document) -> None:
         """Removes all the structure tags in the document"""
@@ -33,6 +34,7 @@ class StructureTagger:
                 line.structure_tags.clear()
                 for word in line.words:
                     word.structure_tags.clear()
+        document.invalidate_tag_index()
 
     def _add_builtin_tags(self) -> None:
         self.add_rule(BuiltinTag.FIRST_WORD_IN_DOCUMENT, lambda document: [document.segments[0].lines[0].words[0]])
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from pycaps.common import Tag
+from pycaps.logger import logger
+
+# (tag, phrases): each phrase is a tuple of sanitized tokens
+WordlistRule = Tuple[Tag, List[Tuple[str, ...]]]
+
+class WordlistMatcher:
+    """
+    Matches all the wordlist rules at once with a token-level Aho-Corasick automaton.
+
+    Entries are phrases of one or more words. The words of the entries and of the document are sanitized
+    (see sanitize()), so "New York!" matches the words ["new", "York,"]. The document is scanned once for all the
+    rules, and each step is a dict lookup, so the cost doesn't depend on the number of entries.
+    """
+
+    _SANITIZE_REGEX = re.compile(r'[^\w]+')
+
+    def __init__(self, tags: List[Tag], goto: List[Dict[str, int]], fail: List[int], outputs: List[List[Tuple[int, int]]]):
+        self._tags = tags
+        self._goto = goto
+        self._fail = fail
+        # (tag index, phrase length) of the phrases that end in each node, including the ones of its fail chain
+        self._outputs = outputs
+
+    @staticmethod
+    def sanitize(text: str) -> str:
+        return WordlistMatcher._SANITIZE_REGEX.sub('', text).lower()
+
+    @staticmethod
+    def split_entry(entry: str) -> Tuple[str, ...]:
+        """Converts a wordlist entry (a word or a phrase) into its sanitized tokens."""
+        return tuple(token for token in map(WordlistMatcher.sanitize, entry.split()) if token)
+
+    @staticmethod
+    def build(rules: List[WordlistRule]) -> 'WordlistMatcher':
+        tags = [tag for tag, _ in rules]
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[set] = [set()]
+        for tag_index, (_, phrases) in enumerate(rules):
+            for phrase in phrases:
+                if not phrase:
+                    continue
+                node = 0
+                for token in phrase:
+                    next_node = goto[node].get(token)
+                    if next_node is None:
+                        next_node = len(goto)
+                        goto[node][token] = next_node
+                        goto.append({})
+                        outputs.append(set())
+                    node = next_node
+                outputs[node].add((tag_index, len(phrase)))
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in goto[node].items():
+                state = fail[node]
+                while state and token not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(token, 0)
+                outputs[child] |= outputs[fail[child]]
+                queue.append(child)
+
+        return WordlistMatcher(tags, goto, fail, [sorted(output) for output in outputs])
+
+    def get_tags(self) -> List[Tag]:
+        return self._tags
+
+    def find_matches(self, tokens: Sequence[str]) -> List[Tuple[int, int, int]]:
+        """
+        Receives the sanitized text of each word of the document,
+        and returns a (tag index, first word, last word) tuple for each phrase found.
+        Empty tokens (words without letters or numbers) break the phrases.
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        matches = []
+        state = 0
+        for position, token in enumerate(tokens):
+            if not token:
+                state = 0
+                continue
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for tag_index, length in outputs[state]:
+                matches.append((tag_index, position - length + 1, position))
+        return matches
+
+    def to_dict(self) -> dict:
+        return {
+            "tags": [tag.name for tag in self._tags],
+            "goto": self._goto,
+            "fail": self._fail,
+            "outputs": self._outputs,
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> 'WordlistMatcher':
+        return WordlistMatcher(
+            [Tag(name) for name in data["tags"]],
+            data["goto"],
+            data["fail"],
+            [[(tag_index, length) for tag_index, length in output] for output in data["outputs"]],
+        )
+
+class WordlistMatcherCache:
+    """
+    Memory and disk cache of compiled wordlist matchers, so big wordlists are not compiled again on every run.
+    The key identifies the rules: the tags plus the content of the in-memory wordlists, or the path, size and
+    modification time of the wordlist files.
+    """
+
+    CACHE_DIR = Path.home() / ".pycaps" / "cache" / "wordlists"
+    _VERSION = 1
+    _MAX_MEMORY_ENTRIES = 16
+    _memory_cache: Dict[str, WordlistMatcher] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_file_key(path: str) -> str:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        return f"file:{path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    @staticmethod
+    def get_entries_key(entries: List[str]) -> str:
+        return "entries:" + hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_key(rules_keys: List[Tuple[Tag, str]]) -> str:
+        key = "|".join([str(WordlistMatcherCache._VERSION)] + [f"{tag.name}={rule_key}" for tag, rule_key in rules_keys])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[WordlistMatcher]:
+        with WordlistMatcherCache._lock:
+            matcher = WordlistMatcherCache._memory_cache.get(key)
+        if matcher is not None:
+            return matcher
+
+        cache_file = self.CACHE_DIR / f"{key}.json"
+        if not cache_file.exists():
+            return None
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                matcher = WordlistMatcher.from_dict(json.load(f))
+        except Exception as e:
+            logger().warning(f"Ignoring invalid wordlist cache file {cache_file}: {e}")
+            return None
+        self._remember(key, matcher)
+        return matcher
+
+    def save(self, key: str, matcher: WordlistMatcher, persist: bool = True) -> None:
+        """Saves the matcher in memory, and also on disk if persist is True."""
+        self._remember(key, matcher)
+        if not persist:
+            return
+        cache_file = self.CACHE_DIR / f"{key}.json"
+        try:
+            with WordlistMatcherCache._lock:
+                self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                temp_file = cache_file.with_suffix(".tmp")
+                with open(temp_file, "w", encoding="utf-8") as f:
+                    json.dump(matcher.to_dict(), f)
+                os.replace(temp_file, cache_file)
+        except OSError as e:
+            logger().warning(f"Unable to save the wordlist cache file {cache_file}: {e}")
+
+    def _remember(self, key: str, matcher: WordlistMatcher) -> None:
+        with WordlistMatcherCache._lock:
+            cache = WordlistMatcherCache._memory_cache
+            if key not in cache and len(cache) >= self._MAX_MEMORY_ENTRIES:
+                cache.pop(next(iter(cache)))
+            cache[key] = matcher
@@ -1,19 +1,34 @@
 # src/pycaps/transcriber/__init__.py
 from .base_transcriber import AudioTranscriber
 from .whisper_audio_transcriber import WhisperAudioTranscriber
-from .splitter import LimitByWordsSplitter, LimitByCharsSplitter, BaseSegmentSplitter, SplitIntoSentencesSplitter
+from .whisper_script_alignment_transcriber import WhisperScriptAlignmentTranscriber
+from .splitter import LimitByWordsSplitter, LimitByCharsSplitter, BaseSegmentSplitter, SplitIntoSentencesSplitter, SplitOnPausesSplitter
 from .editor import TranscriptionEditor
 from .preview_transcriber import PreviewTranscriber
 from .google_audio_transcriber import GoogleAudioTranscriber
+from .speech_map import SpeechMap
+from .voice_activity_detector import VoiceActivityDetector
+from .timed_text_parser import TimedTextParser, TimedTextFormat
+from .timed_text_transcriber import TimedTextTranscriber
+from .transcription_cache import TranscriptionCache, CachedTranscription
 
 __all__ = [
     "AudioTranscriber",
     "WhisperAudioTranscriber",
+    "WhisperScriptAlignmentTranscriber",
     "LimitByWordsSplitter",
     "LimitByCharsSplitter",
     "BaseSegmentSplitter",
     "SplitIntoSentencesSplitter",
+    "SplitOnPausesSplitter",
     "TranscriptionEditor",
     "PreviewTranscriber",
-    "GoogleAudioTranscriber"
+    "GoogleAudioTranscriber",
+    "SpeechMap",
+    "VoiceActivityDetector",
+    "TimedTextParser",
+    "TimedTextFormat",
+    "TimedTextTranscriber",
+    "TranscriptionCache",
+    "CachedTranscription",
 ]
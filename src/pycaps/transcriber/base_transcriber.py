@@ -1,18 +1,59 @@
 from abc import ABC, abstractmethod
+from typing import Optional, Union
+import numpy as np
 from pycaps.common import Document
+from .speech_map import SpeechMap
 
 class AudioTranscriber(ABC):
+    _speech_map: Optional[SpeechMap] = None
+
     @abstractmethod
-    def transcribe(self, audio_path: str) -> Document:
+    def transcribe(self, audio: Union[str, np.ndarray]) -> Document:
         """
-        Transcribes an audio file and returns a Document object.
+        Transcribes an audio and returns a Document object.
 
         The Document object contains information about word-by-word timing information.
 
         Args:
-            audio_path: Path to the audio file to be transcribed.
+            audio: Path to the audio file to be transcribed, or its samples (mono, float32 between -1 and 1, 16kHz).
 
         Returns:
             A Document object.
         """
-        pass 
\ No newline at end of file
+        pass
+
+    def get_cache_key(self) -> Optional[str]:
+        """
+        Returns a string that identifies the transcriber configuration (model, language, etc.),
+        used to cache the transcriptions. If None is returned, the transcriptions are never cached.
+        """
+        return None
+
+    def needs_audio(self) -> bool:
+        """
+        Returns False if the transcriber does not use the received audio,
+        so the pipeline can avoid extracting it from the video.
+        """
+        return True
+
+    def has_audio_relative_times(self) -> bool:
+        """
+        Returns True if the times of the returned document are relative to the start of the received audio
+        (so when only a fragment of the video is transcribed, the pipeline moves them to the video timeline).
+        """
+        return True
+
+    def supports_partial_audio(self) -> bool:
+        """
+        Returns False if the transcriber needs the audio of the whole video, even when only a fragment is rendered
+        (e.g. a script can't be aligned to a fragment of the audio). In that case, the pipeline transcribes the whole video
+        and slices the result.
+        """
+        return True
+
+    def set_speech_map(self, speech_map: Optional[SpeechMap]) -> None:
+        """
+        Sets the speech regions of the audio that will be transcribed.
+        Transcribers that support it only send those regions to the model.
+        """
+        self._speech_map = speech_map
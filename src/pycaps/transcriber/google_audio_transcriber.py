@@ -2,6 +2,10 @@ from pycaps.common import Document, Segment, Line, Word, TimeFragment
 from pycaps.logger import logger
 from .base_transcriber import AudioTranscriber
 from .splitter import SplitIntoSentencesSplitter
+from typing import Union, Optional
+import numpy as np
+
+_ARRAY_SAMPLE_RATE = 16000
 
 class GoogleAudioTranscriber(AudioTranscriber):
     def __init__(self, language: str, model_id: str = 'default'):
@@ -17,19 +21,28 @@ class GoogleAudioTranscriber(AudioTranscriber):
         self._segment_splitter = SplitIntoSentencesSplitter()
         self._client = None
 
-    def transcribe(self, audio_path: str) -> Document:
-        client = self._get_client()
+    def get_cache_key(self) -> Optional[str]:
+        return f"google:{self._model_id}:{self._language}"
 
-        with open(audio_path, "rb") as audio_file:
-            content = audio_file.read()
+    def transcribe(self, audio: Union[str, np.ndarray]) -> Document:
+        client = self._get_client()
 
-        audio = {"content": content}
         config = {
             "model": self._model_id,
             "enable_word_time_offsets": True,
             "enable_automatic_punctuation": True,
             "language_code": self._language,
         }
+        if isinstance(audio, str):
+            with open(audio, "rb") as audio_file:
+                content = audio_file.read()
+        else:
+            # raw samples are sent as 16 bits PCM, the format and rate must be declared since there's no wav header
+            content = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+            config["encoding"] = "LINEAR16"
+            config["sample_rate_hertz"] = _ARRAY_SAMPLE_RATE
+
+        audio = {"content": content}
 
         logger().info("Sending audio to Google Speech-to-Text API for transcription...")
         operation = client.long_running_recognize(config=config, audio=audio)
@@ -1,8 +1,13 @@
 from pycaps.common import Document, Segment, Line, Word, TimeFragment
 from .base_transcriber import AudioTranscriber
+from typing import Union
+import numpy as np
 
 class PreviewTranscriber(AudioTranscriber):
-    def transcribe(self, audio_path: str) -> Document:
+    def needs_audio(self) -> bool:
+        return False
+
+    def transcribe(self, audio: Union[str, np.ndarray]) -> Document:
         document = Document()
         structure = {
             (0, 2): "Hello! This is a sample subtitle preview.",
@@ -0,0 +1,116 @@
+import bisect
+import numpy as np
+from typing import List, Sequence
+from pycaps.common import TimeFragment
+
+class SpeechMap:
+    """
+    Speech regions of an audio track, in seconds relative to the start of that audio.
+
+    It is calculated once (see VoiceActivityDetector) and reused by every step that needs to know
+    where the speech is: the transcriber (to skip silences and music) and the segment splitters
+    (to split on pauses).
+    """
+
+    def __init__(self, regions: Sequence[TimeFragment], duration: float):
+        self._regions: List[TimeFragment] = sorted(regions, key=lambda r: r.start)
+        self._duration: float = duration
+        self._starts: List[float] = [r.start for r in self._regions]
+
+    @property
+    def regions(self) -> List[TimeFragment]:
+        return list(self._regions)
+
+    @property
+    def duration(self) -> float:
+        return self._duration
+
+    def is_empty(self) -> bool:
+        return len(self._regions) == 0
+
+    def get_speech_duration(self) -> float:
+        return sum(r.end - r.start for r in self._regions)
+
+    def is_speech(self, t: float) -> bool:
+        index = bisect.bisect_right(self._starts, t) - 1
+        return index >= 0 and t < self._regions[index].end
+
+    def get_silences(self) -> List[TimeFragment]:
+        silences = []
+        last_end = 0.0
+        for region in self._regions:
+            if region.start > last_end:
+                silences.append(TimeFragment(last_end, region.start))
+            last_end = max(last_end, region.end)
+        if last_end < self._duration:
+            silences.append(TimeFragment(last_end, self._duration))
+        return silences
+
+    def shift(self, offset: float) -> 'SpeechMap':
+        """
+        Returns a new speech map with all the times moved by offset seconds (e.g. from a fragment to the whole video).
+        The first offset seconds of the new map have no speech regions.
+        """
+        regions = [TimeFragment(r.start + offset, r.end + offset) for r in self._regions]
+        return SpeechMap(regions, self._duration + offset)
+
+    def to_dict(self) -> dict:
+        return {"regions": [region.to_dict() for region in self._regions], "duration": self._duration}
+
+    @staticmethod
+    def from_dict(data: dict) -> 'SpeechMap':
+        return SpeechMap([TimeFragment.from_dict(region) for region in data["regions"]], data["duration"])
+
+    def get_silence_duration(self, start: float, end: float) -> float:
+        """Returns how many seconds of the [start, end] interval are silence."""
+        if end <= start:
+            return 0.0
+        speech = 0.0
+        index = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        while index < len(self._regions) and self._regions[index].start < end:
+            region = self._regions[index]
+            speech += max(0.0, min(end, region.end) - max(start, region.start))
+            index += 1
+        return (end - start) - speech
+
+    def compact(self, audio: np.ndarray, sample_rate: int, gap: float = 0.3) -> 'CompactedAudio':
+        """
+        Builds a new audio track containing only the speech regions (separated by `gap` seconds of silence).
+        The returned object maps times of the compacted audio back to the original audio timeline.
+        """
+        gap_samples = np.zeros(int(gap * sample_rate), dtype=audio.dtype)
+        chunks = []
+        compacted_starts = []
+        current = 0.0
+        for region in self._regions:
+            chunk = audio[int(region.start * sample_rate):int(region.end * sample_rate)]
+            if len(chunk) == 0:
+                continue
+            compacted_starts.append((current, region))
+            chunks.append(chunk)
+            chunks.append(gap_samples)
+            current += len(chunk) / sample_rate + gap
+
+        samples = np.concatenate(chunks) if chunks else np.zeros(0, dtype=audio.dtype)
+        return CompactedAudio(samples, compacted_starts)
+
+class CompactedAudio:
+    """Audio built by SpeechMap.compact(), with the information required to go back to the original timeline."""
+
+    def __init__(self, samples: np.ndarray, compacted_starts: List[tuple[float, TimeFragment]]):
+        self._samples = samples
+        self._starts: List[float] = [start for start, _ in compacted_starts]
+        self._regions: List[TimeFragment] = [region for _, region in compacted_starts]
+
+    @property
+    def samples(self) -> np.ndarray:
+        return self._samples
+
+    def to_original_time(self, t: float) -> float:
+        index = bisect.bisect_right(self._starts, t) - 1
+        if index < 0:
+            return self._regions[0].start if self._regions else t
+        region = self._regions[index]
+        # times that fall into the artificial gap are clamped to the end of the region
+        return region.start + min(t - self._starts[index], region.end - region.start)
+
@@ -2,11 +2,13 @@
 from .limit_by_words_splitter import LimitByWordsSplitter
 from .limit_by_chars_splitter import LimitByCharsSplitter
 from .split_into_sentences_splitter import SplitIntoSentencesSplitter
+from .split_on_pauses_splitter import SplitOnPausesSplitter
 from .base_segment_splitter import BaseSegmentSplitter
 
 __all__ = [
     "LimitByWordsSplitter",
     "LimitByCharsSplitter",
     "SplitIntoSentencesSplitter",
+    "SplitOnPausesSplitter",
     "BaseSegmentSplitter",
 ]
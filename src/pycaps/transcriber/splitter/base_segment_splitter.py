@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 from pycaps.common import Document
+from ..speech_map import SpeechMap
 
 class BaseSegmentSplitter(ABC):
+    _speech_map: Optional[SpeechMap] = None
 
     @abstractmethod
     def split(self, document: Document) -> None:
@@ -10,3 +13,10 @@ class BaseSegmentSplitter(ABC):
         It assumes that the segments have not been splitted into lines yet.
         '''
         pass
+
+    def set_speech_map(self, speech_map: Optional[SpeechMap]) -> None:
+        '''
+        Sets the speech regions of the transcribed audio.
+        Splitters can use it to avoid splitting the segments in the middle of the speech.
+        '''
+        self._speech_map = speech_map
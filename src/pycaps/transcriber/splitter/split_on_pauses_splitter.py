@@ -0,0 +1,51 @@
+from .base_segment_splitter import BaseSegmentSplitter
+from pycaps.common import Document, Segment, Word, TimeFragment, Line
+
+class SplitOnPausesSplitter(BaseSegmentSplitter):
+    """
+    A segment splitter that splits each segment where the speaker makes a pause.
+
+    If a speech map is available (voice activity detection enabled), a pause is the silence detected between two consecutive words.
+    Otherwise, the gap between the end of a word and the start of the next one is used.
+
+    For example,
+    min_pause = 0.5
+    segment 1: "Hello world [1 second of silence] This is a test"
+
+    The splitter will return:
+    segment 1: "Hello world"
+    segment 2: "This is a test"
+    """
+    def __init__(self, min_pause: float = 0.5):
+        '''
+        min_pause: the minimum duration (in seconds) of a pause to split the segment.
+        '''
+        self._min_pause = min_pause
+
+    def split(self, document: Document) -> None:
+        new_segments = []
+        for segment in document.segments:
+            current_words: list[Word] = []
+            for word in segment.get_words():
+                if current_words and self._get_pause_duration(current_words[-1], word) >= self._min_pause:
+                    new_segments.append(self._build_segment(current_words))
+                    current_words = []
+                current_words.append(word)
+
+            if current_words:
+                new_segments.append(self._build_segment(current_words))
+
+        document.segments.set_all(new_segments)
+
+    def _get_pause_duration(self, previous_word: Word, next_word: Word) -> float:
+        if self._speech_map is not None:
+            return self._speech_map.get_silence_duration(previous_word.time.end, next_word.time.start)
+        return next_word.time.start - previous_word.time.end
+
+    def _build_segment(self, words: list[Word]) -> Segment:
+        time = TimeFragment(start=words[0].time.start, end=words[-1].time.end)
+        new_segment = Segment(time=time)
+        new_line = Line(time=time)
+        new_line.words.set_all(words)
+        new_segment.lines.add(new_line)
+        return new_segment
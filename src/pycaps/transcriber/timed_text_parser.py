@@ -0,0 +1,218 @@
+import html
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import List, Optional, Tuple
+from pycaps.common import Document, Segment, Line, Word, TimeFragment
+
+class TimedTextFormat(str, Enum):
+    SRT = "srt"
+    VTT = "vtt"
+    WHISPER_JSON = "whisper-json"
+
+    @staticmethod
+    def from_path(path: str) -> 'TimedTextFormat':
+        extension = os.path.splitext(path)[1].lower()
+        match extension:
+            case ".srt":
+                return TimedTextFormat.SRT
+            case ".vtt":
+                return TimedTextFormat.VTT
+            case ".json":
+                return TimedTextFormat.WHISPER_JSON
+            case _:
+                raise ValueError(f"Unable to detect the timed text format of '{path}'. Supported extensions: .srt, .vtt, .json")
+
+@dataclass
+class _Cue:
+    start: float
+    end: float
+    text: str
+    # (text, start, end) of each word, when the file has word level timing (None if the word time is unknown)
+    words: Optional[List[Tuple[str, Optional[float], Optional[float]]]] = field(default=None)
+
+_TIMESTAMP_PATTERN = r"(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{1,3})"
+_CUE_TIMING_REGEX = re.compile(rf"^\s*{_TIMESTAMP_PATTERN}\s*-->\s*{_TIMESTAMP_PATTERN}")
+_VTT_INLINE_TIMESTAMP_REGEX = re.compile(rf"<{_TIMESTAMP_PATTERN}>")
+_TAG_REGEX = re.compile(r"<[^>]*>|\{\\[^}]*\}")
+
+class TimedTextParser:
+    """
+    Converts caption files (SRT, WebVTT, Whisper/faster-whisper JSON) into a Document.
+
+    Each cue becomes a segment with a single line. If the file doesn't have word level timing,
+    the cue duration is distributed between its words proportionally to their number of characters.
+    """
+
+    def parse(self, path: str, format: Optional[TimedTextFormat] = None) -> Document:
+        format = format or TimedTextFormat.from_path(path)
+        with open(path, "r", encoding="utf-8-sig") as f:
+            content = f.read()
+        return self.parse_content(content, format)
+
+    def parse_content(self, content: str, format: TimedTextFormat) -> Document:
+        match format:
+            case TimedTextFormat.SRT:
+                cues = self._parse_srt(content)
+            case TimedTextFormat.VTT:
+                cues = self._parse_vtt(content)
+            case TimedTextFormat.WHISPER_JSON:
+                cues = self._parse_whisper_json(content)
+            case _:
+                raise ValueError(f"Invalid timed text format: {format}")
+        return self._build_document(cues)
+
+    def _parse_srt(self, content: str) -> List[_Cue]:
+        cues = []
+        for block in self._split_blocks(content):
+            timing_index = next((i for i, line in enumerate(block) if _CUE_TIMING_REGEX.match(line)), None)
+            if timing_index is None:
+                continue
+            start, end = self._parse_cue_timing(block[timing_index])
+            text = self._clean_text(" ".join(block[timing_index + 1:]))
+            if text:
+                cues.append(_Cue(start, end, text))
+        return cues
+
+    def _parse_vtt(self, content: str) -> List[_Cue]:
+        cues = []
+        for block in self._split_blocks(content):
+            if block[0].startswith(("WEBVTT", "NOTE", "STYLE", "REGION")):
+                continue
+            timing_index = next((i for i, line in enumerate(block) if _CUE_TIMING_REGEX.match(line)), None)
+            if timing_index is None:
+                continue
+            start, end = self._parse_cue_timing(block[timing_index])
+            raw_text = " ".join(block[timing_index + 1:])
+            text = self._clean_text(_VTT_INLINE_TIMESTAMP_REGEX.sub(" ", raw_text), unescape=True)
+            if not text:
+                continue
+            words = self._parse_vtt_inline_timestamps(raw_text, start) if _VTT_INLINE_TIMESTAMP_REGEX.search(raw_text) else None
+            cues.append(_Cue(start, end, text, words))
+        return cues
+
+    def _parse_vtt_inline_timestamps(self, raw_text: str, cue_start: float) -> List[Tuple[str, float, Optional[float]]]:
+        """
+        Parses karaoke style cues (e.g. "<00:00:01.000>Hello <00:00:01.500>world").
+        Every word starts at the last timestamp seen before it, its end is the start of the next word.
+        """
+        words: List[Tuple[str, float, Optional[float]]] = []
+        current_time = cue_start
+        position = 0
+        for match in _VTT_INLINE_TIMESTAMP_REGEX.finditer(raw_text):
+            words.extend((w, current_time, None) for w in self._clean_text(raw_text[position:match.start()], unescape=True).split())
+            current_time = self._parse_timestamp(match.groups())
+            position = match.end()
+        words.extend((w, current_time, None) for w in self._clean_text(raw_text[position:], unescape=True).split())
+        return words
+
+    def _parse_whisper_json(self, content: str) -> List[_Cue]:
+        data = json.loads(content)
+        # openai-whisper saves {"segments": [...]}, faster-whisper results are usually saved as a list of segments
+        segments = data.get("segments", []) if isinstance(data, dict) else data
+        cues = []
+        for segment in segments:
+            text = str(segment.get("text", "")).strip()
+            words = None
+            if segment.get("words"):
+                # WhisperX leaves out the times of the words it can't align (e.g. numbers), they're interpolated later
+                words = [
+                    (str(w.get("word", w.get("text", ""))).strip(), self._get_optional_time(w, "start"), self._get_optional_time(w, "end"))
+                    for w in segment["words"]
+                ]
+                words = [w for w in words if w[0]]
+            if text or words:
+                cues.append(_Cue(float(segment["start"]), float(segment["end"]), text, words))
+        return cues
+
+    def _build_document(self, cues: List[_Cue]) -> Document:
+        document = Document()
+        for cue in cues:
+            words = self._build_words(cue)
+            if not words:
+                continue
+            segment_time = TimeFragment(start=min(cue.start, words[0].time.start), end=max(cue.end, words[-1].time.end))
+            segment = Segment(time=segment_time)
+            line = Line(time=segment_time)
+            line.words.extend(words)
+            segment.lines.add(line)
+            document.segments.add(segment)
+        return document
+
+    def _get_optional_time(self, data: dict, key: str) -> Optional[float]:
+        value = data.get(key)
+        return float(value) if value is not None else None
+
+    def _build_words(self, cue: _Cue) -> List[Word]:
+        if not cue.words:
+            return self._interpolate_words(cue.text.split(), cue.start, cue.end)
+
+        cue_words = self._fill_missing_starts(cue)
+        words = []
+        for index, (text, start, end) in enumerate(cue_words):
+            if end is None:
+                end = cue_words[index + 1][1] if index + 1 < len(cue_words) else cue.end
+            if end <= start:
+                end = start + 0.01
+            words.append(Word(text=text, time=TimeFragment(start=start, end=end)))
+        return words
+
+    def _fill_missing_starts(self, cue: _Cue) -> List[Tuple[str, float, Optional[float]]]:
+        """
+        Returns the words of the cue, with the times of the words without start interpolated (like the cues without words)
+        between the end of the previous word (or the cue start) and the start of the next word (or the cue end).
+        """
+        words = list(cue.words)
+        index = 0
+        while index < len(words):
+            if words[index][1] is not None:
+                index += 1
+                continue
+            run_end = index
+            while run_end < len(words) and words[run_end][1] is None:
+                run_end += 1
+            if index == 0:
+                gap_start = cue.start
+            else:
+                _, previous_start, previous_end = words[index - 1]
+                gap_start = previous_end if previous_end is not None else previous_start
+            gap_end = words[run_end][1] if run_end < len(words) else cue.end
+            interpolated = self._interpolate_words([text for text, _, _ in words[index:run_end]], gap_start, max(gap_end, gap_start))
+            for offset, word in enumerate(interpolated):
+                words[index + offset] = (word.text, word.time.start, word.time.end)
+            index = run_end
+        return words
+
+    def _interpolate_words(self, texts: List[str], start: float, end: float) -> List[Word]:
+        total_chars = sum(len(text) for text in texts)
+        if total_chars == 0:
+            return []
+        duration = max(end - start, 0.01 * len(texts))
+        words = []
+        current = start
+        for text in texts:
+            word_end = current + duration * len(text) / total_chars
+            words.append(Word(text=text, time=TimeFragment(start=current, end=word_end)))
+            current = word_end
+        return words
+
+    def _split_blocks(self, content: str) -> List[List[str]]:
+        blocks = re.split(r"\n\s*\n", content.replace("\r\n", "\n").replace("\r", "\n"))
+        return [[line.strip() for line in block.strip().split("\n")] for block in blocks if block.strip()]
+
+    def _parse_cue_timing(self, line: str) -> Tuple[float, float]:
+        groups = _CUE_TIMING_REGEX.match(line).groups()
+        return self._parse_timestamp(groups[:4]), self._parse_timestamp(groups[4:])
+
+    def _parse_timestamp(self, groups: Tuple[Optional[str], ...]) -> float:
+        hours, minutes, seconds, fraction = groups
+        return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(fraction.ljust(3, "0")) / 1000
+
+    def _clean_text(self, text: str, unescape: bool = False) -> str:
+        """Removes the tags. If unescape is True, the character references (e.g. "&amp;") are decoded after that (VTT)."""
+        text = _TAG_REGEX.sub("", text)
+        if unescape:
+            text = html.unescape(text)
+        return " ".join(text.split())
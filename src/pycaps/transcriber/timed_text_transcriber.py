@@ -0,0 +1,32 @@
+from .base_transcriber import AudioTranscriber
+from .timed_text_parser import TimedTextParser, TimedTextFormat
+from typing import Optional, Union
+import numpy as np
+from pycaps.common import Document
+from pycaps.logger import logger
+
+class TimedTextTranscriber(AudioTranscriber):
+    def __init__(self, path: str, format: Optional[TimedTextFormat] = None):
+        """
+        Builds the document from an existing caption file (SRT, WebVTT or Whisper/faster-whisper JSON)
+        instead of transcribing the audio. No model is loaded and the audio is not extracted.
+
+        Args:
+            path: Path to the caption file. Its times must use the video timeline.
+            format: (Optional) Format of the file. If None, it's detected from the file extension.
+        """
+        self._path = path
+        self._format = format
+
+    def needs_audio(self) -> bool:
+        return False
+
+    def has_audio_relative_times(self) -> bool:
+        return False
+
+    def transcribe(self, audio: Union[str, np.ndarray]) -> Document:
+        document = TimedTextParser().parse(self._path, self._format)
+        if not document.segments:
+            logger().warning(f"No captions were found in {self._path}.")
+        logger().debug(f"Captions loaded from {self._path}: {len(document.segments)} segments.")
+        return document
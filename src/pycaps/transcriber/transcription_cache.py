@@ -0,0 +1,108 @@
+import bisect
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional, List
+from pycaps.common import Document, Segment
+from .speech_map import SpeechMap
+from pycaps.logger import logger
+
+class TranscriptionCache:
+    """
+    Disk cache of full video transcriptions.
+
+    A transcription is stored once per video (identified by its path, size and modification time) and transcriber
+    configuration (see AudioTranscriber.get_cache_key()). Later previews of the same video don't call the
+    transcriber again, they just slice the cached document.
+    The speech map of the whole video (see VoiceActivityDetector) can be saved with the transcription,
+    identified by the key of the detector that calculated it, so the segment splitters don't need the audio either.
+    """
+
+    CACHE_DIR = Path.home() / ".pycaps" / "cache" / "transcriptions"
+    _lock = threading.Lock()
+
+    def __init__(self, video_path: str, transcriber_key: str):
+        self._video_path = os.path.abspath(video_path)
+        self._transcriber_key = transcriber_key
+
+    def has(self) -> bool:
+        return self._get_cache_file().exists()
+
+    def load(self) -> Optional['CachedTranscription']:
+        cache_file = self._get_cache_file()
+        if not cache_file.exists():
+            return None
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            document = Document.from_dict(data)
+            speech_map_data = data.get("speech_map")
+            speech_map = SpeechMap.from_dict(speech_map_data) if speech_map_data else None
+            detector_key = speech_map_data.get("detector_key") if speech_map_data else None
+            logger().debug(f"Transcription loaded from cache: {cache_file}")
+            return CachedTranscription(document, speech_map, detector_key)
+        except Exception as e:
+            logger().warning(f"Ignoring invalid transcription cache file {cache_file}: {e}")
+            return None
+
+    def save(self, document: Document, speech_map: Optional[SpeechMap] = None, detector_key: Optional[str] = None) -> None:
+        """
+        Saves the transcription of the whole video.
+        If speech_map is received, it's saved with it (detector_key identifies the detector configuration that calculated it).
+        """
+        cache_file = self._get_cache_file()
+        data = document.to_dict()
+        if speech_map is not None:
+            data["speech_map"] = {**speech_map.to_dict(), "detector_key": detector_key}
+        with TranscriptionCache._lock:
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # written to a temp file first, so a concurrent reader never sees a partial file
+            temp_file = cache_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_file, cache_file)
+        logger().debug(f"Transcription saved to cache: {cache_file}")
+
+    def _get_cache_file(self) -> Path:
+        stat = os.stat(self._video_path)
+        key = f"{self._video_path}|{stat.st_size}|{stat.st_mtime_ns}|{self._transcriber_key}"
+        return self.CACHE_DIR / (hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+class CachedTranscription:
+    """A full transcription indexed by time, so any window can be extracted without scanning every segment."""
+
+    def __init__(self, document: Document, speech_map: Optional[SpeechMap] = None, detector_key: Optional[str] = None):
+        self._document = document
+        self._speech_map = speech_map
+        self._detector_key = detector_key
+        self._segments: List[Segment] = sorted(document.segments, key=lambda s: s.time.start)
+        self._starts: List[float] = [s.time.start for s in self._segments]
+        # segments could overlap, so we keep the max end seen so far to know where the window can begin
+        self._max_ends: List[float] = []
+        max_end = float("-inf")
+        for segment in self._segments:
+            max_end = max(max_end, segment.time.end)
+            self._max_ends.append(max_end)
+
+    def slice(self, start: float, end: float) -> Document:
+        """
+        Returns a new document with the segments that intersect the [start, end] interval.
+        The segments are copied, so the returned document can be modified freely.
+        """
+        first = bisect.bisect_left(self._max_ends, start)
+        last = bisect.bisect_right(self._starts, end)
+        document = Document()
+        for segment in self._segments[first:last]:
+            if segment.time.end >= start:
+                document.segments.add(Segment.from_dict(segment.to_dict()))
+        return document
+
+    def get_document(self) -> Document:
+        """Returns the whole transcription (it must not be modified, use slice() to get a copy)."""
+        return self._document
+
+    def get_speech_map(self, detector_key: str) -> Optional[SpeechMap]:
+        """Returns the speech map of the whole video, if it was calculated by a detector with the given key."""
+        return self._speech_map if self._detector_key == detector_key else None
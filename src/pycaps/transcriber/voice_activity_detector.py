@@ -0,0 +1,108 @@
+import numpy as np
+from typing import List
+from pycaps.common import TimeFragment
+from pycaps.logger import logger
+from .speech_map import SpeechMap
+
+class VoiceActivityDetector:
+    """
+    Energy based voice activity detector.
+
+    It splits the audio in short frames, calculates the loudness of each one, and marks as speech
+    the frames that are louder than an adaptive threshold (noise floor + margin).
+    Short gaps between speech frames are merged, short bursts are discarded and every region is padded,
+    so the words at the edges of a region are not cut.
+
+    Keep in mind it's a cheap pre-pass: loud music beds will still be considered speech,
+    but long intros, quiet music and pauses are skipped.
+    """
+
+    def __init__(
+            self,
+            frame_duration: float = 0.03,
+            threshold_margin_db: float = 12.0,
+            min_threshold_db: float = -50.0,
+            min_speech_duration: float = 0.25,
+            min_silence_duration: float = 0.6,
+            padding: float = 0.2,
+        ):
+        '''
+        frame_duration: duration (in seconds) of each analyzed frame.
+        threshold_margin_db: how many decibels above the noise floor a frame must be to be considered speech.
+        min_threshold_db: the threshold never goes below this value (in dBFS), so digital silence is never speech.
+        min_speech_duration: speech regions shorter than this value (in seconds) are discarded.
+        min_silence_duration: silences shorter than this value (in seconds) are merged into the surrounding speech.
+        padding: seconds added before and after each speech region.
+        '''
+        if frame_duration <= 0:
+            raise ValueError(f"frame_duration must be greater than 0 (received: {frame_duration})")
+
+        self._frame_duration = frame_duration
+        self._threshold_margin_db = threshold_margin_db
+        self._min_threshold_db = min_threshold_db
+        self._min_speech_duration = min_speech_duration
+        self._min_silence_duration = min_silence_duration
+        self._padding = padding
+
+    def get_cache_key(self) -> str:
+        """Returns a string that identifies the detector configuration (used in the transcription cache keys)."""
+        return (
+            f"vad:{self._frame_duration}:{self._threshold_margin_db}:{self._min_threshold_db}:"
+            f"{self._min_speech_duration}:{self._min_silence_duration}:{self._padding}"
+        )
+
+    def detect(self, audio: np.ndarray, sample_rate: int = 16000) -> SpeechMap:
+        duration = len(audio) / sample_rate
+        frame_size = max(int(self._frame_duration * sample_rate), 1)
+        number_of_frames = len(audio) // frame_size
+        if number_of_frames == 0:
+            return SpeechMap([], duration)
+
+        frames = audio[:number_of_frames * frame_size].astype(np.float32).reshape(number_of_frames, frame_size)
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        loudness_db = 20 * np.log10(rms + 1e-10)
+
+        noise_floor_db = float(np.percentile(loudness_db, 10))
+        threshold_db = max(self._min_threshold_db, noise_floor_db + self._threshold_margin_db)
+        is_speech = loudness_db > threshold_db
+
+        frame_time = frame_size / sample_rate
+        regions = self._build_regions(is_speech, frame_time)
+        regions = self._merge_close_regions(regions)
+        regions = [r for r in regions if r.end - r.start >= self._min_speech_duration]
+        regions = self._pad_regions(regions, duration)
+
+        speech_map = SpeechMap(regions, duration)
+        logger().debug(
+            f"Voice activity detection: {len(regions)} speech regions, "
+            f"{speech_map.get_speech_duration():.2f}s of speech in {duration:.2f}s of audio "
+            f"(threshold: {threshold_db:.1f} dBFS)"
+        )
+        return speech_map
+
+    def _build_regions(self, is_speech: np.ndarray, frame_time: float) -> List[TimeFragment]:
+        # indexes where the frames change from silence to speech (and vice versa)
+        padded = np.concatenate(([False], is_speech, [False]))
+        changes = np.flatnonzero(padded[1:] != padded[:-1])
+        starts, ends = changes[0::2], changes[1::2]
+        return [TimeFragment(float(start * frame_time), float(end * frame_time)) for start, end in zip(starts, ends)]
+
+    def _merge_close_regions(self, regions: List[TimeFragment]) -> List[TimeFragment]:
+        merged: List[TimeFragment] = []
+        for region in regions:
+            if merged and region.start - merged[-1].end < self._min_silence_duration:
+                merged[-1].end = region.end
+            else:
+                merged.append(region)
+        return merged
+
+    def _pad_regions(self, regions: List[TimeFragment], duration: float) -> List[TimeFragment]:
+        padded: List[TimeFragment] = []
+        for region in regions:
+            start = max(0.0, region.start - self._padding)
+            end = min(duration, region.end + self._padding)
+            if padded and start <= padded[-1].end:
+                padded[-1].end = end
+            else:
+                padded.append(TimeFragment(start, end))
+        return padded
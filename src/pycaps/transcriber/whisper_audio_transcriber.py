@@ -1,5 +1,7 @@
 from .base_transcriber import AudioTranscriber
-from typing import Optional, Any
+from .speech_map import CompactedAudio
+from typing import Optional, Any, Union
+import numpy as np
 from pycaps.common import Document, Segment, Line, Word, TimeFragment
 from pycaps.logger import logger
 
@@ -16,13 +18,26 @@ class WhisperAudioTranscriber(AudioTranscriber):
         self._model_size = model_size
         self._language = language
         self._model = model
+        self._has_custom_model = model is not None
 
-    def transcribe(self, audio_path: str) -> Document:
+    def get_cache_key(self) -> Optional[str]:
+        # we can't know which model was received, so the transcriptions of custom models are not cached
+        if self._has_custom_model:
+            return None
+        return f"whisper:{self._model_size}:{self._language}"
+
+    def transcribe(self, audio: Union[str, np.ndarray]) -> Document:
         """
-        Transcribes the audio file and returns segments with timestamps.
+        Transcribes the audio (file path or 16kHz float32 samples) and returns segments with timestamps.
+        If a speech map was set, only the speech regions are sent to Whisper.
         """
+        audio, compacted_audio = self._get_audio_to_transcribe(audio)
+        if compacted_audio is not None and len(compacted_audio.samples) == 0:
+            logger().warning("No speech was detected in the audio. Skipping transcription.")
+            return Document()
+
         result = self._get_model().transcribe(
-            audio_path,
+            audio,
             word_timestamps=True,
             language=self._language,
             verbose=False # TODO: we should pass our --verbose param here
@@ -35,8 +50,8 @@ class WhisperAudioTranscriber(AudioTranscriber):
         logger().debug(f"Whisper result: {result}")
         document = Document()
         for segment_info in result["segments"]:
-            segment_start = float(segment_info["start"])
-            segment_end = float(segment_info["end"])
+            segment_start = self._to_original_time(float(segment_info["start"]), compacted_audio)
+            segment_end = self._to_original_time(float(segment_info["end"]), compacted_audio)
             if segment_start == segment_end:
                 segment_end = segment_start + 0.01
             segment_time = TimeFragment(start=segment_start, end=segment_end)
@@ -54,8 +69,8 @@ class WhisperAudioTranscriber(AudioTranscriber):
                 if not word_text:
                     continue
 
-                word_start = float(word_entry["start"])
-                word_end = float(word_entry["end"])
+                word_start = self._to_original_time(float(word_entry["start"]), compacted_audio)
+                word_end = self._to_original_time(float(word_entry["end"]), compacted_audio)
                 if word_start == word_end:
                     word_end = word_start + 0.01
                 word_time = TimeFragment(start=word_start, end=word_end)
@@ -69,6 +84,21 @@ class WhisperAudioTranscriber(AudioTranscriber):
 
         return document 
 
+    def _get_audio_to_transcribe(self, audio: Union[str, np.ndarray]) -> tuple[Union[str, np.ndarray], Optional[CompactedAudio]]:
+        if self._speech_map is None:
+            return audio, None
+
+        import whisper
+
+        if isinstance(audio, str):
+            audio = whisper.load_audio(audio)
+        compacted_audio = self._speech_map.compact(audio, whisper.audio.SAMPLE_RATE)
+        logger().debug(f"Sending {len(compacted_audio.samples) / whisper.audio.SAMPLE_RATE:.2f}s of speech to Whisper (original audio: {len(audio) / whisper.audio.SAMPLE_RATE:.2f}s).")
+        return compacted_audio.samples, compacted_audio
+
+    def _to_original_time(self, t: float, compacted_audio: Optional[CompactedAudio]) -> float:
+        return compacted_audio.to_original_time(t) if compacted_audio else t
+
     def _get_model(self):
         if self._model:
             return self._model
@@ -0,0 +1,187 @@
+from .whisper_audio_transcriber import WhisperAudioTranscriber
+from typing import Optional, Any, Union, List, Tuple
+import hashlib
+import math
+import numpy as np
+from pycaps.common import Document, Segment, Line, Word, TimeFragment
+from pycaps.logger import logger
+
+class WhisperScriptAlignmentTranscriber(WhisperAudioTranscriber):
+    # Words whose end is closer than this value (in seconds) to the end of a window are aligned again in the next one,
+    # since the aligner compresses the text that doesn't fit in the window at its end.
+    _WINDOW_END_MARGIN = 2.0
+    # We send more words than we expect in each window, so the window audio is always covered by the text.
+    _WORDS_ESTIMATION_FACTOR = 1.5
+    _MIN_WORDS_PER_WINDOW = 8
+
+    def __init__(self, script: str, model_size: str = "base", language: Optional[str] = None, model: Optional[Any] = None):
+        """
+        Aligns a known script to the audio using Whisper's cross-attention (forced alignment).
+        There is no decoding (no beam search), so it is much faster than a transcription,
+        and the resulting document contains exactly the words of the script.
+
+        Args:
+            script: The text said in the audio. Each non-empty line of the script becomes a segment.
+            model_size: Size of the Whisper model to use (e.g., "tiny", "base").
+            language: Language of the audio (e.g., "en", "es"). If None, it's detected from the first window.
+            model: (Optional) A pre-loaded Whisper model instance. If provided, model_size is ignored.
+        """
+        super().__init__(model_size=model_size, language=language, model=model)
+        self._script_lines: List[List[str]] = [line.split() for line in script.splitlines() if line.strip()]
+        self._script_hash = hashlib.sha256(script.encode("utf-8")).hexdigest()
+
+    def get_cache_key(self) -> Optional[str]:
+        key = super().get_cache_key()
+        return f"{key}:alignment:{self._script_hash}" if key else None
+
+    def supports_partial_audio(self) -> bool:
+        # the script contains the words of the whole video, so it must be aligned to the whole audio
+        return False
+
+    def transcribe(self, audio: Union[str, np.ndarray]) -> Document:
+        """
+        Aligns the script to the audio (file path or 16kHz float32 samples) and returns the script words with timestamps.
+        If a speech map was set, only the speech regions are used.
+        """
+        import whisper
+
+        words = [word for line in self._script_lines for word in line]
+        if not words:
+            logger().warning("The script is empty. Nothing to align.")
+            return Document()
+
+        audio, compacted_audio = self._get_audio_to_transcribe(audio)
+        if isinstance(audio, str):
+            audio = whisper.load_audio(audio)
+        if len(audio) == 0:
+            logger().warning("No speech was detected in the audio. Skipping alignment.")
+            return Document()
+
+        times = self._align(audio, words)
+        times = [
+            (self._to_original_time(start, compacted_audio), self._to_original_time(end, compacted_audio))
+            for start, end in times
+        ]
+        return self._build_document(times)
+
+    def _align(self, audio: np.ndarray, words: List[str]) -> List[Tuple[float, float]]:
+        """Returns the (start, end) time of each word, aligning the script window by window (30 seconds each)."""
+        from whisper.audio import log_mel_spectrogram, pad_or_trim, N_FRAMES, N_SAMPLES, FRAMES_PER_SECOND, SAMPLE_RATE
+
+        model = self._get_model()
+        mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES).to(model.device)
+        content_frames = mel.shape[-1] - N_FRAMES
+        window_duration = N_FRAMES / FRAMES_PER_SECOND
+        tokenizer = self._get_tokenizer(pad_or_trim(mel[:, :N_FRAMES], N_FRAMES))
+
+        words_per_second = len(words) / max(len(audio) / SAMPLE_RATE, 1.0)
+        times: List[Tuple[float, float]] = []
+        seek = 0
+        while len(times) < len(words) and seek < content_frames:
+            offset = seek / FRAMES_PER_SECOND
+            segment_size = min(N_FRAMES, content_frames - seek)
+            is_last_window = seek + segment_size >= content_frames
+            mel_segment = pad_or_trim(mel[:, seek:seek + segment_size], N_FRAMES)
+
+            expected_words = math.ceil(words_per_second * window_duration * self._WORDS_ESTIMATION_FACTOR)
+            first_word = len(times)
+            window_words = words[first_word:] if is_last_window else words[first_word:first_word + max(expected_words, self._MIN_WORDS_PER_WINDOW)]
+            window_times = self._align_window(model, tokenizer, mel_segment, segment_size, window_words)
+
+            if not is_last_window:
+                limit = segment_size / FRAMES_PER_SECOND - self._WINDOW_END_MARGIN
+                accepted = 0
+                while accepted < len(window_times) and window_times[accepted][1] <= limit:
+                    accepted += 1
+                window_times = window_times[:accepted]
+
+            if not window_times:
+                # probably there's no speech in this window (music, silence), so we skip it
+                seek += int((window_duration - self._WINDOW_END_MARGIN) * FRAMES_PER_SECOND)
+                continue
+
+            times.extend((offset + start, offset + end) for start, end in window_times)
+            last_end = window_times[-1][1]
+            if last_end > 0:
+                words_per_second = len(window_times) / last_end
+            seek += max(int(last_end * FRAMES_PER_SECOND), 1)
+
+        if len(times) < len(words):
+            # the audio finished before the script, the remaining words are placed at the end
+            logger().warning(f"Only {len(times)} of {len(words)} script words could be aligned to the audio.")
+            end = times[-1][1] if times else 0.0
+            times.extend((end, end) for _ in range(len(words) - len(times)))
+
+        logger().debug(f"Script aligned: {len(words)} words.")
+        return times
+
+    def _align_window(self, model, tokenizer, mel_segment, num_frames: int, words: List[str]) -> List[Tuple[float, float]]:
+        """
+        Aligns the words to the window, returning the (start, end) time of each one (relative to the window start).
+        Whisper splits the text in its own words (for example, punctuation or CJK characters),
+        so we map them back to the script words using the character offsets of the text.
+        """
+        from whisper.timing import find_alignment
+
+        text = "".join(" " + word for word in words)
+        char_to_word = np.empty(len(text), dtype=np.int64)
+        position = 0
+        for index, word in enumerate(words):
+            char_to_word[position:position + len(word) + 1] = index
+            position += len(word) + 1
+
+        text_tokens = tokenizer.encode(text)
+        alignment = find_alignment(model, tokenizer, text_tokens, mel_segment, num_frames)
+
+        starts = [math.inf] * len(words)
+        ends = [-math.inf] * len(words)
+        position = 0
+        for timing in alignment:
+            first = min(position, len(text) - 1)
+            last = min(position + max(len(timing.word), 1) - 1, len(text) - 1)
+            position += len(timing.word)
+            for index in range(char_to_word[first], char_to_word[last] + 1):
+                starts[index] = min(starts[index], float(timing.start))
+                ends[index] = max(ends[index], float(timing.end))
+
+        times = []
+        last_end = 0.0
+        for start, end in zip(starts, ends):
+            if start == math.inf:
+                start = end = last_end
+            times.append((start, end))
+            last_end = end
+        return times
+
+    def _get_tokenizer(self, first_mel_segment):
+        from whisper.tokenizer import get_tokenizer
+
+        model = self._get_model()
+        language = self._language
+        if language is None and model.is_multilingual:
+            _, probs = model.detect_language(first_mel_segment)
+            language = max(probs, key=probs.get)
+            logger().debug(f"Detected language: {language}")
+
+        return get_tokenizer(model.is_multilingual, num_languages=model.num_languages, language=language, task="transcribe")
+
+    def _build_document(self, times: List[Tuple[float, float]]) -> Document:
+        document = Document()
+        index = 0
+        for line_words in self._script_lines:
+            words = []
+            for word_text in line_words:
+                start, end = times[index]
+                index += 1
+                if start == end:
+                    end = start + 0.01
+                words.append(Word(text=word_text, time=TimeFragment(start=start, end=end)))
+
+            segment_time = TimeFragment(start=words[0].time.start, end=max(w.time.end for w in words))
+            segment = Segment(time=segment_time)
+            line = Line(time=segment_time)
+            line.words.extend(words)
+            segment.lines.add(line)
+            document.segments.add(segment)
+
+        return document
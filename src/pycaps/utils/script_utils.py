@@ -11,7 +11,7 @@ class ScriptUtils:
             return ScriptUtils.basic_summary_cache[cache_key]
         
         summary = LlmProvider.get().send_message(
-            prompt=f"""
+            f"""
             Given the following video script, please provide a basic summary of the main topic.
 
             Basic guidelines:
@@ -4,3 +4,7 @@ from .image_element import ImageElement
 from .video_element import VideoElement
 from .composite_element import CompositeElement
 from .png_sequence_element import PngSequenceElement
+from .resize_cache import ResizeCache
+from .reveal_image_element import RevealImageElement
+from .png_sequence_frame_store import PngSequenceFrameStore
+from .audio_mixer import AudioMixer
@@ -0,0 +1,89 @@
+import os
+import threading
+import numpy as np
+from typing import Dict, List, Tuple
+from .audio_element import AudioElement
+from .audio_utils import decode_audio
+from pycaps.logger import logger
+
+class AudioMixer:
+    """
+    Mixes the sound effects into an audio track.
+
+    Each distinct sound effect file is decoded once (per sample rate and channels) and kept in a process-wide cache,
+    so using the same effect hundreds of times costs a single ffmpeg decode.
+    All the effects are added to the same float32 buffer, and the result is normalized in place,
+    so the cost depends on the length of the effects instead of the length of the track times the number of effects.
+    """
+
+    _sfx_cache: Dict[Tuple[str, int, int, int], np.ndarray] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, sample_rate: int, channels: int, headroom_db: float = 0.1):
+        """
+        Args:
+            sample_rate: Sample rate of the track (and of the decoded effects).
+            channels: Number of channels of the track (and of the decoded effects).
+            headroom_db: The mix is normalized so its peak is headroom_db below the maximum level (0 dBFS).
+        """
+        if sample_rate <= 0 or channels <= 0:
+            raise ValueError("sample_rate and channels must be greater than 0")
+        self._sample_rate = sample_rate
+        self._channels = channels
+        self._headroom_db = headroom_db
+
+    def mix(self, track: np.ndarray, audio_elements: List[AudioElement]) -> np.ndarray:
+        """
+        Adds the audio elements to the track (a writable float32 array of shape (samples, channels)) and normalizes it.
+        The track is modified in place and returned. The parts of the effects after the end of the track are discarded.
+        """
+        for audio in audio_elements:
+            if audio.volume <= 0:
+                continue
+            try:
+                sfx = self.get_sound_effect(audio.path)
+            except Exception as e:
+                logger().warning(f"Unable to process sound effect: {audio.path}. Error: {e}")
+                continue
+
+            start = int(round(audio.start * self._sample_rate))
+            sfx_offset = max(0, -start)
+            start = max(0, start)
+            length = min(len(sfx) - sfx_offset, len(track) - start)
+            if length <= 0:
+                continue
+            target = track[start:start + length]
+            if audio.volume == 1:
+                target += sfx[sfx_offset:sfx_offset + length]
+            else:
+                target += sfx[sfx_offset:sfx_offset + length] * np.float32(audio.volume)
+
+        self.normalize(track)
+        return track
+
+    def normalize(self, track: np.ndarray) -> None:
+        """Scales the track in place, so its peak is headroom_db below 0 dBFS."""
+        if track.size == 0:
+            return
+        peak = float(np.max(np.abs(track)))
+        if peak == 0:
+            return
+        track *= np.float32(10 ** (-self._headroom_db / 20) / peak)
+
+    def get_sound_effect(self, path: str) -> np.ndarray:
+        """Returns the decoded sound effect (read-only, since it's shared by all the mixes)."""
+        path = os.path.abspath(path)
+        key = (path, os.stat(path).st_mtime_ns, self._sample_rate, self._channels)
+        with AudioMixer._lock:
+            sfx = AudioMixer._sfx_cache.get(key)
+        if sfx is None:
+            sfx = decode_audio(path, self._sample_rate, self._channels)
+            sfx.flags.writeable = False
+            with AudioMixer._lock:
+                AudioMixer._sfx_cache[key] = sfx
+        return sfx
+
+    @staticmethod
+    def clear_cache() -> None:
+        with AudioMixer._lock:
+            AudioMixer._sfx_cache.clear()
@@ -1,29 +1,119 @@
+import json
+import os
 import subprocess
-from typing import Optional
+import tempfile
+import numpy as np
+from typing import List, Optional, Tuple
 from pycaps.logger import logger
 
-def extract_audio_for_whisper(video: str, output: str, start: Optional[float] = None, end: Optional[float] = None) -> None:
-    try:
-        cmd = ["ffmpeg", "-y"]
+# Sample rate expected by the transcribers (Whisper works with 16kHz mono audio)
+TRANSCRIPTION_SAMPLE_RATE = 16000
+_READ_CHUNK_SIZE = 1 << 20
+_MAX_ERROR_SIZE = 4096
+
+def extract_audio_as_array(
+        video: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        sample_rate: int = TRANSCRIPTION_SAMPLE_RATE,
+    ) -> np.ndarray:
+    """
+    Decodes the audio track of the video with ffmpeg and returns it as mono float32 samples between -1 and 1.
+    The raw PCM is read directly from the ffmpeg stdout, so nothing is written to disk.
+    """
+    cmd = ["ffmpeg"]
+
+    if start is not None:
+        cmd += ["-ss", str(start)]
 
-        if start is not None:
-            cmd += ["-ss", str(start)]
+    cmd += ["-i", video]
 
-        cmd += ["-i", video]
+    if end is not None:
+        cmd += ["-to", str(end)]
 
-        if end is not None:
-            cmd += ["-to", str(end)]
+    cmd += [
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-f", "s16le",
+        "-acodec", "pcm_s16le",
+        "-loglevel", "error",
+        "-hide_banner",
+        "-",
+    ]
+
+    try:
+        buffer = _run_ffmpeg_to_buffer(cmd, f"extracting the audio of {video}")
+    except RuntimeError as e:
+        logger().error(f"Unable to extract audio from video. Are you sure your video has audio?. Ffmpeg error: {e}")
+        raise
+    # an odd number of bytes can only happen if ffmpeg was interrupted, the last incomplete sample is discarded
+    usable_size = len(buffer) - (len(buffer) % 2)
+    samples = np.frombuffer(memoryview(buffer)[:usable_size], dtype=np.int16)
+    return samples.astype(np.float32) / 32768.0
 
-        cmd += [
-            "-vn",
-            "-ac", "1",
-            "-ar", "16000",
-            "-c:a", "pcm_s16le",
-            output,
-            "-loglevel", "error",
-            "-hide_banner",
-        ]
+def decode_audio(path: str, sample_rate: int, channels: int) -> np.ndarray:
+    """
+    Decodes the audio of the file (audio or video) with ffmpeg and returns a writable float32 array
+    of shape (samples, channels), with values between -1 and 1. Nothing is written to disk.
+    """
+    cmd = [
+        "ffmpeg",
+        "-i", path,
+        "-vn",
+        "-ac", str(channels),
+        "-ar", str(sample_rate),
+        "-f", "f32le",
+        "-acodec", "pcm_f32le",
+        "-loglevel", "error",
+        "-hide_banner",
+        "-",
+    ]
+    buffer = _run_ffmpeg_to_buffer(cmd, f"decoding the audio of {path}")
+    frame_size = 4 * channels
+    usable_size = len(buffer) - (len(buffer) % frame_size)
+    return np.frombuffer(memoryview(buffer)[:usable_size], dtype=np.float32).reshape(-1, channels)
 
-        subprocess.run(cmd, check=True)
+def get_audio_stream_info(path: str) -> Optional[Tuple[int, int]]:
+    """Returns the (sample rate, channels) of the first audio stream of the file, or None if it has no audio."""
+    cmd = [
+        "ffprobe",
+        "-v", "quiet",
+        "-print_format", "json",
+        "-select_streams", "a:0",
+        "-show_entries", "stream=sample_rate,channels",
+        path
+    ]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, text=True)
+        streams = json.loads(result.stdout).get("streams", [])
     except Exception as e:
-        logger().error("Unable to extract audio from video. Are you sure your video has audio?. Ffmpeg error: " + e)
+        logger().warning(f"Could not get the audio properties of {path} using ffprobe. Error: {e}")
+        return None
+    if not streams:
+        return None
+    return int(streams[0]["sample_rate"]), int(streams[0]["channels"])
+
+def _run_ffmpeg_to_buffer(cmd: List[str], action: str) -> bytearray:
+    # stderr goes to a temp file: if it were a pipe, ffmpeg could block writing many errors (e.g. a corrupt stream)
+    # while we block reading stdout
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file)
+        except Exception as e:
+            raise RuntimeError(f"Unable to run ffmpeg {action}: {e}")
+
+        buffer = bytearray()
+        while True:
+            chunk = process.stdout.read(_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer += chunk
+        process.wait()
+
+        if process.returncode != 0:
+            # only the end of the errors is kept (a corrupt stream can produce thousands of lines)
+            stderr_file.seek(max(0, os.fstat(stderr_file.fileno()).st_size - _MAX_ERROR_SIZE))
+            stderr = stderr_file.read().decode(errors="ignore")
+            raise RuntimeError(f"ffmpeg failed {action}: {stderr}")
+    return buffer
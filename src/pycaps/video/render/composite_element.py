@@ -14,6 +14,12 @@ class CompositeElement(MediaElement):
         self._elements = elements
         self._size = size
 
+    def bake(self, fps: float, time_offset: float = 0.0) -> None:
+        super().bake(fps, time_offset)
+        # the children receive the time relative to this element
+        for element in self._elements:
+            element.bake(fps, time_offset + self._start)
+
     def get_frame(self, t_rel: float) -> np.ndarray:
         frame = np.zeros((self._size[1], self._size[0], 4), dtype=np.float32)
         for element in self._elements:
@@ -1,7 +1,8 @@
 from .media_element import MediaElement
 import cv2
+import hashlib
 import numpy as np
-from typing import Union
+from typing import Hashable, Optional, Union
 
 class ImageElement(MediaElement):
     def __init__(self, source: Union[str, np.ndarray], start: float, duration: float):
@@ -17,7 +18,14 @@ class ImageElement(MediaElement):
 
         self._image = img.astype(np.float32)
         self._size = self._image.shape[1], self._image.shape[0]
+        self._sprite_key: Optional[Hashable] = None
 
     def get_frame(self, t_rel: float) -> np.ndarray:
         # TODO: we shouldn't copy each frame... it should be copied only if needed
         return self._image.copy()
+
+    def _get_sprite_key(self, t_rel: float) -> Optional[Hashable]:
+        # the key is the content of the image, so the elements with the same image (e.g. the same word) share the cache
+        if self._sprite_key is None:
+            self._sprite_key = ("image", self._image.shape, hashlib.blake2b(self._image.tobytes(), digest_size=16).digest())
+        return self._sprite_key
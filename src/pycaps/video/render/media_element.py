@@ -1,8 +1,10 @@
 import cv2
+import math
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import Callable, Union, Tuple, Optional
+from typing import Callable, Hashable, List, Union, Tuple, Optional
 import inspect
+from .resize_cache import ResizeCache
 
 class MediaElement(ABC):
     def __init__(self, start: float, duration: float):
@@ -12,15 +14,59 @@ class MediaElement(ABC):
         self._position: Callable[[float], Tuple[int, int]] = lambda t: (0, 0)
         self._opacity: Callable[[float], float] = lambda t: 1
         self._scale: Callable[[float], float] = lambda t: 1
+        # baked timeline (see bake()): (fps, time offset, first frame, array of shape (frames, 4) with x, y, scale and opacity)
+        self._timeline: Optional[Tuple[float, float, int, np.ndarray]] = None
 
     def set_position(self, value: Union[Callable[[float], Tuple[int, int]], Tuple[int, int]]):
         self._position = self._save_as_function(value)
+        self._timeline = None
 
     def set_opacity(self, value: Union[Callable[[float], float], float]):
         self._opacity = self._save_as_function(value)
+        self._timeline = None
 
     def set_scale(self, value: Union[Callable[[float], float], float]):
         self._scale = self._save_as_function(value)
+        self._timeline = None
+
+    def bake(self, fps: float, time_offset: float = 0.0) -> None:
+        '''
+        Samples the position, scale and opacity functions at the time of each frame where the element is visible,
+        so render() reads them from an array instead of running the animation functions on every frame.
+        The functions are called once with an array of times (or once per frame, if they don't support arrays).
+        The frames are at the times (k / fps - time_offset); time_offset is used by the elements inside composite elements.
+        Calling any setter removes the baked timeline.
+        '''
+        first_frame = math.floor((self._start + time_offset) * fps)
+        last_frame = math.ceil((self.end + time_offset) * fps)
+        t_rel = np.arange(first_frame, last_frame + 1) / fps - time_offset - self._start
+        x, y = self._sample(self._position, t_rel, 2)
+        scale, = self._sample(self._scale, t_rel, 1)
+        opacity, = self._sample(self._opacity, t_rel, 1)
+        self._timeline = (fps, time_offset, first_frame, np.stack([x, y, scale, opacity], axis=1))
+
+    def _sample(self, fn: Callable, t_rel: np.ndarray, components: int) -> List[np.ndarray]:
+        try:
+            values = fn(t_rel)
+            values = values if components > 1 else (values,)
+            if len(values) == components:
+                return [np.broadcast_to(np.asarray(value, dtype=np.float64), t_rel.shape) for value in values]
+        except Exception:
+            pass
+        # the function doesn't support arrays (e.g. it has "if t < ..."), so it's called for each frame
+        samples = np.array([fn(float(t)) for t in t_rel], dtype=np.float64).reshape(len(t_rel), components)
+        return list(samples.T)
+
+    def _get_baked_values(self, t_global: float) -> Optional[np.ndarray]:
+        if self._timeline is None:
+            return None
+        fps, time_offset, first_frame, values = self._timeline
+        frame = (t_global + time_offset) * fps
+        index = round(frame) - first_frame
+        # only the frame times are baked, any other time uses the functions
+        if abs(frame - round(frame)) > 1e-6 or not 0 <= index < len(values):
+            return None
+        return values[index]
 
     def set_size(self, width: Optional[int] = None, height: Optional[int] = None) -> None:
         if width is None and height is None:
@@ -79,31 +125,59 @@ class MediaElement(ABC):
     def get_frame(self, t_rel: float) -> np.ndarray:
         pass
 
-    def render(self, bg: np.ndarray, t_global: float) -> np.ndarray:
-        t_rel = (t_global - self._start)
-        if not (0 <= t_rel < self._duration):
-            return bg
-
-        frame = self.get_frame(t_rel)
-        x, y = self.position(t_rel)
-        x, y = int(x), int(y)
-        s = self.scale(t_rel)
-        alpha_val = self.opacity(t_rel)
-
-        # TODO: I think there's room for performance improvement over here... 
-
+    def _get_sprite_key(self, t_rel: float) -> Optional[Hashable]:
+        '''
+        Returns a key that identifies the content of the frame at t_rel (two frames with the same key must be equal),
+        so its resized versions can be cached (see ResizeCache). None means the frame can't be cached.
+        '''
+        return None
+
+    def _get_scaled_frame(self, t_rel: float, s: float) -> np.ndarray:
+        sprite_key = self._get_sprite_key(t_rel)
+        if sprite_key is None:
+            return self._scale_frame(self.get_frame(t_rel), s)
+
+        cache = ResizeCache.get_default()
+        s = cache.quantize(s)
+        key = (sprite_key, self._size, s)
+        frame = cache.get(key)
+        if frame is None:
+            frame = self._scale_frame(self.get_frame(t_rel), s)
+            cache.save(key, frame)
+        return frame
+
+    def _scale_frame(self, frame: np.ndarray, s: float) -> np.ndarray:
         # source: https://docs.opencv.org/3.4/da/d54/group__imgproc__transform.html#ga47a974309e9102f5f08231edc7e7529d
         # "To shrink an image, it will generally look best with INTER_AREA interpolation, whereas to enlarge an image,
         #  it will generally look best with INTER_CUBIC (slow) or INTER_LINEAR (faster but still looks OK)."
         interpolation_method = cv2.INTER_AREA if s < 1.0 else cv2.INTER_CUBIC
         scaled_w, scaled_h = int(self._size[0] * s), int(self._size[1] * s)
+        if scaled_w <= 0 or scaled_h <= 0:
+            # at very small scales (e.g. the start of a pop-in animation) the frame has no pixels, it's not rendered
+            return np.zeros((max(scaled_h, 0), max(scaled_w, 0), 4), dtype=frame.dtype)
         frame = cv2.resize(frame, (scaled_w, scaled_h), interpolation=interpolation_method)
         frame = np.clip(frame, 0.0, 255.0)
         if frame.shape[2] == 3:
             frame = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+        return frame
+
+    def render(self, bg: np.ndarray, t_global: float) -> np.ndarray:
+        t_rel = (t_global - self._start)
+        if not (0 <= t_rel < self._duration):
+            return bg
+
+        baked_values = self._get_baked_values(t_global)
+        if baked_values is not None:
+            x, y, s, alpha_val = baked_values
+        else:
+            x, y = self.position(t_rel)
+            s = self.scale(t_rel)
+            alpha_val = self.opacity(t_rel)
+        x, y = int(x), int(y)
+        s, alpha_val = float(s), float(alpha_val)
 
-        # apply opacity
-        frame[:, :, 3] = frame[:, :, 3] * alpha_val
+        # the scaled frame can be shared with other elements (see ResizeCache), so it must not be modified
+        frame = self._get_scaled_frame(t_rel, s)
 
         H, W = bg.shape[:2]
         h, w = frame.shape[:2]
@@ -126,7 +200,8 @@ class MediaElement(ABC):
 
         roi = bg[y1_bg:y2_bg, x1_bg:x2_bg]
         sub_fr = frame[y1_fr:y2_fr, x1_fr:x2_fr]
-        frame_alpha = sub_fr[..., 3:4] / 255.0
+        # the opacity of the element is applied to the alpha channel of the frame
+        frame_alpha = sub_fr[..., 3:4] * (alpha_val / 255.0)
         roi_float = roi.astype(np.float32) if roi.dtype != np.float32 else roi
 
         if bg.shape[2] == 3:
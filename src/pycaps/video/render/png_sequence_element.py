@@ -1,43 +1,42 @@
 from .media_element import MediaElement
-import cv2
+from .png_sequence_frame_store import PngSequenceFrameStore
 import numpy as np
 import os
-from pycaps.logger import logger
+from typing import Hashable, Optional
 
 class PngSequenceElement(MediaElement):
-    def __init__(self, folder_path: str, start: float, duration: float, fps: float = 30.0):
+    def __init__(self, folder_path: str, start: float, duration: float, fps: float = 30.0, height: Optional[int] = None):
+        """
+        Args:
+            folder_path: Folder with the PNG frames (sorted by name).
+            start: Start time of the element.
+            duration: Duration of the element.
+            fps: Frames per second of the sequence.
+            height: (Optional) Height of the frames. The frames are resized once (see PngSequenceFrameStore),
+                instead of on every rendered frame.
+        """
         super().__init__(start, duration)
         self._fps = fps
-        self._load_frames(folder_path)
-        
-        if self._frames:
-            h, w, _ = self._frames[0].shape
-            self._size = (w, h)
-
-    def _load_frames(self, folder_path: str):
-        self._frames = []
-        if not os.path.isdir(folder_path):
-            logger().warning(f"Png sequence folder not found: {folder_path}")
-            return
-
-        frame_files = sorted([f for f in os.listdir(folder_path) if f.endswith('.png')])
-        
-        for frame_file in frame_files:
-            frame_path = os.path.join(folder_path, frame_file)
-            frame = cv2.imread(frame_path, cv2.IMREAD_UNCHANGED)
-            
-            if frame is not None:
-                if frame.shape[2] != 4:
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
-                self._frames.append(frame.astype(np.float32))
-
+        self._folder_path = os.path.abspath(folder_path)
+        # the frames are shared with the other elements of the same sequence, so they must not be modified
+        self._frames = PngSequenceFrameStore.get(folder_path, height)
         self._num_frames = len(self._frames)
 
+        if self._num_frames:
+            h, w = self._frames.shape[1:3]
+            self._size = (w, h)
+
     def get_frame(self, t_rel: float) -> np.ndarray:
-        if not self._frames:
+        if not self._num_frames:
             return np.zeros((self._size[1], self._size[0], 4), dtype=np.float32)
 
+        return self._frames[self._get_frame_index(t_rel)]
+
+    def _get_sprite_key(self, t_rel: float) -> Optional[Hashable]:
+        if not self._num_frames:
+            return None
+        return ("png_sequence", self._folder_path, self._frames.shape[1:3], self._get_frame_index(t_rel))
+
+    def _get_frame_index(self, t_rel: float) -> int:
         idx = int(t_rel * self._fps)
-        idx = max(0, min(idx, self._num_frames - 1))
-        
-        return self._frames[idx].copy()
+        return max(0, min(idx, self._num_frames - 1))
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import threading
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from pycaps.logger import logger
+
+class PngSequenceFrameStore:
+    """
+    Process-wide store of the decoded frames of the PNG sequences (e.g. the animated emojis).
+
+    Each sequence is decoded once, resized to the requested height, and saved as a uint8 array of shape
+    (frames, height, width, 4) in a .npy file under ~/.pycaps/assets/frames. The file is memory-mapped (read-only),
+    so all the elements using the same sequence share the same frames, and the processes that render the video
+    share them through the OS page cache. The file name depends on the PNG files (name, size and modification time)
+    and the height, so it's recreated when the sequence changes.
+    """
+
+    CACHE_DIR = Path.home() / ".pycaps" / "assets" / "frames"
+    _frames: Dict[Tuple[str, Optional[int]], np.ndarray] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(folder_path: str, height: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the frames of the PNG files of the folder (sorted by name) in BGRA format.
+        If height is received, the frames are resized to it (keeping the aspect ratio).
+        The returned array must not be modified.
+        """
+        folder_path = os.path.abspath(folder_path)
+        height = int(height) if height else None
+        key = (folder_path, height)
+        with PngSequenceFrameStore._lock:
+            frames = PngSequenceFrameStore._frames.get(key)
+            if frames is None:
+                frames = PngSequenceFrameStore._load(folder_path, height)
+                PngSequenceFrameStore._frames[key] = frames
+            return frames
+
+    @staticmethod
+    def _load(folder_path: str, height: Optional[int]) -> np.ndarray:
+        if not os.path.isdir(folder_path):
+            logger().warning(f"Png sequence folder not found: {folder_path}")
+            return np.zeros((0, 0, 0, 4), dtype=np.uint8)
+
+        frame_files = sorted([f for f in os.listdir(folder_path) if f.endswith('.png')])
+        cache_file = PngSequenceFrameStore._get_cache_file(folder_path, frame_files, height)
+        if cache_file.exists():
+            try:
+                return np.load(cache_file, mmap_mode="r")
+            except Exception as e:
+                logger().warning(f"Ignoring invalid frames cache file {cache_file}: {e}")
+
+        frames = PngSequenceFrameStore._decode(folder_path, frame_files, height)
+        if len(frames) == 0:
+            return frames
+        try:
+            PngSequenceFrameStore.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_file, "wb") as f:
+                np.save(f, frames)
+            os.replace(temp_file, cache_file)
+            return np.load(cache_file, mmap_mode="r")
+        except OSError as e:
+            logger().warning(f"Unable to save the frames cache file {cache_file}: {e}")
+            return frames
+
+    @staticmethod
+    def _decode(folder_path: str, frame_files: list, height: Optional[int]) -> np.ndarray:
+        frames = []
+        for frame_file in frame_files:
+            frame = cv2.imread(os.path.join(folder_path, frame_file), cv2.IMREAD_UNCHANGED)
+            if frame is None:
+                continue
+            if frame.shape[2] != 4:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+            if height and frame.shape[0] != height:
+                width = int((height / frame.shape[0]) * frame.shape[1])
+                interpolation = cv2.INTER_AREA if height < frame.shape[0] else cv2.INTER_CUBIC
+                frame = cv2.resize(frame, (width, height), interpolation=interpolation)
+            if frames and frame.shape != frames[0].shape:
+                logger().warning(f"Ignoring frame {frame_file} of {folder_path}: its size is different from the first frame")
+                continue
+            frames.append(frame)
+        if not frames:
+            return np.zeros((0, 0, 0, 4), dtype=np.uint8)
+        return np.stack(frames)
+
+    @staticmethod
+    def _get_cache_file(folder_path: str, frame_files: list, height: Optional[int]) -> Path:
+        key = [folder_path, str(height)]
+        for frame_file in frame_files:
+            stat = os.stat(os.path.join(folder_path, frame_file))
+            key.append(f"{frame_file}|{stat.st_size}|{stat.st_mtime_ns}")
+        digest = hashlib.sha256("\n".join(key).encode("utf-8")).hexdigest()
+        return PngSequenceFrameStore.CACHE_DIR / f"{digest}.npy"
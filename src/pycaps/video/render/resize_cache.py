@@ -0,0 +1,79 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+class ResizeCache:
+    """
+    LRU cache of the resized frames of the media elements (see MediaElement.render()).
+
+    The key is the sprite (the content of the frame, see MediaElement._get_sprite_key()), the element size and the scale.
+    The scales are rounded to multiples of scale_step, so the frames of a zoom or pop animation
+    (and of all the clips with the same sprite and animation) reuse the same resized frames.
+    The scale error is at most scale_step / 2 (with the default step, 0.25% of the sprite size). Use scale_step=0 to disable the rounding.
+    """
+
+    _default: Optional['ResizeCache'] = None
+
+    def __init__(self, max_size_bytes: int = 256 * 1024 * 1024, scale_step: float = 0.005):
+        if scale_step < 0:
+            raise ValueError("scale_step can't be negative")
+        self._max_size_bytes = max_size_bytes
+        self._scale_step = scale_step
+        self._frames: 'OrderedDict[Hashable, np.ndarray]' = OrderedDict()
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_default() -> 'ResizeCache':
+        if ResizeCache._default is None:
+            ResizeCache._default = ResizeCache()
+        return ResizeCache._default
+
+    @staticmethod
+    def set_default(cache: 'ResizeCache') -> None:
+        ResizeCache._default = cache
+
+    def quantize(self, scale: float) -> float:
+        if self._scale_step == 0 or scale <= 0:
+            return scale
+        # a small positive scale is not rounded to 0 (the element would disappear before the end of its animation)
+        return round(max(round(scale / self._scale_step), 1) * self._scale_step, 6)
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                self._misses += 1
+                return None
+            self._frames.move_to_end(key)
+            self._hits += 1
+            return frame
+
+    def save(self, key: Hashable, frame: np.ndarray) -> None:
+        """Saves the frame (it's made read-only, since it's shared by all the users of the cache)."""
+        if frame.nbytes > self._max_size_bytes:
+            return
+        frame.flags.writeable = False
+        with self._lock:
+            previous = self._frames.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous.nbytes
+            self._frames[key] = frame
+            self._size_bytes += frame.nbytes
+            while self._size_bytes > self._max_size_bytes:
+                _, removed = self._frames.popitem(last=False)
+                self._size_bytes -= removed.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self._size_bytes = 0
+
+    def get_hits(self) -> int:
+        return self._hits
+
+    def get_misses(self) -> int:
+        return self._misses
@@ -0,0 +1,45 @@
+from .image_element import ImageElement
+import cv2
+import hashlib
+import numpy as np
+from typing import Hashable, List, Optional, Union
+
+class RevealImageElement(ImageElement):
+    """
+    Image that is revealed from left to right in steps (e.g. letter by letter).
+    The step i (0-based) starts at i * step_duration, and it shows the image up to the x position boundaries[i].
+    The rest of the image is transparent, or it shows the background image if received (e.g. the word box
+    rendered without its text), so only the text is revealed. The last step is shown until the end of the element.
+    """
+
+    def __init__(self, source: Union[str, np.ndarray], start: float, duration: float, boundaries: List[int], background: Optional[np.ndarray] = None):
+        super().__init__(source, start, duration)
+        if not boundaries:
+            raise ValueError("At least one boundary is required")
+        self._boundaries = boundaries
+        self._step_duration = duration / len(boundaries)
+        self._background: Optional[np.ndarray] = None
+        self._background_hash: Optional[bytes] = None
+        if background is not None:
+            if background.shape[:2] != self._image.shape[:2]:
+                raise ValueError(f"The background size {background.shape[1]}x{background.shape[0]} is not the image size {self._size[0]}x{self._size[1]}")
+            conversion = cv2.COLOR_RGBA2BGRA if background.shape[2] == 4 else cv2.COLOR_RGB2BGRA
+            self._background = cv2.cvtColor(background, conversion).astype(np.float32)
+            self._background_hash = hashlib.blake2b(self._background.tobytes(), digest_size=16).digest()
+
+    def get_frame(self, t_rel: float) -> np.ndarray:
+        boundary = self._boundaries[self._get_step(t_rel)]
+        if self._background is None:
+            frame = self._image.copy()
+            frame[:, boundary:] = 0
+        else:
+            frame = self._background.copy()
+            frame[:, :boundary] = self._image[:, :boundary]
+        return frame
+
+    def _get_sprite_key(self, t_rel: float) -> Optional[Hashable]:
+        # each step is cached (see ResizeCache), so the mask is applied once per step and scale
+        return ("reveal", super()._get_sprite_key(t_rel), self._background_hash, self._boundaries[self._get_step(t_rel)])
+
+    def _get_step(self, t_rel: float) -> int:
+        return max(0, min(int(t_rel / self._step_duration), len(self._boundaries) - 1))
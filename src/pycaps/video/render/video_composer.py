@@ -6,9 +6,11 @@ import os
 import tempfile
 import math
 import shutil
-from typing import Tuple, List, Optional
+from typing import Iterable, Iterator, Tuple, List, Optional
 from .media_element import MediaElement
 from .audio_element import AudioElement
+from .audio_mixer import AudioMixer
+from .audio_utils import decode_audio, get_audio_stream_info
 from pycaps.logger import logger
 from pycaps.common import VideoQuality
 from tqdm import tqdm
@@ -86,7 +88,14 @@ class VideoComposer:
         """Schedule an audio file to start at start_time (seconds)."""
         self._audio_elements.append(audio_element)
 
-    def _render_range(self, start_frame: int, end_frame: int, part_path: str, video_quality: VideoQuality) -> None:
+    def _render_range(
+            self,
+            start_frame: int,
+            end_frame: int,
+            part_path: str,
+            video_quality: VideoQuality,
+            windows: Optional['_ElementWindows'] = None
+        ) -> None:
         cap = cv2.VideoCapture(self._input)
         cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
 
@@ -130,31 +139,35 @@ class VideoComposer:
         )
 
         num_frames_to_render = end_frame - start_frame
-        with tqdm(total=num_frames_to_render, desc="Rendering video frames") as pbar:
-            frame_idx = start_frame
-            while frame_idx < end_frame:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                if self._rotation_flag is not None:
-                    frame = cv2.rotate(frame, self._rotation_flag)
-
-                for el in self._elements:
-                    frame = el.render(frame, frame_idx / self._input_fps)
-
-                try:
-                    process.stdin.write(frame.astype(np.uint8).tobytes())
-                except BrokenPipeError:
-                    logger().error("FFmpeg process died early.")
-                    break
-
-                frame_idx += 1
-                pbar.update(1)
-
-        cap.release()
-        process.stdin.close()
-        process.wait()
+        try:
+            with tqdm(total=num_frames_to_render, desc="Rendering video frames") as pbar:
+                frame_idx = start_frame
+                while frame_idx < end_frame:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+
+                    if self._rotation_flag is not None:
+                        frame = cv2.rotate(frame, self._rotation_flag)
+
+                    t = frame_idx / self._input_fps
+                    elements = self._elements if windows is None else windows.get_elements(t)
+                    for el in elements:
+                        frame = el.render(frame, t)
+
+                    try:
+                        process.stdin.write(frame.astype(np.uint8).tobytes())
+                    except BrokenPipeError:
+                        logger().error("FFmpeg process died early.")
+                        break
+
+                    frame_idx += 1
+                    pbar.update(1)
+        finally:
+            # the ffmpeg process is always closed, also when the elements source fails (e.g. a cancelled stream)
+            cap.release()
+            process.stdin.close()
+            process.wait()
 
     def _merge_parts(self, part_paths: List[str], merged_path: str) -> None:
         # Create a concat file
@@ -185,64 +198,70 @@ class VideoComposer:
             shutil.copyfile(video_path, output_path)
             return
 
-        from pydub import AudioSegment
-        from pydub.effects import normalize
+        stream_info = get_audio_stream_info(video_path)
+        if stream_info is None:
+            logger().error("Unable to extract audio from video. Ignoring sound effects.")
+            shutil.copyfile(video_path, output_path)
+            return
 
+        sample_rate, channels = stream_info
         try:
-            main_audio = AudioSegment.from_file(video_path)
+            track = decode_audio(video_path, sample_rate, channels)
         except Exception as e:
-            logger().error(f"Unable to extract audio from video. Ignoring sound effects. Pydub error: {e}")
-            self._copy_video(video_path, output_path)
+            logger().error(f"Unable to extract audio from video. Ignoring sound effects. Error: {e}")
+            shutil.copyfile(video_path, output_path)
             return
 
-        final_mix = main_audio
-        for audio in self._audio_elements:
-            try:
-                sfx = AudioSegment.from_file(audio.path)
-                # Convertir el multiplicador de volumen a decibelios (dB), que es lo que pydub usa.
-                if audio.volume > 0:
-                    db_change = 20 * math.log10(audio.volume)
-                    sfx = sfx + db_change
-                else:
-                    sfx = sfx - 100 # Reducir por 100 dB es efectivamente silencio
-
-                start_ms = audio.start * 1000
-                final_mix = final_mix.overlay(sfx, position=start_ms)
-
-            except Exception as e:
-                logger().warning(f"Unable to process sound effect: {audio.path}. Error: {e}")
-                continue
-
-        normalized_mix = normalize(final_mix)
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio_file:
-            temp_audio_path = temp_audio_file.name
+        mix = AudioMixer(sample_rate, channels).mix(track, self._audio_elements)
+        # the mix is sent as raw PCM through the ffmpeg stdin, so no temporary audio file is needed
+        ffmpeg_cmd = [
+            "ffmpeg", "-y",
+            "-i", video_path,
+            "-f", "f32le",
+            "-ar", str(sample_rate),
+            "-ac", str(channels),
+            "-i", "pipe:0",
+            "-map", "0:v",
+            "-map", "1:a",
+            "-c:v", "copy",
+            "-c:a", "aac",
+            "-b:a", aac_bitrate,
+            "-shortest",
+            output_path,
+            "-loglevel", "error",
+            "-hide_banner"
+        ]
         try:
-            normalized_mix.export(temp_audio_path, format="wav")
-            ffmpeg_cmd = [
-                "ffmpeg", "-y",
-                "-i", video_path,
-                "-i", temp_audio_path,
-                "-map", "0:v",
-                "-map", "1:a",
-                "-c:v", "copy",
-                "-c:a", "aac",
-                "-b:a", aac_bitrate,
-                "-shortest",
-                output_path,
-                "-loglevel", "error",
-                "-hide_banner"
-            ]
-
-            subprocess.run(ffmpeg_cmd, check=True, capture_output=True, text=True)
+            subprocess.run(ffmpeg_cmd, input=memoryview(mix.reshape(-1)).cast("B"), check=True, capture_output=True)
         except subprocess.CalledProcessError as e:
-            logger.error(f"Fatal error processing audio with ffmpeg: {e.stderr}")
+            logger().error(f"Fatal error processing audio with ffmpeg: {e.stderr.decode(errors='ignore')}")
+
+    def render_stream(self, windows: Iterable[Tuple[float, List[MediaElement]]], video_quality: VideoQuality = VideoQuality.MIDDLE) -> None:
+        """
+        Renders the video receiving the elements by windows, while the frames are encoded (single process).
+        Each window is a tuple (start, elements): start is the time (in seconds) of the first element of the window,
+        and the windows must be sorted by start. The windows are read when the frames reach their start,
+        so the iterable can block until the next window is ready (e.g. reading from a queue filled by another thread).
+        The elements are released after their end, and the audio elements must be added before the last window is read.
+        """
+        temp_dir = tempfile.mkdtemp()
+        try:
+            partial_path = os.path.join(temp_dir, "partial.mp4")
+            element_windows = _ElementWindows(windows, self._input_fps)
+            self._render_range(self._output_from_frame, self._output_to_frame, partial_path, video_quality, element_windows)
+            # the remaining windows are consumed, so the producer doesn't wait for the frames after the cut
+            element_windows.consume_all()
+            self._mux_audio(partial_path, self._output)
         finally:
-            if os.path.exists(temp_audio_path):
-                os.remove(temp_audio_path)
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
     def render(self, use_multiprocessing: bool = True, processes: Optional[int] = None, video_quality: VideoQuality = VideoQuality.MIDDLE) -> None:
         temp_dir = tempfile.mkdtemp()
 
+        # the animations are evaluated once for all the frames, instead of on each frame
+        for element in self._elements:
+            element.bake(self._input_fps)
+
         if use_multiprocessing:
             processes = processes or mp.cpu_count()
             total_frames = self._output_to_frame - self._output_from_frame
@@ -275,6 +294,44 @@ class VideoComposer:
         shutil.rmtree(temp_dir)
 
 
+class _ElementWindows:
+    """Elements of the windows received by VideoComposer.render_stream() that are active on the current frame."""
+
+    def __init__(self, windows: Iterable[Tuple[float, List[MediaElement]]], fps: float):
+        self._windows: Iterator[Tuple[float, List[MediaElement]]] = iter(windows)
+        self._fps = fps
+        self._elements: List[MediaElement] = []
+        self._next_window: Optional[Tuple[float, List[MediaElement]]] = None
+        self._is_exhausted = False
+
+    def get_elements(self, t: float) -> List[MediaElement]:
+        """Returns the elements that can be visible at t (the times must be increasing between calls)."""
+        # a frame can't be rendered until the next window starts after it (the later windows start even later)
+        while self._peek() is not None and self._next_window[0] <= t:
+            _, elements = self._next_window
+            self._next_window = None
+            for element in elements:
+                element.bake(self._fps)
+            self._elements.extend(elements)
+        # the finished elements are released, so only the sprites of the current windows are kept in memory
+        # same condition as MediaElement.render() (start + duration can be rounded differently than t - start)
+        self._elements = [element for element in self._elements if t - element.start < element.duration]
+        return self._elements
+
+    def consume_all(self) -> None:
+        self._elements = []
+        self._next_window = None
+        while not self._is_exhausted:
+            self._peek()
+            self._next_window = None
+
+    def _peek(self) -> Optional[Tuple[float, List[MediaElement]]]:
+        if self._next_window is None and not self._is_exhausted:
+            self._next_window = next(self._windows, None)
+            self._is_exhausted = self._next_window is None
+        return self._next_window
+
+
 def get_ffmpeg_libx264_preset_for_quality(quality: 'VideoQuality') -> str:
     if quality == VideoQuality.LOW:
         return 'ultrafast'
@@ -4,6 +4,7 @@ import numpy as np
 import os
 import subprocess
 import re
+from typing import Hashable, Optional
 
 class VideoElement(MediaElement):
 
@@ -13,13 +14,19 @@ class VideoElement(MediaElement):
         if ext not in ['.mp4', '.mov', '.avi', '.mkv', '.webm']:
             raise ValueError(f"Unsupported video format: {ext}")
 
+        self._path = os.path.abspath(path)
         self._load_metadata(path)
         self._load_frames_with_ffmpeg(path)
 
     def get_frame(self, t_rel: float) -> np.ndarray:
+        return self._frames[self._get_frame_index(t_rel)].copy()
+
+    def _get_sprite_key(self, t_rel: float) -> Optional[Hashable]:
+        return ("video", self._path, self._get_frame_index(t_rel))
+
+    def _get_frame_index(self, t_rel: float) -> int:
         idx = int(t_rel * self._fps)
-        idx = max(0, min(idx, self._num_frames - 1))
-        return self._frames[idx].copy()
+        return max(0, min(idx, self._num_frames - 1))
 
     def _load_metadata(self, path: str) -> None:
         cmd = ["ffmpeg", "-hide_banner", "-i", path]
@@ -8,7 +8,7 @@ class SubtitleClipsGenerator:
     def __init__(self, renderer: CssSubtitleRenderer):
         self._renderer = renderer
 
-    def generate(self, document: Document) -> None:
+    def generate(self, document: Document, show_progress: bool = True) -> None:
         """
         Adds the MediaElement for each word in the document received.
         """
@@ -16,7 +16,7 @@ class SubtitleClipsGenerator:
         total_lines = len(document.get_lines())
         total_steps = total_lines * 5 
 
-        with tqdm(total=total_steps, desc="Generating subtitle images") as pbar:
+        with tqdm(total=total_steps, desc="Generating subtitle images", disable=not show_progress) as pbar:
             for segment in document.segments:
                 for line in segment.lines:
                     self.__generate_word_clips_for_line(
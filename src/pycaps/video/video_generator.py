@@ -1,19 +1,34 @@
-from typing import Optional, Tuple
+from typing import Iterator, List, Optional, Tuple, TYPE_CHECKING
 import os
-import tempfile
+import queue
+import threading
+import numpy as np
 from pycaps.common import Document, VideoQuality
 from pycaps.logger import logger
 
+if TYPE_CHECKING:
+    from pycaps.transcriber import VoiceActivityDetector, SpeechMap
+    from .render import MediaElement
+
 class VideoGenerator:
     def __init__(self):
         self._input_video_path: Optional[str] = None
         self._output_video_path: Optional[str] = None
-        self._audio_path: Optional[str] = None
+        self._audio: Optional[np.ndarray] = None
 
         # State of video generation
         self._has_video_generation_started: bool = False
         self._video_quality: VideoQuality = VideoQuality.MIDDLE
         self._fragment_time: Optional[tuple[float, float]] = None
+        self._voice_activity_detector: Optional['VoiceActivityDetector'] = None
+        self._speech_map: Optional['SpeechMap'] = None
+
+        # State of the streaming generation (see start_streaming())
+        self._stream_queue: Optional[queue.Queue] = None
+        self._stream_thread: Optional[threading.Thread] = None
+        self._stream_error: Optional[BaseException] = None
+        self._stream_cancelled = threading.Event()
+        self._stream_last_start: float = 0.0
 
     def set_video_quality(self, quality: VideoQuality):
         self._video_quality = quality
@@ -21,6 +36,12 @@ class VideoGenerator:
     def set_fragment_time(self, fragment_time: tuple[float, float]):
         self._fragment_time = fragment_time
 
+    def set_voice_activity_detector(self, detector: Optional['VoiceActivityDetector']):
+        self._voice_activity_detector = detector
+
+    def get_voice_activity_detector(self) -> Optional['VoiceActivityDetector']:
+        return self._voice_activity_detector
+
     def get_sanitized_fragment_time(self) -> Optional[tuple[float, float]]:
         if not self._has_video_generation_started:
             raise RuntimeError("Video generation has not started. Call start() first.")
@@ -39,7 +60,8 @@ class VideoGenerator:
         if self._fragment_time:
             self._video_composer.cut_input(self._fragment_time[0], self._fragment_time[1])
 
-        self._audio_path = self._get_audio_path_to_transcribe()
+        self._audio = None
+        self._speech_map = None
         self._has_video_generation_started = True
     
     def _sanitize_fragment_time(self):
@@ -50,29 +72,54 @@ class VideoGenerator:
         end = min(max(self._fragment_time[1], 0), self._video_composer.get_input_duration())
         self._fragment_time = (start, end)
 
-    def _get_audio_path_to_transcribe(self) -> str:
-        from .render.audio_utils import extract_audio_for_whisper
+    def get_audio(self) -> np.ndarray:
+        """
+        Returns the audio to transcribe (mono float32 samples at 16kHz), extracting it on the first call.
+        If a fragment time was set, only that fragment is extracted.
+        """
+        if not self._has_video_generation_started:
+            raise RuntimeError("Video generation has not started. Call start() first.")
+        if self._audio is None:
+            self._audio = self._extract_audio()
+            self._speech_map = self._detect_speech(self._audio)
+        return self._audio
+
+    def _extract_audio(self) -> np.ndarray:
+        from .render.audio_utils import extract_audio_as_array
+
+        start = self._fragment_time[0] if self._fragment_time else None
+        end = self._fragment_time[1] if self._fragment_time else None
+        audio = extract_audio_as_array(self._input_video_path, start, end)
+        logger().debug(f"Audio extracted: {len(audio)} samples.")
+        return audio
+
+    def extract_full_audio(self) -> Tuple[np.ndarray, Optional['SpeechMap']]:
+        """
+        Extracts the audio of the whole input video (ignoring the fragment time) and detects its speech regions.
+        It doesn't modify the generator state, so it can be called from another thread while the video is rendered.
+        """
+        from .render.audio_utils import extract_audio_as_array
+
+        if not self._input_video_path:
+            raise RuntimeError("Video generation has not started. Call start() first.")
+        audio = extract_audio_as_array(self._input_video_path)
+        return audio, self._detect_speech(audio)
 
-        fd, temp_audio_file_path = tempfile.mkstemp(suffix=".wav")
-        os.close(fd)
-        try:
-            start = self._fragment_time[0] if self._fragment_time else None
-            end = self._fragment_time[1] if self._fragment_time else None
-            extract_audio_for_whisper(self._input_video_path, temp_audio_file_path, start, end)
-            logger().debug(f"Audio extracted to: {temp_audio_file_path}")
-            return temp_audio_file_path
-        except Exception as e:
-            logger().error(f"Error extracting audio: {e}")
-            self.close()
-            raise e
-        
-    def get_audio_path(self) -> str:
+    def _detect_speech(self, audio: np.ndarray) -> Optional['SpeechMap']:
+        from .render.audio_utils import TRANSCRIPTION_SAMPLE_RATE
+
+        if not self._voice_activity_detector:
+            return None
+        return self._voice_activity_detector.detect(audio, TRANSCRIPTION_SAMPLE_RATE)
+
+    def get_speech_map(self) -> Optional['SpeechMap']:
+        """
+        Returns the speech regions of the audio to transcribe (relative to the start of that audio),
+        or None if voice activity detection is disabled or the audio has not been extracted.
+        """
         if not self._has_video_generation_started:
             raise RuntimeError("Video generation has not started. Call start() first.")
-        if not self._audio_path:
-            raise RuntimeError("Audio path is not set. This is an unexpected error.")
-        
-        return self._audio_path
+        return self._speech_map
 
     def get_video_size(self) -> Tuple[int, int]:
         if not self._has_video_generation_started:
@@ -97,15 +144,99 @@ class VideoGenerator:
         logger().debug(f"Writing final video to: {self._output_video_path}")
         self._video_composer.render(use_multiprocessing=False, video_quality=self._video_quality)
         
-    def close(self):
-        self._remove_audio_file_if_needed()
-        self._has_video_generation_started = False
+    def start_streaming(self, max_pending_windows: int = 2) -> None:
+        """
+        Starts composing and encoding the video in a background thread, receiving the subtitles by windows (see add_window()).
+        The frames are encoded while the next windows are generated: the compositor only waits when it reaches
+        the start of a window that was not added yet. At most max_pending_windows windows wait to be composed,
+        so add_window() blocks when the compositor is behind (and the memory used by the pending sprites is bounded).
+        Call finish_streaming() after adding the last window, or cancel_streaming() if the windows can't be generated.
+        """
+        if not self._has_video_generation_started:
+            raise RuntimeError("Video generation has not started. Call start() first.")
+        if self._stream_thread is not None:
+            raise RuntimeError("Video streaming has already started.")
+        if max_pending_windows < 1:
+            raise ValueError("max_pending_windows must be at least 1")
+
+        self._stream_queue = queue.Queue(maxsize=max_pending_windows)
+        self._stream_error = None
+        self._stream_cancelled.clear()
+        self._stream_last_start = 0.0
+        logger().debug(f"Writing final video to: {self._output_video_path}")
+        self._stream_thread = threading.Thread(target=self._compose_stream, name="pycaps-video-compositor", daemon=False)
+        self._stream_thread.start()
 
-    def _remove_audio_file_if_needed(self):
-        if not self._audio_path:
+    def add_window(self, document: Document) -> None:
+        """
+        Sends the clips and sound effects of the document (a window of consecutive segments, with its clips already generated)
+        to the compositor. The windows must be added in time order.
+        """
+        if self._stream_thread is None:
+            raise RuntimeError("Video streaming has not started. Call start_streaming() first.")
+
+        clips = document.get_media_clips()
+        for sfx in document.sfxs:
+            self._video_composer.add_audio(sfx)
+        starts = [clip.start for clip in clips] + [segment.time.start for segment in document.segments]
+        # the window starts are never decreasing, the compositor doesn't wait for a window after rendering its start
+        start = max(min(starts, default=self._stream_last_start), self._stream_last_start)
+        self._stream_last_start = start
+        self._put_stream_item((start, clips))
+
+    def finish_streaming(self) -> None:
+        """Waits until the compositor encodes the remaining frames and muxes the audio."""
+        if self._stream_thread is None:
+            raise RuntimeError("Video streaming has not started. Call start_streaming() first.")
+        try:
+            self._put_stream_item(None)
+            self._stream_thread.join()
+            if self._stream_error is not None:
+                raise RuntimeError(f"Unable to compose the video: {self._stream_error}") from self._stream_error
+        finally:
+            self._stream_thread = None
+            self._stream_queue = None
+
+    def cancel_streaming(self) -> None:
+        """Stops the compositor (the output video is not generated)."""
+        if self._stream_thread is None:
             return
+        self._stream_cancelled.set()
+        self._stream_thread.join()
+        self._stream_thread = None
+        self._stream_queue = None
+
+    def _compose_stream(self) -> None:
         try:
-            os.remove(self._audio_path)
-            logger().debug(f"Temporary audio file deleted: {self._audio_path}")
-        except Exception as e:
-            logger().warning(f"Error deleting temporary audio file {self._audio_path}: {e}")
+            self._video_composer.render_stream(self._get_stream_windows(), video_quality=self._video_quality)
+        except BaseException as e:
+            if not self._stream_cancelled.is_set():
+                logger().error(f"An error occurred composing the video: {e}")
+            self._stream_error = e
+
+    def _get_stream_windows(self) -> Iterator[Tuple[float, List['MediaElement']]]:
+        while True:
+            try:
+                item = self._stream_queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._stream_cancelled.is_set():
+                    raise RuntimeError("Video streaming was cancelled.")
+                continue
+            if item is None:
+                return
+            yield item
+
+    def _put_stream_item(self, item: Optional[Tuple[float, List['MediaElement']]]) -> None:
+        while True:
+            if self._stream_error is not None or not self._stream_thread.is_alive():
+                raise RuntimeError(f"The video compositor stopped: {self._stream_error}") from self._stream_error
+            try:
+                self._stream_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        self.cancel_streaming()
+        self._audio = None
+        self._has_video_generation_started = False
@@ -0,0 +1,53 @@
+import re
+import pytest
+from pycaps.ai import Llm, LlmProvider
+from pycaps.api import ApiKeyService
+from pycaps.common import Tag
+from pycaps.tag.tagger.ai_tagger import AiTagger
+
+ANIMAL_REGEX = re.compile(r"\b(fox|dog)\b")
+RULES = {Tag("animal"): "animals"}
+TEXT = " ".join(["The quick brown fox jumps over the lazy dog.", "Nobody knows where the fox sleeps!"] * 40)
+
+class StubLlm(Llm):
+    """Tags the animals of the text, and changes the text of the chunks that contain the broken word."""
+
+    def __init__(self, broken_word: str = None):
+        self.broken_word = broken_word
+
+    def send_message(self, message: str, model: str = None) -> str:
+        text = message.split("Text to analyze:\n", 1)[1].rsplit("\n\nTagged version:", 1)[0]
+        if self.broken_word and self.broken_word in text:
+            return text.replace(self.broken_word, "???")
+        return ANIMAL_REGEX.sub(r"<animal>\1</animal>", text)
+
+    def is_enabled(self) -> bool:
+        return True
+
+@pytest.fixture
+def llm(monkeypatch):
+    llm = StubLlm()
+    monkeypatch.setattr(LlmProvider, "_llm", llm)
+    monkeypatch.setattr(ApiKeyService, "has", staticmethod(lambda: False))
+    return llm
+
+def get_expected_matches(text: str):
+    return sorted((m.start(), m.end()) for m in ANIMAL_REGEX.finditer(text))
+
+def test_chunks_find_the_same_tags_as_a_single_call(llm):
+    tagger = AiTagger(max_chunk_chars=200)
+    assert len(tagger._split_into_chunks(TEXT)) > 1
+    assert tagger.process(TEXT, RULES) == AiTagger(max_chunk_chars=len(TEXT)).process(TEXT, RULES)
+    assert tagger.process(TEXT, RULES)[Tag("animal")] == get_expected_matches(TEXT)
+
+def test_invalid_chunks_are_ignored_without_discarding_the_others(llm, caplog):
+    text = TEXT + " The last dog is broken."
+    llm.broken_word = "broken"
+    tagger = AiTagger(max_chunk_chars=200)
+    with caplog.at_level("WARNING"):
+        matches = tagger.process(text, RULES)[Tag("animal")]
+    assert len([record for record in caplog.records if record.levelname == "WARNING"]) == 1
+    # only the last chunk contains the broken word, the previous one ends before it
+    previous_chunk_end = tagger._split_into_chunks(text)[-2][1]
+    assert matches == [match for match in get_expected_matches(text) if match[1] <= previous_chunk_end]
+    assert matches
@@ -0,0 +1,68 @@
+import pytest
+from pycaps.ai import Llm, LlmProvider
+from pycaps.common import Document, Segment, Line, Word, TimeFragment
+from pycaps.effect.text.emoji_in_segment_llm_getter import EmojiInSegmentLlmGetter
+
+class ScriptedLlm(Llm):
+    """Provider that fails the batch prompts and answers the per-segment prompts with the given responses."""
+
+    def __init__(self, responses: dict):
+        self.responses = responses
+        self.segment_messages = []
+
+    def send_message(self, message: str, model: str = None) -> str:
+        if "video script summary" not in message:
+            return "summary"
+        if "Subtitles to analyze" in message:
+            return "not json"
+        text = message.split('Subtitle to analyze: "')[1].split('"')[0]
+        self.segment_messages.append(text)
+        response = self.responses[text]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def is_enabled(self) -> bool:
+        return True
+
+def make_document(texts) -> Document:
+    document = Document()
+    for index, text in enumerate(texts):
+        time = TimeFragment(start=index, end=index + 1)
+        segment = Segment(time=time)
+        line = Line(time=time)
+        line.words.add(Word(text=text, time=time))
+        segment.lines.add(line)
+        document.segments.add(segment)
+    return document
+
+@pytest.fixture
+def llm(monkeypatch):
+    llm = ScriptedLlm({})
+    monkeypatch.setattr(LlmProvider, "_llm", llm)
+    monkeypatch.setattr(EmojiInSegmentLlmGetter, "_cache", {})
+    return llm
+
+def test_failed_segments_are_not_cached(llm):
+    document = make_document(["rocket", "cake"])
+    llm.responses = {"rocket": "🚀", "cake": RuntimeError("provider down")}
+    getter = EmojiInSegmentLlmGetter()
+    getter.start(document)
+    assert [getter.get_emoji(segment) for segment in document.segments] == ["🚀", None]
+
+    llm.responses["cake"] = "🎂"
+    llm.segment_messages.clear()
+    getter = EmojiInSegmentLlmGetter()
+    getter.start(document)
+    assert llm.segment_messages == ["cake"]
+    assert [getter.get_emoji(segment) for segment in document.segments] == ["🚀", "🎂"]
+
+def test_segments_without_emoji_are_cached(llm):
+    document = make_document(["hello"])
+    llm.responses = {"hello": "None"}
+    EmojiInSegmentLlmGetter().start(document)
+    llm.segment_messages.clear()
+    getter = EmojiInSegmentLlmGetter()
+    getter.start(document)
+    assert llm.segment_messages == []
+    assert getter.get_emoji(document.segments[0]) is None
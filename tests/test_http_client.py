@@ -0,0 +1,181 @@
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from requests.exceptions import ConnectionError, ReadTimeout
+from pycaps.common import HttpClient
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers each request with the next (status, delay) of the server responses (the last one is repeated)."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._answer()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._answer()
+
+    def _answer(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.command, self.client_address[1]))
+            status, delay = server.responses[min(len(server.requests), len(server.responses)) - 1]
+        if delay and server.closing.wait(delay):
+            return
+        body = b"ok"
+        try:
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped waiting (read timeout)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.closing = threading.Event()
+    server.requests = []
+    server.responses = [(200, 0)]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    yield server
+    # the delayed responses are cancelled, and server_close() waits for the handler threads
+    server.closing.set()
+    server.shutdown()
+    server.server_close()
+
+def make_client(**kwargs) -> HttpClient:
+    kwargs.setdefault("backoff_base", 0)
+    return HttpClient(**kwargs)
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def test_consecutive_requests_reuse_the_connection(server):
+    client = make_client()
+    try:
+        for _ in range(3):
+            assert client.get(server.url).status_code == 200
+        assert len({port for _, port in server.requests}) == 1
+    finally:
+        client.close()
+
+def test_threads_share_the_session(server):
+    client = make_client()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            assert all(r.status_code == 200 for r in executor.map(lambda _: client.get(server.url), range(8)))
+        # the threads of the pool reuse the connections of the shared session
+        assert len({port for _, port in server.requests}) <= 4
+    finally:
+        client.close()
+
+def test_retry_status_codes_are_retried(server):
+    server.responses = [(503, 0), (500, 0), (200, 0)]
+    client = make_client()
+    try:
+        response = client.get(server.url)
+        assert response.status_code == 200
+        assert len(server.requests) == 3
+        assert client.get_metrics()[-1].attempts == 3
+    finally:
+        client.close()
+
+def test_post_is_retried_only_if_it_was_not_processed(server):
+    server.responses = [(429, 0), (503, 0), (500, 0), (200, 0)]
+    client = make_client(max_attempts=5)
+    try:
+        # 429 and 503 are retried, but the server could have processed the request that received the 500
+        assert client.post(server.url, json={}).status_code == 500
+        assert len(server.requests) == 3
+    finally:
+        client.close()
+
+def test_post_server_errors_are_retried_if_idempotent(server):
+    server.responses = [(500, 0), (502, 0), (200, 0)]
+    client = make_client()
+    try:
+        assert client.post(server.url, json={}, idempotent=True).status_code == 200
+        assert len(server.requests) == 3
+    finally:
+        client.close()
+
+def test_last_response_is_returned_after_max_attempts(server):
+    server.responses = [(503, 0)]
+    client = make_client(max_attempts=2)
+    try:
+        assert client.get(server.url).status_code == 503
+        assert len(server.requests) == 2
+    finally:
+        client.close()
+
+def test_get_read_timeouts_are_retried(server):
+    server.responses = [(200, 0.5), (200, 0)]
+    client = make_client(read_timeout=0.2)
+    try:
+        assert client.get(server.url).status_code == 200
+        assert len(server.requests) == 2
+    finally:
+        client.close()
+
+def test_post_read_timeouts_are_not_retried(server):
+    server.responses = [(200, 0.5), (200, 0)]
+    client = make_client(read_timeout=0.2)
+    try:
+        with pytest.raises(ReadTimeout):
+            client.post(server.url, json={})
+        assert len(server.requests) == 1
+        assert client.get_metrics()[-1].status_code is None
+    finally:
+        client.close()
+
+def test_post_read_timeouts_are_retried_if_idempotent(server):
+    server.responses = [(200, 0.5), (200, 0)]
+    client = make_client(read_timeout=0.2)
+    try:
+        assert client.post(server.url, json={}, idempotent=True).status_code == 200
+        assert len(server.requests) == 2
+    finally:
+        client.close()
+
+def test_post_connection_errors_are_retried():
+    client = make_client(max_attempts=3)
+    try:
+        with pytest.raises(ConnectionError):
+            client.post(f"http://127.0.0.1:{get_free_port()}/", json={})
+        assert client.get_metrics()[-1].attempts == 3
+    finally:
+        client.close()
+
+def test_retry_budget_limits_the_retries(server):
+    server.responses = [(503, 0)]
+    client = make_client(max_attempts=3, retry_budget_ratio=0, retry_budget_max=1)
+    try:
+        client.get(server.url)
+        client.get(server.url)
+        # the budget has a single token: the first request is retried once, the second one is not retried
+        assert [metric.attempts for metric in client.get_metrics()] == [2, 1]
+    finally:
+        client.close()
+
+def test_retry_after_header_is_used_as_backoff():
+    client = make_client(backoff_max=5)
+
+    class Response:
+        headers = {"Retry-After": "2"}
+
+    assert client._get_backoff(1, Response()) == 2
+    Response.headers = {"Retry-After": "60"}
+    assert client._get_backoff(1, Response()) == 5
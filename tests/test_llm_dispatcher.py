@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import CancelledError, wait
+import pytest
+from pycaps.ai.llm import Llm
+from pycaps.ai.llm_dispatcher import LlmDispatcher
+
+class MockLlm(Llm):
+    """Provider that records the messages and blocks each response until release() is called (if gated)."""
+
+    def __init__(self, gated: bool = False):
+        self.messages = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._gate = threading.Event()
+        if not gated:
+            self._gate.set()
+        self._lock = threading.Lock()
+
+    def send_message(self, message: str, model: str = None) -> str:
+        with self._lock:
+            self.messages.append(message)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            self._gate.wait(timeout=5)
+            time.sleep(0.01)
+            return f"response to {message}"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def release(self) -> None:
+        self._gate.set()
+
+def test_send_message_returns_the_provider_response():
+    dispatcher = LlmDispatcher(MockLlm())
+    try:
+        assert dispatcher.send_message("hello") == "response to hello"
+    finally:
+        dispatcher.close()
+
+def test_identical_pending_messages_are_coalesced():
+    llm = MockLlm(gated=True)
+    dispatcher = LlmDispatcher(llm)
+    try:
+        futures = [dispatcher.dispatch("same") for _ in range(5)]
+        time.sleep(0.1)
+        llm.release()
+        assert [future.result(timeout=5) for future in futures] == ["response to same"] * 5
+        assert llm.messages == ["same"]
+    finally:
+        dispatcher.close()
+
+def test_max_in_flight_is_respected():
+    llm = MockLlm(gated=True)
+    dispatcher = LlmDispatcher(llm, max_in_flight=2)
+    try:
+        futures = [dispatcher.dispatch(f"message {i}") for i in range(6)]
+        time.sleep(0.1)
+        assert llm.in_flight == 2
+        llm.release()
+        wait(futures, timeout=5)
+        assert llm.max_in_flight == 2
+        assert len(llm.messages) == 6
+    finally:
+        dispatcher.close()
+
+def test_queued_messages_are_sent_by_priority():
+    llm = MockLlm(gated=True)
+    dispatcher = LlmDispatcher(llm, max_in_flight=1)
+    try:
+        first = dispatcher.dispatch("first")
+        time.sleep(0.1)
+        low = dispatcher.dispatch("low", priority=10)
+        high = dispatcher.dispatch("high", priority=0)
+        time.sleep(0.1)
+        llm.release()
+        wait([first, low, high], timeout=5)
+        assert llm.messages == ["first", "high", "low"]
+    finally:
+        dispatcher.close()
+
+def test_requests_per_second_limits_the_rate():
+    llm = MockLlm()
+    dispatcher = LlmDispatcher(llm, max_in_flight=4, requests_per_second=20)
+    try:
+        start = time.monotonic()
+        wait([dispatcher.dispatch(f"message {i}") for i in range(5)], timeout=5)
+        # the first request uses the initial token, the other 4 wait 1/20 seconds each
+        assert time.monotonic() - start >= 0.19
+    finally:
+        dispatcher.close()
+
+def test_cancelling_all_the_callers_removes_the_request():
+    llm = MockLlm(gated=True)
+    dispatcher = LlmDispatcher(llm, max_in_flight=1)
+    try:
+        first = dispatcher.dispatch("first")
+        time.sleep(0.1)
+        cancelled = dispatcher.dispatch("cancelled")
+        time.sleep(0.1)
+        cancelled.cancel()
+        time.sleep(0.1)
+        llm.release()
+        first.result(timeout=5)
+        assert dispatcher.send_message("last") == "response to last"
+        assert llm.messages == ["first", "last"]
+    finally:
+        dispatcher.close()
+
+def test_close_cancels_the_pending_requests():
+    llm = MockLlm(gated=True)
+    dispatcher = LlmDispatcher(llm, max_in_flight=1)
+    futures = [dispatcher.dispatch(f"message {i}") for i in range(2)]
+    time.sleep(0.1)
+    dispatcher.close()
+    done, not_done = wait(futures, timeout=1)
+    llm.release()
+    assert not not_done
+    for future in done:
+        with pytest.raises(CancelledError):
+            future.result()
+
+def test_dispatcher_can_be_used_after_close():
+    dispatcher = LlmDispatcher(MockLlm())
+    dispatcher.send_message("before")
+    dispatcher.close()
+    try:
+        assert dispatcher.send_message("after") == "response to after"
+    finally:
+        dispatcher.close()
@@ -0,0 +1,37 @@
+import pytest
+from pycaps.common import Document, Segment, Line, Word, WordClip, Tag, TimeFragment, ElementLayout, Position, Size
+
+@pytest.mark.parametrize("model", [Document, Segment, Line, Word, WordClip, TimeFragment, ElementLayout, Position, Size])
+def test_models_are_slotted(model):
+    # the documents can have hundreds of thousands of elements (see benchmarks/document_memory.py)
+    assert not hasattr(model(), "__dict__")
+
+def test_tags_are_slotted():
+    assert not hasattr(Tag("name"), "__dict__")
+
+def make_document() -> Document:
+    document = Document()
+    for segment_index in range(2):
+        segment = Segment(time=TimeFragment(start=segment_index, end=segment_index + 1))
+        line = Line(time=TimeFragment(start=segment_index, end=segment_index + 1))
+        for word_index in range(3):
+            word = Word(text=f"word{segment_index}{word_index}", time=TimeFragment(start=segment_index, end=segment_index + 1))
+            word.clips.add(WordClip())
+            line.words.add(word)
+        segment.lines.add(line)
+        document.segments.add(segment)
+    return document
+
+@pytest.mark.parametrize("getter", ["get_words", "get_lines", "get_word_clips"])
+def test_modifying_the_returned_lists_does_not_change_the_cache(getter):
+    document = make_document()
+    expected = getattr(document, getter)()
+    returned = getattr(document, getter)()
+    returned.reverse()
+    returned.append(returned[0])
+    assert getattr(document, getter)() == expected
+    segment_getter = getattr(document.segments[0], getter, None)
+    if segment_getter is not None:
+        segment_expected = segment_getter()
+        segment_getter().clear()
+        assert segment_getter() == segment_expected
@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+import pytest
+from pycaps.video.render import ImageElement, ResizeCache
+
+@pytest.fixture(autouse=True)
+def resize_cache():
+    previous = ResizeCache.get_default()
+    cache = ResizeCache()
+    ResizeCache.set_default(cache)
+    yield cache
+    ResizeCache.set_default(previous)
+
+def make_image(width: int = 150, height: int = 40) -> np.ndarray:
+    image = np.zeros((height, width, 4), dtype=np.uint8)
+    image[..., 0] = np.linspace(0, 255, width, dtype=np.uint8)[None, :]
+    image[..., 1] = np.linspace(0, 255, height, dtype=np.uint8)[:, None]
+    image[..., 3] = 255
+    return image
+
+def test_small_scales_are_not_rounded_to_zero(resize_cache):
+    assert resize_cache.quantize(0.001) == 0.005
+    assert resize_cache.quantize(0.0) == 0.0
+    assert resize_cache.quantize(0.5012) == 0.5
+
+@pytest.mark.parametrize("scale", [0.0, 0.001, 0.0067, 0.01])
+def test_elements_without_pixels_are_not_rendered(scale):
+    element = ImageElement(make_image(), start=0, duration=1)
+    element.set_position((10, 10))
+    element.set_scale(scale)
+    background = np.full((100, 200, 3), 7, dtype=np.uint8)
+    result = element.render(background.copy(), 0.5)
+    assert result.shape == background.shape
+
+def render_frames(image: np.ndarray, cache: ResizeCache, scales) -> list:
+    ResizeCache.set_default(cache)
+    frames = []
+    for scale in scales:
+        element = ImageElement(image, start=0, duration=1)
+        element.set_position((20, 40))
+        element.set_scale(scale)
+        frames.append(element.render(np.full((200, 700, 3), 30, dtype=np.uint8), 0.5).astype(np.float64))
+    return frames
+
+def get_psnr(frame: np.ndarray, reference: np.ndarray) -> float:
+    mse = np.mean((frame - reference) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+def test_quantized_scales_have_a_bounded_visual_error():
+    image = make_image(600, 120)
+    cv2.putText(image, "pycaps subtitles", (20, 85), cv2.FONT_HERSHEY_SIMPLEX, 2.2, (255, 255, 255, 255), 5)
+    # the scales of a pop-in animation, rendered at 30 fps
+    scales = np.linspace(0.2, 1.1, 33).tolist()
+    references = render_frames(image, ResizeCache(scale_step=0), scales)
+    frames = render_frames(image, ResizeCache(scale_step=0.005), scales)
+    psnrs = [get_psnr(frame, reference) for frame, reference in zip(frames, references)]
+    # most frames are equal or almost equal; in the worst ones the sprite is one pixel smaller or bigger
+    # (the scale error is at most scale_step / 2), which moves the sharp edges of the text
+    assert np.mean([min(psnr, 100) for psnr in psnrs]) > 50
+    assert min(psnrs) > 20
+    cache = ResizeCache(scale_step=0.005)
+    assert all(abs(int(600 * cache.quantize(scale)) - int(600 * scale)) <= 2 for scale in scales)
@@ -0,0 +1,41 @@
+import pytest
+from pycaps.common import Document, Segment, Line, Word, Tag, TimeFragment
+from pycaps.tag import SemanticTagger
+from pycaps.tag.tagger.wordlist_matcher import WordlistMatcherCache
+
+TAG = Tag("city")
+
+@pytest.fixture(autouse=True)
+def wordlist_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(WordlistMatcherCache, "CACHE_DIR", tmp_path / "cache")
+
+def make_document(text: str) -> Document:
+    document = Document()
+    segment = Segment(time=TimeFragment(start=0, end=1))
+    line = Line(time=TimeFragment(start=0, end=1))
+    for word in text.split():
+        line.words.add(Word(text=word, time=TimeFragment(start=0, end=1)))
+    segment.lines.add(line)
+    document.segments.add(segment)
+    return document
+
+def get_tagged_words(document: Document):
+    return [word.text for word in document.get_words() if TAG in word.semantic_tags]
+
+def test_wordlist_files_contain_words_separated_by_spaces(tmp_path):
+    path = tmp_path / "cities.txt"
+    path.write_text("paris london\nnew york\n", encoding="utf-8")
+    tagger = SemanticTagger()
+    tagger.add_wordlist_file_rule(TAG, str(path))
+    document = make_document("From Paris to London, and then to a new home in York.")
+    tagger.tag(document)
+    assert get_tagged_words(document) == ["Paris", "London,", "new", "York."]
+
+def test_wordlist_files_can_contain_a_phrase_per_line(tmp_path):
+    path = tmp_path / "cities.txt"
+    path.write_text("paris\nnew york\n", encoding="utf-8")
+    tagger = SemanticTagger()
+    tagger.add_wordlist_file_rule(TAG, str(path), phrases=True)
+    document = make_document("Paris, a new home. New York!")
+    tagger.tag(document)
+    assert get_tagged_words(document) == ["Paris,", "New", "York!"]
@@ -0,0 +1,47 @@
+import json
+import pytest
+from pycaps.common import Document, Segment, Line, Word, WordClip, Tag, TimeFragment, ElementLayout, Position, Size, ElementState
+from pycaps.pipeline.subtitle_data_service import SubtitleDataService
+
+def make_layout(x: int, y: int, width: int, height: int) -> ElementLayout:
+    return ElementLayout(position=Position(x=x, y=y), size=Size(width=width, height=height))
+
+def make_document() -> Document:
+    document = Document()
+    for segment_index in range(3):
+        start = segment_index * 2.0
+        segment = Segment(time=TimeFragment(start=start, end=start + 1.5), max_layout=make_layout(10, 600, 300, 80))
+        segment.structure_tags.add(Tag("segment-tag"))
+        line = Line(time=TimeFragment(start=start, end=start + 1.5), max_layout=make_layout(10, 600, 300, 40))
+        for word_index, text in enumerate(["hello", "world"]):
+            word_start = start + word_index * 0.75
+            word = Word(text=text, time=TimeFragment(start=word_start, end=word_start + 0.75), max_layout=make_layout(10 + word_index * 150, 600, 140, 40))
+            word.semantic_tags.add(Tag("important"))
+            word.clips.set_all([
+                WordClip(states=[ElementState.WORD_BEING_NARRATED], layout=make_layout(10 + word_index * 150, 600, 140, 40)),
+                WordClip(states=[ElementState.WORD_NOT_NARRATED_YET, ElementState.LINE_BEING_NARRATED], layout=make_layout(12 + word_index * 150, 602, 136, 36)),
+            ])
+            line.words.add(word)
+        segment.lines.add(line)
+        document.segments.add(segment)
+    return document
+
+@pytest.mark.parametrize("time_window", [None, (2.5, 3.0)])
+def test_binary_and_json_formats_load_the_same_document(tmp_path, time_window):
+    document = make_document()
+    json_service = SubtitleDataService(str(tmp_path / "data.json"))
+    binary_service = SubtitleDataService(str(tmp_path / "data.pcsd"))
+    json_service.save(document)
+    binary_service.save(document)
+
+    from_json = json_service.load(time_window).to_dict()
+    from_binary = binary_service.load(time_window).to_dict()
+    # compared as JSON text, so an int loaded as float (1 vs 1.0) is a difference
+    assert json.dumps(from_binary, sort_keys=True) == json.dumps(from_json, sort_keys=True)
+
+def test_fractional_layouts_are_preserved(tmp_path):
+    document = make_document()
+    document.get_words()[0].max_layout.position.x = 10.5
+    service = SubtitleDataService(str(tmp_path / "data.pcsd"))
+    service.save(document)
+    assert service.load().get_words()[0].max_layout.position.x == 10.5
@@ -0,0 +1,41 @@
+import json
+import pytest
+from pycaps.transcriber import TimedTextParser, TimedTextFormat
+
+def get_words(document):
+    return [(word.text, round(word.time.start, 3), round(word.time.end, 3)) for word in document.get_words()]
+
+def test_whisper_json_words():
+    content = json.dumps({"segments": [{"start": 0.0, "end": 1.0, "text": "Hello world", "words": [
+        {"word": " Hello", "start": 0.0, "end": 0.4},
+        {"word": " world", "start": 0.5, "end": 1.0},
+    ]}]})
+    document = TimedTextParser().parse_content(content, TimedTextFormat.WHISPER_JSON)
+    assert get_words(document) == [("Hello", 0.0, 0.4), ("world", 0.5, 1.0)]
+
+@pytest.mark.parametrize("words, expected", [
+    # a word without times between two aligned words fills the gap between them
+    (
+        [{"word": "It", "start": 1.0, "end": 1.2}, {"word": "costs"}, {"word": "20", "start": 2.0, "end": 2.4}, {"word": "dollars", "start": 2.5, "end": 3.0}],
+        [("It", 1.0, 1.2), ("costs", 1.2, 2.0), ("20", 2.0, 2.4), ("dollars", 2.5, 3.0)],
+    ),
+    # at the start and at the end of the segment, the segment times are used
+    (
+        [{"word": "20"}, {"word": "dollars", "start": 1.5, "end": 2.0}, {"word": "each"}],
+        [("20", 1.0, 1.5), ("dollars", 1.5, 2.0), ("each", 2.0, 3.0)],
+    ),
+    # the consecutive words without times share the gap (proportionally to their length)
+    (
+        [{"word": "It", "start": 1.0, "end": 1.2}, {"word": "20"}, {"word": "2025"}, {"word": "dollars", "start": 1.8, "end": 3.0}],
+        [("It", 1.0, 1.2), ("20", 1.2, 1.4), ("2025", 1.4, 1.8), ("dollars", 1.8, 3.0)],
+    ),
+])
+def test_whisper_json_words_without_times_are_interpolated(words, expected):
+    content = json.dumps({"segments": [{"start": 1.0, "end": 3.0, "text": "", "words": words}]})
+    document = TimedTextParser().parse_content(content, TimedTextFormat.WHISPER_JSON)
+    assert get_words(document) == expected
+
+def test_vtt_character_references_are_decoded():
+    content = "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\n<v Bob>Tom &amp; Jerry &lt;3</v>\n"
+    document = TimedTextParser().parse_content(content, TimedTextFormat.VTT)
+    assert [word.text for word in document.get_words()] == ["Tom", "&", "Jerry", "<3"]
@@ -0,0 +1,43 @@
+import pytest
+from pycaps.common import Document, Segment, Line, Word, TimeFragment
+from pycaps.transcriber import TranscriptionCache, SpeechMap
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(TranscriptionCache, "CACHE_DIR", tmp_path / "cache")
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"video")
+    return TranscriptionCache(str(video), "transcriber")
+
+def make_document() -> Document:
+    document = Document()
+    for index, text in enumerate(["hello", "world"]):
+        time = TimeFragment(start=index * 2.0, end=index * 2.0 + 1)
+        segment = Segment(time=time)
+        line = Line(time=time)
+        line.words.add(Word(text=text, time=time))
+        segment.lines.add(line)
+        document.segments.add(segment)
+    return document
+
+def test_speech_map_is_saved_with_the_transcription(cache):
+    speech_map = SpeechMap([TimeFragment(0.1, 1.0), TimeFragment(2.0, 3.0)], 4.0)
+    cache.save(make_document(), speech_map, "vad:a")
+    cached = cache.load()
+    assert [w.text for w in cached.slice(0, 10).get_words()] == ["hello", "world"]
+    loaded = cached.get_speech_map("vad:a")
+    assert loaded.regions == speech_map.regions
+    assert loaded.duration == 4.0
+    # calculated with another detector configuration
+    assert cached.get_speech_map("vad:b") is None
+
+def test_transcription_without_speech_map(cache):
+    cache.save(make_document())
+    assert cache.load().get_speech_map("vad:a") is None
+
+def test_shifted_speech_map_is_on_the_video_timeline():
+    # speech map of a preview fragment starting at 10s
+    speech_map = SpeechMap([TimeFragment(0.5, 1.0)], 2.0).shift(10)
+    assert speech_map.regions == [TimeFragment(10.5, 11.0)]
+    assert speech_map.duration == 12.0
+    assert speech_map.is_speech(10.7) and not speech_map.is_speech(0.7)
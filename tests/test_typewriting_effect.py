@@ -0,0 +1,84 @@
+import numpy as np
+from PIL import Image
+from pycaps.common import Document, Segment, Line, Word, WordClip, TimeFragment, ElementLayout, Position, Size, ElementState
+from pycaps.effect.clip.typewriting_effect import TypewritingEffect
+from pycaps.video.render import RevealImageElement
+
+TEXT = (255, 255, 255, 255)
+BOX = (0, 0, 255, 128)
+
+class FakeRenderer:
+    """Renders a 40x10 word: a semi-transparent box (if has_box) with a 10 px white letter every 10 px."""
+
+    def __init__(self, has_box: bool, boundaries=(10, 20, 30, 40)):
+        self.has_box = has_box
+        self.boundaries = list(boundaries) if boundaries else None
+        self.calls = []
+
+    def open_line(self, line, state):
+        pass
+
+    def close_line(self):
+        pass
+
+    def get_letter_boundaries(self, index, word, state):
+        self.calls.append("boundaries")
+        return self.boundaries
+
+    def render_word(self, index, word, state, first_n_letters=None):
+        self.calls.append(("word", first_n_letters))
+        image = self._render_box(10 * (first_n_letters or 4))
+        for x in range(0, image.width, 20):
+            image.paste(TEXT, (x, 0, x + 10, 10))
+        return image
+
+    def render_word_background(self, index, word, state):
+        self.calls.append("background")
+        return self._render_box(40)
+
+    def _render_box(self, width: int) -> Image.Image:
+        return Image.new("RGBA", (width, 10), BOX if self.has_box else (0, 0, 0, 0))
+
+def make_document() -> Document:
+    document = Document()
+    time = TimeFragment(start=0, end=4)
+    segment = Segment(time=time)
+    line = Line(time=time)
+    word = Word(text="word", time=time)
+    layout = ElementLayout(position=Position(x=0, y=0), size=Size(width=40, height=10))
+    word.clips.add(WordClip(states=[ElementState.WORD_BEING_NARRATED], layout=layout))
+    line.words.add(word)
+    segment.lines.add(line)
+    document.segments.add(segment)
+    return document
+
+def apply_effect(renderer: FakeRenderer) -> WordClip:
+    document = make_document()
+    effect = TypewritingEffect()
+    effect.set_renderer(renderer)
+    effect.run(document)
+    return document.get_word_clips()[0]
+
+def get_alpha(element, t: float) -> np.ndarray:
+    return element.get_frame(t)[0, :, 3]
+
+def test_word_box_is_shown_from_the_first_letter():
+    renderer = FakeRenderer(has_box=True)
+    clip = apply_effect(renderer)
+    assert renderer.calls == ["boundaries", ("word", None), "background"]
+    assert isinstance(clip.media_clip, RevealImageElement)
+    alpha = get_alpha(clip.media_clip, 0.5)
+    # first letter revealed, the rest of the box without text
+    assert (alpha[:10] == 255).all() and (alpha[10:] == 128).all()
+    assert (get_alpha(clip.media_clip, 3.5)[20:30] == 255).all()
+
+def test_words_without_box_are_cropped():
+    clip = apply_effect(FakeRenderer(has_box=False))
+    alpha = get_alpha(clip.media_clip, 2.5)
+    assert (alpha[:10] == 255).all() and (alpha[20:30] == 255).all() and (alpha[30:] == 0).all()
+
+def test_word_is_not_rendered_twice_without_boundaries():
+    renderer = FakeRenderer(has_box=True, boundaries=None)
+    apply_effect(renderer)
+    # rendered letter by letter, the whole word is never rendered
+    assert renderer.calls == ["boundaries", ("word", 1), ("word", 2), ("word", 3), ("word", 4)]